@@ -0,0 +1,260 @@
+"""
+batch_ocr.py
+----------------------------------
+헤드리스 대량 OCR + Gemini 교정 배치 실행 파일 (Streamlit 불필요)
+
+사용 예:
+    python batch_ocr.py scans/ -o results.jsonl
+    python batch_ocr.py --manifest files.txt -o results.parquet --mode "맞춤법 교정"
+    python batch_ocr.py scans/ -o results.jsonl --metrics metrics.prom
+
+특징:
+1. 폴더(하위 폴더 포함) 또는 목록 파일(manifest)의 PDF / JPG / PNG를 일괄 처리
+2. OCR / 교정 단계를 각각 제한된 동시성으로 파이프라인 처리
+3. 결과를 JSONL 또는 Parquet으로 저장, 중단 후 재실행하면 완료된 파일은 건너뜀
+4. --metrics로 단계별 소요 시간 지표를 JSON(.json) 또는 Prometheus 텍스트로 저장
+----------------------------------
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger("batch_ocr")
+
+INPUT_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg")
+IN_FLIGHT_PER_WORKER = 2  # 작업자 1개당 동시에 들고 있을 문서 수 (OCR 대기 + 교정 대기 포함)
+
+
+def collect_inputs(paths, manifest=None):
+    """입력 경로(파일/폴더)와 manifest에서 PDF / 이미지 파일 목록 수집"""
+    candidates = list(paths)
+    if manifest:
+        with open(manifest, "r", encoding="utf-8") as f:
+            candidates.extend(line.strip() for line in f if line.strip())
+
+    files = []
+    for path in candidates:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in names if n.lower().endswith(INPUT_EXTENSIONS))
+        else:
+            files.append(path)
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in files))
+
+
+def checkpoint_path(output):
+    """재개용 체크포인트(JSONL) 경로 — JSONL 출력이면 출력 파일 자체를 사용"""
+    return output if output.endswith(".jsonl") else output + ".partial.jsonl"
+
+
+def load_checkpoint(path):
+    """이미 성공적으로 처리된 파일 경로 집합 (끝이 잘린 줄은 무시)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb") as f:
+        data = f.read()
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not record.get("error"):
+            done.add(record["path"])
+    # 비정상 종료로 마지막 줄이 잘렸다면 다음 기록이 그 뒤에 붙지 않도록 줄바꿈 보정
+    if data and not data.endswith(b"\n"):
+        with open(path, "ab") as f:
+            f.write(b"\n")
+    return done
+
+
+def write_parquet(spool, output):
+    """체크포인트 JSONL 전체를 Parquet 파일로 변환"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    records = {}
+    with open(spool, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["path"]] = record  # 재시도된 파일은 마지막 기록만 유지
+    # 실패 기록에는 없는 컬럼이 있으므로 전체 컬럼을 모아 빈 값은 None으로 채운다
+    columns = list(dict.fromkeys(key for record in records.values() for key in record))
+    rows = [{key: record.get(key) for key in columns} for record in records.values()]
+    pq.write_table(pa.Table.from_pylist(rows), output)
+
+
+def write_metrics(path):
+    """단계별 지표를 .json이면 JSON으로, 그 밖에는 Prometheus 텍스트로 저장"""
+    from src.telemetry import export_prometheus, metrics_snapshot
+
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(metrics_snapshot(), f, indent=2, ensure_ascii=False)
+        else:
+            f.write(export_prometheus())
+
+
+def ocr_one(path, engine):
+    from src.ocr_orchestrator import get_orchestrator
+    from src.pdf_utils import hash_stream
+
+    record = {"path": path, "error": None}
+    started = time.perf_counter()
+    try:
+        # 파일 전체를 읽어 두지 않고 열린 파일 객체를 해시 / 업로드 / PDF 파싱에 그대로 넘긴다
+        with open(path, "rb") as f:
+            record["sha256"] = hash_stream(f)
+            job = get_orchestrator().submit(f, os.path.basename(path), engine, record["sha256"])
+            document = job.document_sync()
+        record["pages"] = len(document.pages)
+        record["ocr_text"] = document.text
+        record["_document"] = document  # 교정용 — 파일에는 기록하지 않음
+        if not document.pages:
+            record["error"] = "OCR 결과 없음"
+    except Exception as e:
+        record["error"] = f"OCR 실패: {e}"
+    record["ocr_seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def correct_one(record, mode, selective=False):
+    from src.spell_corrector import CorrectionError, correct_document
+
+    started = time.perf_counter()
+    # 문서 모델은 교정에만 쓰므로 기록에서 떼어 내 교정이 끝나면 바로 놓아준다
+    document = record.pop("_document", None)
+    try:
+        record["corrected_text"], stats = correct_document(document, mode, selective=selective)
+        if selective:
+            record["selected_ratio"] = stats.get("selected_ratio")
+    except CorrectionError as e:
+        record["error"] = str(e)
+    record["mode"] = mode
+    record["correct_seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(files, output, mode=None, engine_name=None, ocr_workers=8, correct_workers=4, selective=False):
+    """OCR → (교정) → 기록을 파일 단위로 파이프라인 처리하고 처리 통계 반환"""
+    from src.ocr_engines import get_engine
+
+    engine = get_engine(engine_name)
+    spool = checkpoint_path(output)
+    done = load_checkpoint(spool)
+    todo = [p for p in files if p not in done]
+    logger.info(f"📂 입력 {len(files)}개 — 완료 {len(done)}개 건너뜀, 처리 대상 {len(todo)}개")
+
+    stats = {"ok": 0, "failed": 0, "pages": 0}
+    started = time.perf_counter()
+    with open(spool, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=ocr_workers, thread_name_prefix="batch-ocr") as ocr_pool, \
+            ThreadPoolExecutor(max_workers=correct_workers, thread_name_prefix="batch-correct") as correct_pool:
+
+        def write(record):
+            record.pop("_document", None)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            stats["failed" if record["error"] else "ok"] += 1
+            stats["pages"] += record.get("pages", 0)
+            finished = stats["ok"] + stats["failed"]
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"{'❌' if record['error'] else '✅'} [{finished}/{len(todo)}] {os.path.basename(record['path'])}"
+                f" | {finished / elapsed * 60:.1f} 문서/분"
+            )
+
+        # 파일을 한꺼번에 제출하지 않고 진행 중인 문서 수를 제한한다 — 교정이 OCR보다 느리면
+        # 교정을 기다리는 기록(문서 모델 포함)이 쌓이는 대신 새 OCR 제출이 멈춘다
+        max_in_flight = IN_FLIGHT_PER_WORKER * (ocr_workers + (correct_workers if mode else 0))
+        remaining = iter(todo)
+        stage = {}
+        pending = set()
+
+        def fill():
+            while len(pending) < max_in_flight:
+                path = next(remaining, None)
+                if path is None:
+                    return
+                future = ocr_pool.submit(ocr_one, path, engine)
+                stage[future] = "ocr"
+                pending.add(future)
+
+        fill()
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                if stage.pop(future) == "ocr" and mode and not record["error"]:
+                    next_future = correct_pool.submit(correct_one, record, mode, selective)
+                    stage[next_future] = "correct"
+                    pending.add(next_future)
+                else:
+                    write(record)
+            fill()
+
+    if not output.endswith(".jsonl"):
+        write_parquet(spool, output)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["docs_per_minute"] = round((stats["ok"] + stats["failed"]) / elapsed * 60, 2) if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF 폴더 일괄 OCR + Gemini 교정")
+    parser.add_argument("inputs", nargs="*", help="PDF / 이미지 파일 또는 폴더")
+    parser.add_argument("--manifest", help="처리할 PDF 경로 목록 파일 (한 줄에 하나)")
+    parser.add_argument("-o", "--output", required=True, help="결과 파일 (.jsonl 또는 .parquet)")
+    parser.add_argument("--mode", default="맞춤법 교정", help="Gemini 교정 모드")
+    parser.add_argument("--no-correct", action="store_true", help="OCR만 수행")
+    parser.add_argument("--selective", action="store_true", help="인식 신뢰도가 낮은 문장만 교정 (맞춤법 교정 모드)")
+    parser.add_argument("--engine", default=None, help="OCR 엔진 (vision / tesseract)")
+    parser.add_argument("--ocr-workers", type=int, default=8, help="동시에 OCR할 문서 수")
+    parser.add_argument("--correct-workers", type=int, default=4, help="동시에 교정할 문서 수")
+    parser.add_argument("--max-uploads", type=int, help="동시 GCS 업로드 한도")
+    parser.add_argument("--max-operations", type=int, help="동시 Vision 작업 한도")
+    parser.add_argument("--max-downloads", type=int, help="동시 결과 다운로드 한도")
+    parser.add_argument("--max-inline", type=int, help="동시 인라인 OCR 한도")
+    parser.add_argument("--metrics", help="단계별 지표 저장 파일 (.json 또는 Prometheus 텍스트)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+
+    files = collect_inputs(args.inputs, args.manifest)
+    if not files:
+        parser.error("처리할 PDF가 없습니다.")
+
+    if args.max_uploads or args.max_operations or args.max_downloads or args.max_inline:
+        from src.vision_ocr import set_stage_limits
+        set_stage_limits(args.max_uploads, args.max_operations, args.max_downloads, args.max_inline)
+
+    stats = run_batch(
+        files,
+        args.output,
+        mode=None if args.no_correct else args.mode,
+        engine_name=args.engine,
+        ocr_workers=args.ocr_workers,
+        correct_workers=args.correct_workers,
+        selective=args.selective,
+    )
+    logger.info(f"🎉 배치 완료: {json.dumps(stats, ensure_ascii=False)}")
+
+    if args.metrics:
+        write_metrics(args.metrics)
+        logger.info(f"📈 단계별 지표 저장: {args.metrics}")
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,497 @@
+"""
+fakes.py
+----------------------------------
+오프라인 벤치마크용 가짜 GCS / Vision / Gemini 클라이언트 (프로세스 내)
+
+기능 요약:
+1. storage.Client / Bucket / Blob 대역 — 메모리 객체 저장소
+   (재개 가능 업로드처럼 조각 단위로 읽기, prefix 목록 조회, 배치 삭제)
+2. ImageAnnotatorClient 대역 — async_batch_annotate_files가 업로드된 PDF의 페이지 수만큼
+   합성 결과 샤드(output-X-to-Y.json)를 가짜 버킷에 기록, 인라인 동기 요청도 지원
+3. GenerativeModel 대역 — 입력 길이에 비례한 지연 후 입력 본문을 그대로 돌려주고 usage_metadata 기록
+   (stream=True면 첫 조각까지 기본 지연, 이후 조각마다 토큰 수에 비례한 지연)
+
+모든 호출에 지연 시간(±지터)과 실패 주입(failure_rate)을 설정할 수 있고,
+install_fakes()가 src.clients 레지스트리에 등록하므로 파이프라인 코드는 그대로 실행된다.
+----------------------------------
+"""
+
+from contextlib import contextmanager
+import datetime
+import io
+import json
+import os
+import random
+import threading
+import time
+import types
+
+# 합성 페이지 단어 재료 (한글 음절)
+_SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+
+
+class FakeLatency:
+    """호출 1회 지연 = base + per_unit × 처리량, ±jitter 비율로 흔들림"""
+
+    def __init__(self, base=0.0, per_unit=0.0, jitter=0.2, seed=None):
+        self.base = base
+        self.per_unit = per_unit
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def seconds(self, units=0):
+        with self._lock:
+            factor = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, (self.base + self.per_unit * units) * factor)
+
+    def sleep(self, units=0, already_spent=0.0):
+        """시뮬레이션 지연 중 이미 쓴 시간(합성 데이터 생성 등)은 빼고 잠든다"""
+        remaining = self.seconds(units) - already_spent
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+class FailureInjector:
+    """failure_rate 확률로 일시적 오류(ServiceUnavailable) 발생"""
+
+    def __init__(self, failure_rate=0.0, seed=None):
+        self.failure_rate = failure_rate
+        self.injected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def maybe_fail(self, what):
+        if self.failure_rate <= 0:
+            return
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+            self.injected += failed
+        if failed:
+            from google.api_core.exceptions import ServiceUnavailable
+            raise ServiceUnavailable(f"주입된 실패: {what}")
+
+
+# ----------------------------------------------------------------------
+# 합성 OCR 결과
+# ----------------------------------------------------------------------
+def synthetic_page_response(page_number, words_per_page=250, low_confidence_ratio=0.02,
+                            words_per_line=12, seed=0):
+    """Vision 결과 샤드 형식(camelCase)의 페이지 응답 1건 — 같은 seed / 페이지 번호면 같은 내용"""
+    rng = random.Random(seed * 1_000_003 + page_number)
+    words, texts = [], []
+    for index in range(words_per_page):
+        text = "".join(rng.choices(_SYLLABLES, k=rng.randint(1, 4)))
+        end_of_line = (index + 1) % words_per_line == 0 or index == words_per_page - 1
+        if rng.random() < low_confidence_ratio:
+            confidence = round(rng.uniform(0.4, 0.8), 3)
+        else:
+            confidence = round(rng.uniform(0.9, 0.99), 3)
+        x0 = (index % words_per_line) / words_per_line
+        y0 = (index // words_per_line) / (words_per_page // words_per_line + 1)
+        symbols = [{"text": ch} for ch in text]
+        symbols[-1]["property"] = {"detectedBreak": {"type": "LINE_BREAK" if end_of_line else "SPACE"}}
+        words.append({
+            "symbols": symbols,
+            "confidence": confidence,
+            "boundingBox": {"normalizedVertices": [
+                {"x": x0, "y": y0}, {"x": x0 + 0.07, "y": y0},
+                {"x": x0 + 0.07, "y": y0 + 0.02}, {"x": x0, "y": y0 + 0.02},
+            ]},
+        })
+        texts.append(text + ("\n" if end_of_line else " "))
+        if end_of_line and rng.random() < 0.3:
+            texts[-1] = text + ".\n"
+            symbols[-1]["text"] += "."
+    paragraph = {"words": words, "confidence": 0.95}
+    return {
+        "fullTextAnnotation": {
+            "text": "".join(texts),
+            "pages": [{
+                "width": 1, "height": 1, "confidence": 0.95,
+                "blocks": [{"paragraphs": [paragraph], "confidence": 0.95}],
+            }],
+        },
+        "context": {"pageNumber": page_number},
+    }
+
+
+def synthetic_pdf(page_count, tag=""):
+    """빈 페이지 page_count장짜리 PDF 바이트 (텍스트 레이어 없음 → 모든 페이지가 OCR 대상)
+
+    tag를 메타데이터에 넣어 반복마다 내용 해시(캐시 키)가 달라지게 한다.
+    """
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(page_count):
+        writer.add_blank_page(width=595, height=842)
+    writer.add_metadata({"/Title": f"benchmark {tag}"})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _to_proto(message_type, camel_dict):
+    from google.protobuf import json_format
+
+    pb = message_type.pb()()
+    json_format.ParseDict(camel_dict, pb, ignore_unknown_fields=True)
+    return message_type.wrap(pb)
+
+
+def _as_dict(request):
+    if isinstance(request, dict):
+        return request
+    return type(request).to_dict(request)
+
+
+# ----------------------------------------------------------------------
+# GCS
+# ----------------------------------------------------------------------
+class FakeBlob:
+    def __init__(self, bucket, name, chunk_size=None):
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = chunk_size
+
+    @property
+    def _object(self):
+        return self.bucket.client.objects.get((self.bucket.name, self.name))
+
+    @property
+    def size(self):
+        stored = self._object
+        return len(stored[0]) if stored else None
+
+    @property
+    def time_created(self):
+        stored = self._object
+        return stored[1] if stored else None
+
+    def upload_from_file(self, file_obj, content_type=None, checksum=None, **kwargs):
+        client = self.bucket.client
+        client.failures.maybe_fail(f"upload {self.name}")
+        chunk_size = self.chunk_size or 8 * 1024 * 1024
+        parts = []
+        while True:
+            data = file_obj.read(chunk_size)
+            if not data:
+                break
+            parts.append(data)
+            client.latency.sleep(len(data))  # 조각 1개 = 요청 1회
+        client.store(self.bucket.name, self.name, b"".join(parts))
+
+    def upload_from_string(self, data, content_type=None):
+        self.bucket.client.store(self.bucket.name, self.name, data if isinstance(data, bytes) else data.encode())
+
+    def download_as_bytes(self, **kwargs):
+        from google.api_core.exceptions import NotFound
+
+        client = self.bucket.client
+        client.failures.maybe_fail(f"download {self.name}")
+        stored = self._object
+        if stored is None:
+            raise NotFound(f"없는 객체: {self.name}")
+        client.latency.sleep(len(stored[0]))
+        client.count("downloads")
+        return stored[0]
+
+    def exists(self):
+        self.bucket.client.latency.sleep()
+        return self._object is not None
+
+    def delete(self):
+        client = self.bucket.client
+        removed = client.remove(self.bucket.name, self.name)
+        if client.current_batch is not None:
+            client.current_batch._responses.append(FakeResponse(204 if removed else 404))
+        elif not removed:
+            from google.api_core.exceptions import NotFound
+            raise NotFound(f"없는 객체: {self.name}")
+
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self, name, chunk_size)
+
+    def reload(self):
+        return None
+
+    def list_blobs(self, prefix=""):
+        self.client.latency.sleep()
+        self.client.count("list_requests")
+        with self.client.lock:
+            names = sorted(name for bucket, name in self.client.objects if bucket == self.name and name.startswith(prefix))
+        return [FakeBlob(self, name) for name in names]
+
+
+class FakeStorageClient:
+    """메모리 객체 저장소 — objects[(버킷, 이름)] = (내용, 생성 시각)"""
+
+    def __init__(self, latency=None, failures=None):
+        self.latency = latency or FakeLatency()
+        self.failures = failures or FailureInjector()
+        self.objects = {}
+        self.lock = threading.Lock()
+        self._batch = threading.local()
+        self.counters = {"uploads": 0, "downloads": 0, "deletes": 0, "list_requests": 0}
+
+    def bucket(self, name):
+        return FakeBucket(self, name)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def store(self, bucket_name, name, data):
+        with self.lock:
+            self.objects[(bucket_name, name)] = (data, datetime.datetime.now(datetime.timezone.utc))
+            self.counters["uploads"] += 1
+
+    def remove(self, bucket_name, name):
+        with self.lock:
+            if self.objects.pop((bucket_name, name), None) is None:
+                return False
+            self.counters["deletes"] += 1
+            return True
+
+    def read(self, uri):
+        bucket_name, _, name = uri[len("gs://"):].partition("/")
+        with self.lock:
+            return self.objects[(bucket_name, name)][0]
+
+    @property
+    def current_batch(self):
+        return getattr(self._batch, "value", None)
+
+    @contextmanager
+    def batch(self, raise_exception=True):
+        """배치 요청 대역 — 요청별 응답을 실제 Batch처럼 _responses에 남긴다 (raise_exception=False 기준)"""
+        self.latency.sleep()
+        batch = FakeBatch()
+        self._batch.value = batch
+        try:
+            yield batch
+        finally:
+            self._batch.value = None
+
+
+class FakeBatch:
+    def __init__(self):
+        self._responses = []
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+# ----------------------------------------------------------------------
+# Vision
+# ----------------------------------------------------------------------
+class FakeOperation:
+    def __init__(self, run):
+        self._run = run
+        self._result = None
+        self._done = False
+        self._lock = threading.Lock()
+
+    def result(self, timeout=None):
+        with self._lock:
+            if not self._done:
+                self._result = self._run()
+                self._done = True
+        return self._result
+
+
+class FakeVisionClient:
+    """합성 결과를 돌려주는 ImageAnnotatorClient 대역
+
+    shard_size를 지정하면 요청의 batch_size 대신 그 크기로 결과 샤드를 나눈다
+    (예상 샤드 이름이 어긋나는 경로를 재현할 때 사용).
+    """
+
+    def __init__(self, storage, latency=None, failures=None, words_per_page=250,
+                 low_confidence_ratio=0.02, shard_size=None, seed=0):
+        self.storage = storage
+        self.latency = latency or FakeLatency()
+        self.failures = failures or FailureInjector()
+        self.words_per_page = words_per_page
+        self.low_confidence_ratio = low_confidence_ratio
+        self.shard_size = shard_size
+        self.seed = seed
+        self.counters = {"operations": 0, "inline_requests": 0, "pages": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counters[name] += amount
+
+    def _page(self, page_number):
+        return synthetic_page_response(page_number, self.words_per_page, self.low_confidence_ratio, seed=self.seed)
+
+    def _annotate_file(self, request):
+        from src.pdf_utils import count_pdf_pages
+
+        source = self.storage.read(request["input_config"]["gcs_source"]["uri"])
+        destination = request["output_config"]["gcs_destination"]["uri"]
+        batch_size = self.shard_size or request["output_config"].get("batch_size") or 20
+        page_count = count_pdf_pages(source) or 1
+        bucket_name, _, prefix = destination[len("gs://"):].partition("/")
+        for start in range(1, page_count + 1, batch_size):
+            end = min(start + batch_size - 1, page_count)
+            shard = {"responses": [self._page(n) for n in range(start, end + 1)]}
+            self.storage.store(bucket_name, f"{prefix}output-{start}-to-{end}.json",
+                               json.dumps(shard, ensure_ascii=False).encode("utf-8"))
+        self._count(pages=page_count)
+        return page_count, {"output_config": {"gcs_destination": {"uri": destination}, "batch_size": batch_size}}
+
+    def async_batch_annotate_files(self, requests, **kwargs):
+        from google.cloud import vision
+
+        requests = [_as_dict(request) for request in requests]
+        self._count(operations=1)
+
+        def run():
+            started = time.perf_counter()
+            self.failures.maybe_fail("async_batch_annotate_files")
+            results = [self._annotate_file(request) for request in requests]
+            pages = sum(page_count for page_count, _ in results)
+            self.latency.sleep(pages, already_spent=time.perf_counter() - started)
+            return vision.AsyncBatchAnnotateFilesResponse(responses=[response for _, response in results])
+
+        return FakeOperation(run)
+
+    def batch_annotate_files(self, requests, timeout=None, **kwargs):
+        from google.cloud import vision
+
+        started = time.perf_counter()
+        self.failures.maybe_fail("batch_annotate_files")
+        file_responses = []
+        for request in map(_as_dict, requests):
+            pages = request.get("pages") or [1]
+            file_responses.append({"responses": [self._page(n) for n in pages]})
+            self._count(inline_requests=1, pages=len(pages))
+        response = _to_proto(vision.BatchAnnotateFilesResponse, {"responses": file_responses})
+        self.latency.sleep(sum(len(r["responses"]) for r in file_responses), time.perf_counter() - started)
+        return response
+
+    def document_text_detection(self, image=None, timeout=None, **kwargs):
+        from google.cloud import vision
+
+        started = time.perf_counter()
+        self.failures.maybe_fail("document_text_detection")
+        self._count(inline_requests=1, pages=1)
+        response = _to_proto(vision.AnnotateImageResponse, self._page(1))
+        self.latency.sleep(1, time.perf_counter() - started)
+        return response
+
+
+# ----------------------------------------------------------------------
+# Gemini
+# ----------------------------------------------------------------------
+def _prompt_body(prompt):
+    """프롬프트에서 교정 대상 본문만 추출 (참고용 뒤 문맥 제외)"""
+    body = prompt.split("\n\n[참고용 뒤 문맥", 1)[0]
+    return body.rsplit(":\n\n", 1)[-1]
+
+
+class FakeGenerativeModel:
+    """입력 본문을 그대로 돌려주는 GenerativeModel 대역 — 지연은 출력 토큰 수에 비례"""
+
+    def __init__(self, latency=None, failures=None, model_name="gemini-2.5-flash"):
+        self.latency = latency or FakeLatency()
+        self.failures = failures or FailureInjector()
+        self.model_name = model_name
+        self.counters = {"requests": 0, "prompt_tokens": 0, "output_tokens": 0}
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        from src.text_chunker import estimate_tokens
+
+        self.failures.maybe_fail("generate_content")
+        text = _prompt_body(prompt)
+        prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["prompt_tokens"] += prompt_tokens
+            self.counters["output_tokens"] += output_tokens
+        usage = types.SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+        if stream:
+            return FakeStreamResponse(text, usage, self.latency)
+        self.latency.sleep(output_tokens)
+        return types.SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class FakeStreamResponse:
+    """stream=True 응답 대역 — 순회하면 STREAM_PIECE_CHARS 글자씩 조각 생성"""
+
+    STREAM_PIECE_CHARS = 40
+
+    def __init__(self, text, usage_metadata, latency):
+        self._text = text
+        self._latency = latency
+        self.usage_metadata = usage_metadata
+
+    def __iter__(self):
+        from src.text_chunker import estimate_tokens
+
+        self._latency.sleep()  # 첫 토큰까지
+        for start in range(0, len(self._text), self.STREAM_PIECE_CHARS):
+            piece = self._text[start:start + self.STREAM_PIECE_CHARS]
+            time.sleep(self._latency.per_unit * estimate_tokens(piece))
+            yield types.SimpleNamespace(text=piece)
+
+
+# ----------------------------------------------------------------------
+# 등록
+# ----------------------------------------------------------------------
+class FakeBackend:
+    """가짜 GCS / Vision / Gemini 묶음 — 지연 단위: GCS는 바이트, Vision은 페이지, Gemini는 출력 토큰"""
+
+    def __init__(self, storage_latency=None, vision_latency=None, gemini_latency=None,
+                 failure_rate=0.0, words_per_page=250, low_confidence_ratio=0.02, shard_size=None, seed=0):
+        failures = FailureInjector(failure_rate, seed)
+        self.failures = failures
+        self.storage = FakeStorageClient(storage_latency, failures)
+        self.vision = FakeVisionClient(
+            self.storage, vision_latency, failures, words_per_page, low_confidence_ratio, shard_size, seed,
+        )
+        self.gemini = FakeGenerativeModel(gemini_latency, failures)
+
+    def counters(self):
+        return {
+            "storage": dict(self.storage.counters),
+            "vision": dict(self.vision.counters),
+            "gemini": dict(self.gemini.counters),
+            "objects_left": len(self.storage.objects),
+            "injected_failures": self.failures.injected,
+        }
+
+
+def install_fakes(backend, api_key="offline-benchmark"):
+    """src.clients 레지스트리에 가짜 클라이언트 등록 (이후 get_*_client가 가짜를 반환)"""
+    from src import clients
+    from src.spell_corrector import GEMINI_MODEL_NAME
+    from src.vision_ocr import BUCKET_NAME
+
+    os.environ.setdefault("GEMINI_API_KEY", api_key)
+    clients.reset_clients()
+    clients.install_client("gcp_credentials", None)
+    clients.install_client("storage_client", backend.storage)
+    clients.install_client(f"bucket:{BUCKET_NAME}", backend.storage.bucket(BUCKET_NAME))
+    clients.install_client("vision_client", backend.vision)
+    clients.install_client(
+        clients.gemini_client_name(os.environ["GEMINI_API_KEY"], GEMINI_MODEL_NAME), backend.gemini,
+    )
+    return backend
@@ -0,0 +1,268 @@
+"""
+pipeline_throughput.py
+----------------------------------
+OCR 파이프라인 / Gemini 교정 처리량 벤치마크 (오프라인, 가짜 GCS / Vision / Gemini 사용)
+
+사용 예:
+    python benchmarks/pipeline_throughput.py                      # 1/10/100/500페이지 OCR + 교정 + 스트리밍 교정 측정
+    python benchmarks/pipeline_throughput.py --pages 10 100 --only ocr
+    python benchmarks/pipeline_throughput.py --save               # 기준값 저장
+    python benchmarks/pipeline_throughput.py --check              # 기준값 대비 회귀 검사 (실패 시 종료 코드 1)
+    python benchmarks/pipeline_throughput.py --failure-rate 0.05 --shard-size 7
+
+시나리오(종류 × 페이지 수)마다 새 인터프리터에서 run_ocr_pipeline / correct_text / stream_correct_text를
+반복 실행해 문서 1건 지연 시간의 p50·p95·p99, 처리량(페이지/초), 최대 RSS, 단계별 평균 시간을 기록한다.
+스트리밍 교정은 첫 조각까지의 시간(p50)도 함께 기록한다.
+가짜 클라이언트의 지연 시간은 실제 API 값이 아니라 비교용 설정값이므로
+절대값보다 같은 설정으로 측정한 기준값과의 차이를 본다.
+----------------------------------
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "results", "pipeline_baseline.json")
+PAGE_COUNTS = [1, 10, 100, 500]
+KINDS = ["ocr", "correct", "stream"]
+PAGES_PER_RUN_LIMIT = 1000  # 큰 문서는 반복 횟수를 줄여 시나리오 1개가 이 페이지 수를 넘지 않게 함
+
+# 측정 잡음을 감안한 회귀 허용치 (p50 / 최대 RSS는 기준값 대비 비율, 처리량은 하락 비율)
+TOLERANCE_RATIO = 1.5
+RSS_TOLERANCE_RATIO = 1.3
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def _prepare_environment(settings):
+    """src 모듈을 임포트하기 전에 캐시 / 페이싱 / 정리 설정 (측정이 실제 디스크 캐시나 제한에 묶이지 않게)"""
+    os.environ["OCR_CACHE_DIR"] = tempfile.mkdtemp(prefix="ocr-bench-")
+    os.environ["CORRECTION_CACHE_DISK"] = "0"
+    os.environ["OCR_GCS_SWEEP_INTERVAL"] = "0"
+    os.environ.setdefault("GEMINI_RPM", str(settings["gemini_rpm"]))
+    os.environ.setdefault("GEMINI_TPM", str(settings["gemini_tpm"]))
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def _make_backend(settings):
+    from benchmarks.fakes import FakeBackend, FakeLatency, install_fakes
+
+    return install_fakes(FakeBackend(
+        storage_latency=FakeLatency(settings["storage_latency"], 1 / (settings["storage_mbps"] * 1024 * 1024)),
+        vision_latency=FakeLatency(settings["vision_latency"], settings["vision_page_latency"]),
+        gemini_latency=FakeLatency(settings["gemini_latency"], 1 / settings["gemini_tokens_per_second"]),
+        failure_rate=settings["failure_rate"],
+        words_per_page=settings["words_per_page"],
+        shard_size=settings["shard_size"],
+    ))
+
+
+def _ocr_once(pages, index):
+    """→ (성공 여부, 첫 조각까지의 시간 — 해당 없음)"""
+    from benchmarks.fakes import synthetic_pdf
+    from src.vision_ocr import run_ocr_pipeline
+
+    upload = io.BytesIO(synthetic_pdf(pages, tag=f"{pages}-{index}"))
+    upload.name = f"bench-{pages}p-{index}.pdf"
+    text = run_ocr_pipeline(upload)
+    return bool(text), None
+
+
+def _synthetic_text(pages, index, words_per_page):
+    from benchmarks.fakes import synthetic_page_response
+    from src.ocr_document import OcrDocument, page_from_response
+
+    # 반복마다 다른 seed → 교정 캐시에 걸리지 않는 새 문서
+    return OcrDocument(
+        page_from_response(synthetic_page_response(n, words_per_page, seed=index + 1), n)
+        for n in range(1, pages + 1)
+    ).text
+
+
+def _correct_once(pages, index, words_per_page):
+    from src.spell_corrector import correct_text
+
+    return not correct_text(_synthetic_text(pages, index, words_per_page)).startswith("❌"), None
+
+
+def _stream_once(pages, index, words_per_page):
+    from src.spell_corrector import CorrectionError, stream_correct_text
+
+    text = _synthetic_text(pages, index, words_per_page)
+    started, first_token = time.perf_counter(), None
+    try:
+        for _ in stream_correct_text(text):
+            first_token = first_token or time.perf_counter() - started
+    except CorrectionError:
+        return False, first_token
+    return True, first_token
+
+
+def run_scenario(kind, pages, settings):
+    """현재 프로세스에서 시나리오 1개 실행 (run_all이 새 인터프리터에서 호출)"""
+    _prepare_environment(settings)
+    backend = _make_backend(settings)
+    from src.telemetry import metrics_snapshot, reset_metrics
+
+    def once(index):
+        if kind == "ocr":
+            return _ocr_once(pages, index)
+        if kind == "stream":
+            return _stream_once(pages, index, settings["words_per_page"])
+        return _correct_once(pages, index, settings["words_per_page"])
+
+    once(-1)  # 준비 실행 — SDK 임포트 / 스레드 풀 생성은 측정에서 제외
+    reset_metrics()
+
+    repeat = max(1, min(settings["repeat"], PAGES_PER_RUN_LIMIT // pages))
+    latencies, first_tokens, errors = [], [], 0
+    started = time.perf_counter()
+    for index in range(repeat):
+        run_started = time.perf_counter()
+        try:
+            ok, first_token = once(index)
+        except Exception:
+            ok, first_token = False, None
+        latencies.append(time.perf_counter() - run_started)
+        if first_token is not None:
+            first_tokens.append(first_token)
+        errors += not ok
+    elapsed = time.perf_counter() - started
+
+    stages = metrics_snapshot()["stages"]
+    return {
+        "kind": kind,
+        "pages": pages,
+        "runs": repeat,
+        "errors": errors,
+        "pages_per_second": round(pages * repeat / elapsed, 2),
+        "docs_per_minute": round(repeat / elapsed * 60, 2),
+        **{f"p{q}_seconds": round(_percentile(latencies, q), 4) for q in (50, 95, 99)},
+        **({"p50_first_token_seconds": round(_percentile(first_tokens, 50), 4)} if first_tokens else {}),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stage_mean_seconds": {name: stage["mean_seconds"] for name, stage in stages.items()},
+        "fake_counters": backend.counters(),
+    }
+
+
+def run_all(kinds, page_counts, settings):
+    """시나리오마다 새 인터프리터를 띄워 실행 — 최대 RSS가 시나리오끼리 섞이지 않게 한다"""
+    results = {}
+    for kind in kinds:
+        for pages in page_counts:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", json.dumps([kind, pages, settings])],
+                cwd=ROOT, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"{kind} {pages}페이지 실행 실패:\n{proc.stderr[-2000:]}")
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            results[f"{kind}:{pages}"] = result
+            print(
+                f"{'✅' if not result['errors'] else '⚠️'} {kind:>7} {pages:>4}페이지 | "
+                f"p50 {result['p50_seconds']:.3f}s p95 {result['p95_seconds']:.3f}s p99 {result['p99_seconds']:.3f}s | "
+                f"{result['pages_per_second']:.1f} 페이지/초 | "
+                + (f"첫 조각 {result['p50_first_token_seconds']:.3f}s | " if "p50_first_token_seconds" in result else "")
+                + f"RSS {result['peak_rss_mb']:.0f}MB | "
+                f"오류 {result['errors']}/{result['runs']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def check_regressions(results, baseline):
+    """기준값 대비 허용치를 넘은 시나리오 목록 (설정이 다른 기준값은 비교하지 않음)"""
+    if baseline.get("settings") != results["settings"]:
+        return ["기준값과 가짜 클라이언트 설정이 다릅니다 — 같은 설정으로 다시 저장하세요."]
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base:
+            continue
+        if result["p50_seconds"] > base["p50_seconds"] * TOLERANCE_RATIO:
+            regressions.append(f"{name}: p50 {result['p50_seconds']}s (기준 {base['p50_seconds']}s)")
+        if result["pages_per_second"] * TOLERANCE_RATIO < base["pages_per_second"]:
+            regressions.append(
+                f"{name}: 처리량 {result['pages_per_second']} 페이지/초 (기준 {base['pages_per_second']})"
+            )
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * RSS_TOLERANCE_RATIO:
+            regressions.append(f"{name}: 최대 RSS {result['peak_rss_mb']}MB (기준 {base['peak_rss_mb']}MB)")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: 오류 {result['errors']}건 (기준 {base['errors']}건)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR / 교정 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--pages", type=int, nargs="+", default=PAGE_COUNTS, help="문서 페이지 수 목록")
+    parser.add_argument("--only", choices=KINDS, help="한 종류만 측정 (OCR / 교정 / 스트리밍 교정)")
+    parser.add_argument("--repeat", type=int, default=5, help="시나리오당 반복 횟수 (큰 문서는 자동으로 줄어듦)")
+    parser.add_argument("--words-per-page", type=int, default=250)
+    parser.add_argument("--storage-latency", type=float, default=0.01, help="GCS 요청 1회 기본 지연 (초)")
+    parser.add_argument("--storage-mbps", type=float, default=100.0, help="GCS 전송 속도 (MB/s)")
+    parser.add_argument("--vision-latency", type=float, default=0.5, help="Vision 작업 / 인라인 요청 기본 지연 (초)")
+    parser.add_argument("--vision-page-latency", type=float, default=0.005, help="Vision 페이지당 추가 지연 (초)")
+    parser.add_argument("--gemini-latency", type=float, default=0.1, help="Gemini 요청 1회 기본 지연 (초)")
+    parser.add_argument("--gemini-tokens-per-second", type=float, default=20000.0, help="Gemini 출력 속도")
+    parser.add_argument("--gemini-rpm", type=int, default=0, help="GEMINI_RPM 요청 수 제한 (0이면 끔)")
+    parser.add_argument("--gemini-tpm", type=int, default=0, help="GEMINI_TPM 토큰 수 제한 (0이면 끔)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="가짜 호출마다 일시적 오류를 낼 확률")
+    parser.add_argument("--shard-size", type=int, default=None, help="Vision 결과 샤드당 페이지 수 (기본: 요청값)")
+    parser.add_argument("--save", action="store_true", help="결과를 기준값으로 저장")
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀 검사")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        kind, pages, settings = json.loads(args.worker)
+        print(json.dumps(run_scenario(kind, pages, settings), ensure_ascii=False))
+        return 0
+
+    settings = {
+        name: getattr(args, name)
+        for name in (
+            "repeat", "words_per_page", "storage_latency", "storage_mbps", "vision_latency",
+            "vision_page_latency", "gemini_latency", "gemini_tokens_per_second", "gemini_rpm", "gemini_tpm",
+            "failure_rate", "shard_size",
+        )
+    }
+    kinds = [args.only] if args.only else KINDS
+    results = {"settings": settings, "scenarios": run_all(kinds, args.pages, settings)}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ 기준값 저장: {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ 기준값 파일이 없습니다: {args.baseline}")
+            return 1
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = check_regressions(results, json.load(f))
+        if regressions:
+            print("❌ 성능 회귀:\n" + "\n".join(regressions))
+            return 1
+        print("✅ 성능 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+startup_time.py
+----------------------------------
+모듈 임포트(콜드 스타트) 시간 벤치마크
+
+사용 예:
+    python benchmarks/startup_time.py                 # 측정 결과 출력
+    python benchmarks/startup_time.py --save          # 기준값 저장
+    python benchmarks/startup_time.py --check         # 기준값 대비 회귀 검사 (실패 시 종료 코드 1)
+
+모듈마다 새 인터프리터에서 `python -X importtime -c "import <모듈>"`을 실행해
+누적 임포트 시간과 가장 무거운 하위 임포트를 기록한다.
+----------------------------------
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "results", "startup_baseline.json")
+MODULES = ["src.vision_ocr", "src.spell_corrector", "src.clients", "src.ocr_engines"]
+
+# 측정 잡음을 감안한 회귀 허용치 (기준값 대비 비율 + 절대값 ms)
+TOLERANCE_RATIO = 1.5
+TOLERANCE_MS = 20.0
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → [(모듈 이름, 누적 μs, 중첩 깊이)] (출력 순서 유지)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((name.strip(), int(cumulative_us), depth))
+    return entries
+
+
+def module_subtree(entries, module):
+    """대상 모듈의 누적 시간(μs)과 그 모듈이 끌어온 하위 임포트 목록
+
+    importtime은 하위 임포트를 부모보다 먼저, 한 단계 더 들여써서 출력한다.
+    """
+    for index, (name, cumulative, depth) in enumerate(entries):
+        if name == module and depth == 0:
+            children = []
+            for child_name, child_cumulative, child_depth in reversed(entries[:index]):
+                if child_depth == 0:
+                    break
+                children.append((child_name, child_cumulative))
+            return cumulative, children
+    raise KeyError(module)
+
+
+def measure_module(module, repeat=5, top=5):
+    """새 인터프리터에서 repeat번 임포트해 누적 시간 중앙값(ms)과 무거운 하위 임포트 반환"""
+    totals, heaviest = [], {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{module} 임포트 실패:\n{proc.stderr[-2000:]}")
+        cumulative, children = module_subtree(parse_importtime(proc.stderr), module)
+        totals.append(cumulative / 1000)
+        for name, child_cumulative in children:
+            heaviest[name] = max(heaviest.get(name, 0), child_cumulative / 1000)
+    top_imports = sorted(heaviest.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "median_ms": round(statistics.median(totals), 2),
+        "min_ms": round(min(totals), 2),
+        "heaviest_imports_ms": {name: round(ms, 2) for name, ms in top_imports},
+    }
+
+
+def check_regressions(results, baseline):
+    """기준값 대비 허용치를 넘은 모듈 목록"""
+    regressions = []
+    for module, result in results.items():
+        base = baseline.get(module)
+        if not base:
+            continue
+        limit = max(base["median_ms"] * TOLERANCE_RATIO, base["median_ms"] + TOLERANCE_MS)
+        if result["median_ms"] > limit:
+            regressions.append(f"{module}: {result['median_ms']}ms (기준 {base['median_ms']}ms, 허용 {limit:.1f}ms)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈 임포트 시간 벤치마크")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="결과를 기준값으로 저장")
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀 검사")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    results = {module: measure_module(module, args.repeat) for module in args.modules}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ 기준값 저장: {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ 기준값 파일이 없습니다: {args.baseline}")
+            return 1
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = check_regressions(results, json.load(f))
+        if regressions:
+            print("❌ 임포트 시간 회귀:\n" + "\n".join(regressions))
+            return 1
+        print("✅ 임포트 시간 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,21 @@ main_app.py
 Streamlit 통합 실행 파일
 
 프로세스:
-1. PDF 업로드
+1. PDF / 이미지(JPG, PNG) 업로드
 2. Vision OCR → 텍스트 추출
 3. Gemini 교정 → 교정 결과 출력
 ----------------------------------
 """
 
 import streamlit as st
-from src.vision_ocr import run_ocr_pipeline
-from src.spell_corrector import correct_text
+from src.clients import client_setup_stats
+from src.gcs_cleanup import cleanup_stats
+from src.telemetry import export_prometheus, metrics_snapshot
+from src.job_queue import AdmissionError
+from src.session_jobs import FAILED, get_job_store
+from src.spell_corrector import SELECTIVE_MODES
+
+JOB_POLL_INTERVAL = 0.5  # 백그라운드 작업 진행 상황 갱신 간격 (초)
 
 # -------------------------------------------------------
 # 🎨 UI 기본 설정
@@ -21,43 +27,140 @@ st.set_page_config(page_title="AI OCR + 맞춤법 교정기", page_icon="🧠",
 st.title("🧾 AI OCR + 맞춤법 교정기 (Google Vision + Gemini)")
 
 st.markdown("""
-이 앱은 PDF에서 문서를 자동으로 읽고  
+이 앱은 PDF나 이미지(JPG/PNG)에서 문서를 자동으로 읽고  
 Google Gemini를 사용해 **맞춤법 교정 / 문장 다듬기 / 요약 / 번역**을 수행합니다. ✨
 """)
 
 # -------------------------------------------------------
 # 📂 파일 업로드
 # -------------------------------------------------------
-uploaded_file = st.file_uploader("📤 PDF 파일 업로드", type=["pdf"])
+uploaded_file = st.file_uploader("📤 PDF / 이미지 파일 업로드", type=["pdf", "png", "jpg", "jpeg"])
+
+# -------------------------------------------------------
+# ⏱ 백그라운드 작업 진행 상황 표시
+# -------------------------------------------------------
+def watch(job, render_progress):
+    """job이 끝날 때까지 JOB_POLL_INTERVAL마다 진행 상황 부분만 다시 그리고, 끝나면 전체 화면을 다시 그린다"""
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def progress():
+        if job.running:
+            render_progress(job)
+        else:
+            st.rerun()
+
+    progress()
+
+
+def render_ocr_progress(job):
+    if job.position is not None:
+        st.info(f"⏳ 작업 대기 중입니다... (앞에 {job.position}건)")
+        return
+    pages = job.pages()
+    count = job.page_count
+    st.info("📘 파일 업로드 완료 — OCR을 진행 중입니다...")
+    st.caption(f"📄 {count}페이지 수신 | {count / max(job.elapsed, 1e-6):.1f} 페이지/초")
+    if pages:
+        st.text("\n".join(page.text for page in pages))
+
+
+def render_correction_progress(correction):
+    if correction.position is not None:
+        st.info(f"⏳ 교정 작업 대기 중입니다... (앞에 {correction.position}건)")
+        return
+    st.info("Gemini가 교정 중입니다... ⏳")
+    if correction.text:
+        # 스트리밍으로 받은 만큼 결과 칸을 채운다 — 체감 대기 시간은 첫 토큰까지의 시간
+        st.text_area("💬 교정 결과", correction.text + " ▌", height=250, disabled=True)
+
+
+def render_correction(correction):
+    if correction.running:
+        watch(correction, render_correction_progress)
+    elif correction.status == FAILED:
+        # 오류 메시지를 교정 결과 자리에 보여 주지 않는다
+        st.error(correction.error)
+    else:
+        stats = correction.stats or {}
+        if stats.get("selective"):
+            st.success(f"✅ 교정 완료! ({correction.elapsed:.1f}초)")
+            st.caption(
+                f"🎯 {stats['sentences']}문장 중 {stats['spans']}개 구간만 교정"
+                f" (전체 글자의 {stats['selected_ratio'] * 100:.0f}%)"
+            )
+        else:
+            st.success(
+                f"✅ 교정 완료! (첫 응답 {correction.first_token_seconds or 0:.1f}초, 전체 {correction.elapsed:.1f}초)"
+            )
+        st.text_area("💬 교정 결과", correction.text, height=250)
+
 
 # -------------------------------------------------------
 # 🧾 OCR 실행 및 결과 표시
 # -------------------------------------------------------
 if uploaded_file:
-    st.info("📘 PDF 업로드 완료 — OCR을 시작합니다...")
-    extracted_text = run_ocr_pipeline(uploaded_file)
-
-    if extracted_text:
-        st.success("✅ OCR 완료! 추출된 텍스트가 아래에 표시됩니다.")
-        st.text_area("📜 OCR 결과", extracted_text, height=250)
-
-        # -------------------------------------------------------
-        # ✍️ Gemini 교정 단계
-        # -------------------------------------------------------
-        st.subheader("✏️ Gemini 맞춤법 및 문장 교정")
-
-        mode = st.selectbox(
-            "원하는 교정 모드를 선택하세요:",
-            ["맞춤법 교정", "문장 자연스럽게 다듬기", "요약하기", "영어 번역"]
-        )
-
-        if st.button("🚀 교정 실행"):
-            with st.spinner("Gemini가 교정 중입니다... ⏳"):
-                result = correct_text(extracted_text, mode)
-                st.success("✅ 교정 완료!")
-                st.text_area("💬 교정 결과", result, height=250)
-    else:
-        st.error("❌ OCR에서 텍스트를 추출하지 못했습니다. 로그를 확인하세요.")
+    # 위젯을 조작해 스크립트가 다시 실행돼도 같은 파일이면 세션에 저장된 작업을 그대로 사용
+    store = get_job_store()
+    try:
+        job = store.document_job(uploaded_file)
+    except AdmissionError as e:
+        # 작업 큐가 가득 찼거나 이 세션의 동시 작업 수를 넘음 — 다시 실행하면 다시 시도한다
+        st.warning(f"🚦 {e}")
+        job = None
+
+    if job is not None:
+        if job.running:
+            watch(job, render_ocr_progress)
+        elif job.status == FAILED:
+            st.error(f"❌ OCR 실패: {job.error}")
+            if st.button("🔁 다시 시도"):
+                store.discard(job)
+                st.rerun()
+        elif job.document.text:
+            document = job.document
+            st.success(
+                f"✅ OCR 완료! 추출된 텍스트가 아래에 표시됩니다. ({len(document.pages)}페이지, {job.elapsed:.1f}초)"
+            )
+            st.text_area("📜 OCR 결과", document.text, height=250)
+
+            # -------------------------------------------------------
+            # ✍️ Gemini 교정 단계
+            # -------------------------------------------------------
+            st.subheader("✏️ Gemini 맞춤법 및 문장 교정")
+
+            mode = st.selectbox(
+                "원하는 교정 모드를 선택하세요:",
+                ["맞춤법 교정", "문장 자연스럽게 다듬기", "요약하기", "영어 번역"]
+            )
+
+            selective = mode in SELECTIVE_MODES and st.checkbox(
+                "🎯 인식 신뢰도가 낮은 문장만 교정 (토큰 / 대기 시간 절약)", value=True,
+            )
+
+            if st.button("🚀 교정 실행"):
+                try:
+                    job.start_correction(mode, selective)
+                except AdmissionError as e:
+                    st.warning(f"🚦 {e}")
+
+            # 모드별 교정 결과는 세션에 남으므로 모드를 바꿨다 돌아오면 바로 다시 보인다
+            correction = job.correction(mode, selective)
+            if correction is not None:
+                render_correction(correction)
+        else:
+            st.error("❌ OCR에서 텍스트를 추출하지 못했습니다. 로그를 확인하세요.")
+
+# -------------------------------------------------------
+# ⚙️ 클라이언트 재사용 통계
+# -------------------------------------------------------
+with st.expander("⚙️ 클라이언트 생성 시간 / 재사용 횟수"):
+    st.json(client_setup_stats())
+
+with st.expander("🧹 GCS 임시 파일 정리 통계"):
+    st.json(cleanup_stats())
+
+with st.expander("📈 단계별 소요 시간 / 처리량 지표"):
+    st.json(metrics_snapshot())
+    st.download_button("⬇️ Prometheus 형식으로 내려받기", export_prometheus(), file_name="ocr_metrics.prom")
 
 # -------------------------------------------------------
 # 🧩 Footer
@@ -0,0 +1,123 @@
+"""
+clients.py
+----------------------------------
+프로세스 공용 Google 클라이언트 레지스트리
+
+기능 요약:
+1. 서비스 계정 인증 정보, GCS / Vision 클라이언트, Gemini 모델을 한 번만 생성
+2. Streamlit 재실행과 세션 사이에서 gRPC / HTTP 연결 재사용
+3. 클라이언트별 생성 시간 및 재사용 횟수 통계 제공
+----------------------------------
+"""
+
+import threading
+import time
+
+_registry = {}
+_stats = {}
+_lock = threading.RLock()  # 클라이언트 생성 중 다른 클라이언트(인증 정보 등)를 조회할 수 있음
+
+
+def _get_or_create(name, factory):
+    """name으로 등록된 객체를 반환하고, 없으면 factory()로 한 번만 생성"""
+    with _lock:
+        if name in _registry:
+            _stats[name]["reuses"] += 1
+            return _registry[name]
+        started = time.perf_counter()
+        value = factory()
+        _registry[name] = value
+        _stats[name] = {
+            "setup_seconds": time.perf_counter() - started,
+            "created_at": time.time(),
+            "reuses": 0,
+        }
+        return value
+
+
+def get_gcp_credentials():
+    """서비스 계정 정보(st.secrets 또는 JSON 파일)로 인증 정보 생성 — 없으면 기본 인증 사용"""
+    def factory():
+        from src.config import load_service_account_info
+
+        raw_info = load_service_account_info()
+        if raw_info is None:
+            import google.auth
+            credentials, _ = google.auth.default()
+            return credentials
+
+        from google.oauth2 import service_account
+        return service_account.Credentials.from_service_account_info(raw_info)
+
+    return _get_or_create("gcp_credentials", factory)
+
+
+def get_storage_client():
+    def factory():
+        from google.cloud import storage
+        return storage.Client(credentials=get_gcp_credentials())
+
+    return _get_or_create("storage_client", factory)
+
+
+def get_bucket(bucket_name):
+    """버킷 핸들 — 존재 확인(reload)은 처음 한 번만 수행"""
+    def factory():
+        bucket = get_storage_client().bucket(bucket_name)
+        bucket.reload()
+        return bucket
+
+    return _get_or_create(f"bucket:{bucket_name}", factory)
+
+
+def get_vision_client():
+    def factory():
+        from google.cloud import vision
+        return vision.ImageAnnotatorClient(credentials=get_gcp_credentials())
+
+    return _get_or_create("vision_client", factory)
+
+
+def get_logging_client():
+    def factory():
+        import google.cloud.logging_v2 as logging_v2
+        return logging_v2.Client(credentials=get_gcp_credentials())
+
+    return _get_or_create("logging_client", factory)
+
+
+def get_gemini_model(api_key, model_name):
+    """API 키 설정 후 Gemini 모델 객체 반환 (키/모델 조합마다 한 번만 생성)"""
+    def factory():
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model_name)
+
+    return _get_or_create(gemini_client_name(api_key, model_name), factory)
+
+
+def gemini_client_name(api_key, model_name):
+    return f"gemini:{model_name}:{hash(api_key)}"
+
+
+def install_client(name, value):
+    """name 자리에 이미 만든 객체를 등록 (오프라인 벤치마크의 가짜 클라이언트 등)
+
+    name은 "storage_client", "vision_client", "bucket:<버킷>", gemini_client_name(...) 형식.
+    """
+    with _lock:
+        _registry[name] = value
+        _stats[name] = {"setup_seconds": 0.0, "created_at": time.time(), "reuses": 0}
+
+
+def client_setup_stats():
+    """클라이언트별 생성 소요 시간(초)과 재사용 횟수"""
+    with _lock:
+        return {name: dict(stat) for name, stat in _stats.items()}
+
+
+def reset_clients():
+    """등록된 클라이언트를 모두 버린다 (인증 정보 교체 등)"""
+    with _lock:
+        _registry.clear()
+        _stats.clear()
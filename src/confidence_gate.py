@@ -0,0 +1,151 @@
+"""
+confidence_gate.py
+----------------------------------
+선택적 교정 대상 선별 모듈 (OCR 단어 신뢰도 기반)
+
+기능 요약:
+1. OcrDocument 전체 텍스트를 문장 단위로 나누고 단어 위치를 문장에 대응
+2. 신뢰도가 낮은 단어나 사전에 없는 단어가 있는 문장만 교정 대상으로 선별
+   (연속된 대상 문장은 토큰 예산 안에서 하나로 합치고 앞뒤 문맥을 함께 전달)
+3. 교정 결과를 원문의 해당 위치에만 다시 끼워 넣기
+----------------------------------
+"""
+
+from collections import namedtuple
+import bisect
+import functools
+import os
+import re
+
+from src.text_chunker import CHUNK_TOKEN_BUDGET, estimate_tokens
+
+LOW_CONFIDENCE_THRESHOLD = float(os.environ.get("OCR_LOW_CONFIDENCE", 0.85))
+CONTEXT_CHARS = int(os.environ.get("SELECTIVE_CONTEXT_CHARS", 150))
+DICTIONARY_PATH = os.environ.get("SPELLCHECK_DICTIONARY")  # 한 줄에 단어 하나인 사전 파일 (선택)
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。])\s+|\n[ \t]*\n+")
+TOKEN = re.compile(r"[가-힣]+|[A-Za-z]+")
+# 사전 조회 전에 떼어 보는 흔한 조사 (긴 것부터)
+_PARTICLES = sorted(
+    ["은", "는", "이", "가", "을", "를", "에", "의", "도", "와", "과", "만", "로", "으로", "에서",
+     "에게", "한테", "까지", "부터", "께서", "이다", "입니다"],
+    key=len, reverse=True,
+)
+
+# start/end: 원문 내 위치, before/after: 참고용 앞뒤 문맥, reasons: 선별 이유
+Span = namedtuple("Span", ["start", "end", "before", "after", "reasons"])
+
+
+def sentence_spans(text):
+    """문장마다 앞뒤 공백을 뺀 (시작, 끝) 위치 목록"""
+    spans, start = [], 0
+    for match in [*SENTENCE_BOUNDARY.finditer(text), None]:
+        end = match.start() if match else len(text)
+        piece = text[start:end]
+        if piece.strip():
+            lead = len(piece) - len(piece.lstrip())
+            spans.append((start + lead, start + len(piece.rstrip())))
+        if match:
+            start = match.end()
+    return spans
+
+
+def word_positions(document):
+    """문서 전체 텍스트(document.text) 기준 (시작, 끝, 단어 텍스트, 신뢰도) 생성
+
+    페이지 텍스트에서 단어를 앞에서부터 차례로 찾아 위치를 정한다 (찾지 못한 단어는 건너뜀).
+    """
+    offset = 0
+    for page in document.pages:
+        cursor = 0
+        for word in page.iter_words():
+            if not word.text:
+                continue
+            index = page.text.find(word.text, cursor)
+            if index < 0:
+                continue
+            cursor = index + len(word.text)
+            yield offset + index, offset + cursor, word.text, word.confidence
+        offset += len(page.text) + 1  # 페이지 사이 줄바꿈
+
+
+def has_word_confidence(document):
+    """단어 신뢰도가 있는 문서인지 (텍스트만 있는 엔진 결과면 False)"""
+    return any(word.confidence is not None for page in document.pages for word in page.iter_words())
+
+
+@functools.lru_cache(maxsize=4)
+def load_dictionary(path=DICTIONARY_PATH):
+    """사전 파일 → 단어 집합 (경로가 없으면 None)"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+
+def is_dictionary_miss(token, dictionary):
+    """사전에 없는 단어인지 — 한글은 끝의 조사를 떼어 한 번 더 확인"""
+    if token in dictionary or token.lower() in dictionary:
+        return False
+    for particle in _PARTICLES:
+        if token.endswith(particle) and token[:-len(particle)] in dictionary:
+            return False
+    return True
+
+
+def find_suspicious_spans(document, threshold=LOW_CONFIDENCE_THRESHOLD, dictionary=None,
+                          context_chars=CONTEXT_CHARS, budget=CHUNK_TOKEN_BUDGET):
+    """교정이 필요한 문장 구간 → (전체 텍스트, Span 목록, 전체 문장 수)"""
+    text = document.text
+    sentences = sentence_spans(text)
+    starts = [start for start, _ in sentences]
+    reasons = {}
+
+    def flag(position, reason):
+        index = bisect.bisect_right(starts, position) - 1
+        if index >= 0 and position < sentences[index][1]:
+            reasons.setdefault(index, set()).add(reason)
+
+    for start, _, _, confidence in word_positions(document):
+        if confidence is not None and confidence < threshold:
+            flag(start, "low_confidence")
+    if dictionary:
+        for index, (start, end) in enumerate(sentences):
+            for match in TOKEN.finditer(text, start, end):
+                if is_dictionary_miss(match.group(), dictionary):
+                    reasons.setdefault(index, set()).add("dictionary_miss")
+                    break
+
+    # 연속된 대상 문장은 토큰 예산을 넘지 않는 만큼 한 구간으로 합쳐 한 번에 교정한다
+    spans, group = [], []
+    for index in sorted(reasons):
+        adjacent = group and index == group[-1] + 1
+        if group and not (adjacent and estimate_tokens(text[sentences[group[0]][0]:sentences[index][1]]) <= budget):
+            spans.append(_make_span(text, sentences, group, reasons, context_chars))
+            group = []
+        group.append(index)
+    if group:
+        spans.append(_make_span(text, sentences, group, reasons, context_chars))
+    return text, spans, len(sentences)
+
+
+def _make_span(text, sentences, group, reasons, context_chars):
+    start, end = sentences[group[0]][0], sentences[group[-1]][1]
+    return Span(
+        start,
+        end,
+        text[max(0, start - context_chars):start],
+        text[end:end + context_chars],
+        sorted(set().union(*(reasons[index] for index in group))),
+    )
+
+
+def splice(text, spans, outputs):
+    """교정 결과를 원문의 각 구간 위치에 끼워 넣은 텍스트"""
+    pieces, cursor = [], 0
+    for span, output in zip(spans, outputs):
+        pieces.append(text[cursor:span.start])
+        pieces.append(output.strip())
+        cursor = span.end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
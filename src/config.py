@@ -0,0 +1,67 @@
+"""
+config.py
+----------------------------------
+인증 정보 / 비밀 값 로더 (Streamlit 유무와 무관)
+
+기능 요약:
+1. Streamlit 실행 중이면 st.secrets에서 읽기
+2. 헤드리스(배치) 실행이면 환경 변수 / 서비스 계정 JSON 파일에서 읽기
+3. Streamlit 세션 / 스크립트 스레드 여부 확인
+----------------------------------
+"""
+
+import json
+import os
+
+
+def in_streamlit():
+    """`streamlit run`으로 실행 중인지 확인"""
+    try:
+        from streamlit import runtime
+        return runtime.exists()
+    except ImportError:
+        return False
+
+
+def in_script_thread():
+    """Streamlit 스크립트 스레드인지 (세션 상태에 접근 가능한지) — 백그라운드 작업 스레드면 False"""
+    if not in_streamlit():
+        return False
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def _secret_section(name):
+    """st.secrets의 섹션을 dict로 반환 — 없으면 None"""
+    try:
+        import streamlit as st
+        return dict(st.secrets[name])
+    except (ImportError, KeyError, FileNotFoundError):
+        return None
+
+
+def load_service_account_info():
+    """서비스 계정 정보 dict — st.secrets → GCP_SERVICE_ACCOUNT_FILE / GOOGLE_APPLICATION_CREDENTIALS 순
+
+    어디에도 없으면 None (애플리케이션 기본 인증 사용).
+    """
+    raw_info = _secret_section("gcp_service_account")
+    if raw_info is None:
+        path = os.environ.get("GCP_SERVICE_ACCOUNT_FILE") or os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        if not path:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            raw_info = json.load(f)
+    raw_info["private_key"] = raw_info["private_key"].replace("\\n", "\n")
+    return raw_info
+
+
+def get_gemini_api_key():
+    """Gemini API 키 — st.secrets[gemini][api_key] → GEMINI_API_KEY 환경 변수 순, 없으면 KeyError"""
+    section = _secret_section("gemini")
+    if section and section.get("api_key"):
+        return section["api_key"]
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if api_key:
+        return api_key
+    raise KeyError("gemini.api_key")
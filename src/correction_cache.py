@@ -0,0 +1,155 @@
+"""
+correction_cache.py
+----------------------------------
+Gemini 교정 결과 캐시 모듈
+
+기능 요약:
+1. (정규화된 입력 조각 해시, 모드, 모델, 프롬프트 버전, 참고용 앞뒤 문맥)으로 캐시 키 생성
+2. 메모리 LRU + 선택적 디스크(SQLite) 저장소, 둘 다 TTL 적용
+3. 조각 단위로 저장하므로 한 문단만 바뀌면 그 문단만 다시 교정
+----------------------------------
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from src.ocr_cache import DEFAULT_CACHE_DIR
+from src.telemetry import record_cache
+
+MEMORY_MAX_ENTRIES = int(os.environ.get("CORRECTION_CACHE_MAX_ENTRIES", 2048))
+CACHE_TTL_SECONDS = float(os.environ.get("CORRECTION_CACHE_TTL", 7 * 24 * 3600))
+DISK_CACHE_ENABLED = os.environ.get("CORRECTION_CACHE_DISK", "1") != "0"
+
+
+def normalize_text(text):
+    """캐시 키용 정규화 — 유니코드 NFC, 줄 끝 공백 제거, 연속 공백 축약"""
+    text = unicodedata.normalize("NFC", text)
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.strip().splitlines()]
+    return "\n".join(lines)
+
+
+def _text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def make_correction_key(text, mode, model_name, prompt_version, context="", following=""):
+    """프롬프트에 들어가는 참고용 문맥도 키에 포함 — 문맥이 바뀌면 결과도 달라질 수 있다"""
+    raw = f"{_text_hash(text)}|{mode}|{model_name}|{prompt_version}"
+    if context or following:
+        raw += f"|{_text_hash(context)}|{_text_hash(following)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CorrectionCache:
+    """메모리 LRU + 디스크 TTL 2단 교정 결과 캐시"""
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS,
+                 cache_dir=DEFAULT_CACHE_DIR, use_disk=DISK_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key → (저장 시각, 결과)
+        self._lock = threading.Lock()
+        self.db_path = None
+        if use_disk:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.db_path = os.path.join(cache_dir, "corrections.sqlite3")
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS corrections ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " created REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _expired(self, created):
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                record_cache("correction", hit=True)
+                return entry[1]
+            self._memory.pop(key, None)
+
+            if self.db_path:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT value, created FROM corrections WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and self._expired(row[1]):
+                        conn.execute("DELETE FROM corrections WHERE key = ?", (key,))
+                        row = None
+                if row is not None:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    record_cache("correction", hit=True)
+                    return row[0]
+
+            self.misses += 1
+            record_cache("correction", hit=False)
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self.db_path:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO corrections (key, value, created) VALUES (?, ?, ?)",
+                        (key, value, now),
+                    )
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self):
+        """디스크에서 TTL이 지난 항목 삭제 후 삭제 개수 반환"""
+        if not self.db_path or self.ttl <= 0:
+            return 0
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM corrections WHERE created < ?", (time.time() - self.ttl,)
+            )
+            return cur.rowcount
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk": bool(self.db_path),
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_correction_cache():
+    """프로세스 공용 교정 캐시 인스턴스 반환"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CorrectionCache()
+        return _default_cache
@@ -0,0 +1,173 @@
+"""
+gcs_cleanup.py
+----------------------------------
+GCS 작업 산출물 정리 모듈
+
+기능 요약:
+1. 결과를 모두 받은 작업의 업로드 PDF(uploads/)와 결과 JSON(ocr_results/<작업>/)을 배치 삭제
+2. 정리되지 못한 오래된 객체(중단된 작업 등)를 주기적으로 쓸어 담는 스위퍼
+3. 삭제한 객체 수 / 회수한 바이트 수 통계 (배치 응답에서 실제로 지워진 객체만 집계, 실패는 경고로 기록)
+
+사용 예 (cron 등에서 한 번만 실행):
+    python -m src.gcs_cleanup --max-age-hours 6
+----------------------------------
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import datetime
+import logging
+import os
+import sys
+import threading
+
+CLEANUP_ENABLED = os.environ.get("OCR_GCS_CLEANUP", "1") != "0"
+ORPHAN_MAX_AGE_HOURS = float(os.environ.get("OCR_GCS_ORPHAN_MAX_AGE_HOURS", 6))
+SWEEP_INTERVAL = float(os.environ.get("OCR_GCS_SWEEP_INTERVAL", 3600))  # 초, 0이면 주기 정리 안 함
+SWEEP_PREFIXES = ("uploads/", "ocr_results/")
+DELETE_BATCH_SIZE = 100  # GCS 배치 요청 1회당 최대 호출 수
+
+logger = logging.getLogger("gcs_cleanup")
+
+_stats = {
+    "jobs_cleaned": 0, "sweeps": 0, "objects_deleted": 0, "bytes_reclaimed": 0, "failures": 0, "delete_failures": 0,
+}
+_stats_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gcs-cleanup")
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def _record(**counts):
+    with _stats_lock:
+        for key, value in counts.items():
+            _stats[key] += value
+
+
+def cleanup_stats():
+    """누적 정리 통계 (작업 수, 스윕 수, 삭제 객체 수, 회수 바이트 수, 실패 수, 객체 삭제 실패 수)"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _delete_batched(bucket, blobs):
+    """Blob 목록을 DELETE_BATCH_SIZE개씩 배치 요청으로 삭제 → 실제로 지워진 (Blob, 크기) 목록
+
+    요청별 응답 상태를 확인해, 이미 지워진 객체(404)는 조용히 건너뛰고 그 밖의 실패는 경고로 남긴다
+    (남은 객체는 스위퍼가 다시 시도한다).
+    """
+    blobs = list(blobs)
+    deleted, failed = [], 0
+    for start in range(0, len(blobs), DELETE_BATCH_SIZE):
+        chunk = blobs[start:start + DELETE_BATCH_SIZE]
+        sizes = [blob.size or 0 for blob in chunk]
+        with bucket.client.batch(raise_exception=False) as batch:
+            for blob in chunk:
+                blob.delete()
+        # raise_exception=False이면 요청별 응답(상태 코드)이 순서대로 batch._responses에 남는다
+        for blob, size, response in zip(chunk, sizes, batch._responses):
+            if 200 <= response.status_code < 300:
+                deleted.append((blob, size))
+            elif response.status_code != 404:
+                failed += 1
+                logger.warning(f"⚠️ 객체 삭제 실패 ({blob.name}): HTTP {response.status_code}")
+    if failed:
+        _record(delete_failures=failed)
+    return deleted
+
+
+def delete_blobs(bucket, blobs):
+    """Blob 목록을 배치 요청으로 삭제 → (실제로 삭제한 객체 수, 회수 바이트 수)"""
+    deleted = _delete_batched(bucket, blobs)
+    return len(deleted), sum(size for _, size in deleted)
+
+
+def cleanup_job(bucket, upload_name=None, result_prefix=None, upload_size=None):
+    """작업 1건의 업로드 파일과 결과 JSON 삭제 → (삭제 객체 수, 회수 바이트 수)"""
+    blobs = list(bucket.list_blobs(prefix=result_prefix)) if result_prefix else []
+    if upload_name:
+        blobs.append(bucket.blob(upload_name))
+    deleted = _delete_batched(bucket, blobs)
+    objects = len(deleted)
+    # 업로드 파일은 목록 조회 없이 만들었으므로 (크기 정보 없음) 지워졌을 때 업로드할 때 확인한 크기를 더한다
+    reclaimed = sum(
+        (upload_size or 0) if blob.name == upload_name else size for blob, size in deleted
+    )
+    _record(jobs_cleaned=1, objects_deleted=objects, bytes_reclaimed=reclaimed)
+    return objects, reclaimed
+
+
+def _cleanup_job_safely(bucket, upload_name, result_prefix, upload_size):
+    try:
+        objects, reclaimed = cleanup_job(bucket, upload_name, result_prefix, upload_size)
+        logger.info(f"🧹 작업 정리: {result_prefix} — {objects}개, {reclaimed / 1024:.0f}KB 회수")
+    except Exception as e:
+        # 남은 객체는 스위퍼가 나중에 정리하므로 실패는 기록만 한다
+        _record(failures=1)
+        logger.warning(f"⚠️ 작업 정리 실패 ({result_prefix}): {e}")
+
+
+def schedule_job_cleanup(bucket, upload_name=None, result_prefix=None, upload_size=None):
+    """결과를 모두 받은 작업의 정리를 백그라운드로 예약 (호출자는 기다리지 않음)"""
+    if not CLEANUP_ENABLED:
+        return None
+    start_sweeper(bucket)
+    return _executor.submit(_cleanup_job_safely, bucket, upload_name, result_prefix, upload_size)
+
+
+def sweep_orphans(bucket, max_age_hours=ORPHAN_MAX_AGE_HOURS, prefixes=SWEEP_PREFIXES):
+    """prefix 아래에서 max_age_hours보다 오래된 객체 삭제 → (삭제 객체 수, 회수 바이트 수)"""
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=max_age_hours)
+    stale = [
+        blob
+        for prefix in prefixes
+        for blob in bucket.list_blobs(prefix=prefix)
+        if blob.time_created and blob.time_created < cutoff
+    ]
+    objects, reclaimed = delete_blobs(bucket, stale)
+    _record(sweeps=1, objects_deleted=objects, bytes_reclaimed=reclaimed)
+    return objects, reclaimed
+
+
+def _sweep_loop(bucket, interval, stop):
+    while not stop.wait(interval):
+        try:
+            objects, reclaimed = sweep_orphans(bucket)
+            logger.info(f"🧹 오래된 객체 정리: {objects}개, {reclaimed / 1024 / 1024:.1f}MB 회수")
+        except Exception as e:
+            _record(failures=1)
+            logger.warning(f"⚠️ 오래된 객체 정리 실패: {e}")
+
+
+def start_sweeper(bucket, interval=SWEEP_INTERVAL):
+    """프로세스당 한 번 주기 정리 스레드 시작 → 중지용 Event (비활성화 시 None)"""
+    global _sweeper
+    if not CLEANUP_ENABLED or interval <= 0:
+        return None
+    with _sweeper_lock:
+        if _sweeper is None:
+            stop = threading.Event()
+            threading.Thread(
+                target=_sweep_loop, args=(bucket, interval, stop), name="gcs-sweeper", daemon=True,
+            ).start()
+            _sweeper = stop
+        return _sweeper
+
+
+def main(argv=None):
+    from src.clients import get_bucket
+    from src.vision_ocr import BUCKET_NAME
+
+    parser = argparse.ArgumentParser(description="GCS 업로드 / OCR 결과의 오래된 객체 정리")
+    parser.add_argument("--bucket", default=BUCKET_NAME)
+    parser.add_argument("--max-age-hours", type=float, default=ORPHAN_MAX_AGE_HOURS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+    objects, reclaimed = sweep_orphans(get_bucket(args.bucket), args.max_age_hours)
+    logger.info(f"🎉 정리 완료: {objects}개 객체, {reclaimed / 1024 / 1024:.1f}MB 회수")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+gcs_upload.py
+----------------------------------
+GCS 스트리밍 업로드 모듈
+
+기능 요약:
+1. 파일 객체를 임시 파일 / 전체 복사본 없이 재개 가능(resumable) 업로드로 전송
+2. 조각마다 crc32c로 전송 무결성 확인 (GCS 라이브러리)
+----------------------------------
+"""
+
+import os
+
+from src.telemetry import stage
+
+# 재개 가능 업로드 조각 크기 — GCS 요구 사항에 따라 256KB의 배수여야 한다
+UPLOAD_CHUNK_SIZE = int(os.environ.get("OCR_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+_CHUNK_ALIGNMENT = 256 * 1024
+
+
+def upload_stream(bucket, blob_name, stream, content_type="application/pdf", chunk_size=UPLOAD_CHUNK_SIZE):
+    """파일 객체를 현재 위치부터 조각 단위로 GCS에 업로드 → 업로드 바이트 수
+
+    조각 크기를 지정하면 재개 가능 업로드를 사용하므로 메모리에는 조각 하나만 올라간다.
+    캐시 키용 SHA-256은 캐시 조회가 업로드보다 먼저여야 하므로 호출자가 미리 계산한다 (hash_stream).
+    """
+    chunk_size = max(_CHUNK_ALIGNMENT, chunk_size // _CHUNK_ALIGNMENT * _CHUNK_ALIGNMENT)
+    blob = bucket.blob(blob_name, chunk_size=chunk_size)
+    start = stream.tell()
+    with stage("gcs_upload") as span:
+        blob.upload_from_file(stream, content_type=content_type, checksum="crc32c")
+        size = stream.tell() - start
+        span.set(bytes=size)
+    return size
@@ -0,0 +1,220 @@
+"""
+gemini_client.py
+----------------------------------
+Gemini 호출 공용 계층 (요청 수 / 토큰 수 제한 + 재시도)
+
+기능 요약:
+1. 프로세스 공용 토큰 버킷으로 분당 요청 수(GEMINI_RPM)와 분당 토큰 수(GEMINI_TPM)를 함께 제한
+   → 병렬 교정이 한도를 꽉 채우되 넘지 않게 호출 시점을 조절
+2. 재시도 가능한 오류(429 / 5xx / 시간 초과)만 지수 백오프 + 지터로 재시도
+   (429를 받으면 모든 호출자가 잠시 함께 쉬도록 버킷을 비움)
+3. 호출 1회 마감 시간과 전체 재시도 마감 시간, 대기 / 재시도 지표 기록
+4. stream=True 호출로 받은 텍스트 조각을 바로 내보내는 스트리밍 API (첫 토큰까지의 시간 기록)
+----------------------------------
+"""
+
+import os
+import threading
+import time
+
+from src.ocr_completion import backoff_delays
+from src.telemetry import record_stage, stage
+from src.text_chunker import estimate_tokens
+
+GEMINI_RPM = int(os.environ.get("GEMINI_RPM", 60))  # 분당 최대 요청 수 (0이면 제한 없음)
+GEMINI_TPM = int(os.environ.get("GEMINI_TPM", 1_000_000))  # 분당 최대 토큰 수 (입력 + 출력, 0이면 제한 없음)
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", 5))
+GEMINI_CALL_DEADLINE = float(os.environ.get("GEMINI_CALL_DEADLINE", 120))  # 호출 1회 마감 (초)
+GEMINI_RETRY_DEADLINE = float(os.environ.get("GEMINI_RETRY_DEADLINE", 300))  # 재시도 포함 전체 마감 (초)
+QUOTA_COOLDOWN = 5.0  # 429 응답 후 모든 호출자가 쉬는 최소 시간 (초)
+
+
+class TokenBucket:
+    """분당 rate만큼 채워지는 토큰 버킷 (용량 = 1분치)
+
+    acquire()는 토큰을 먼저 예약하고 모자란 만큼만 기다리므로 요청 순서대로 공평하게 배분된다.
+    """
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def reserve(self, amount):
+        """amount만큼 예약 → 기다려야 할 시간(초)"""
+        if self.per_minute <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= min(amount, self.capacity)  # 한 번에 1분치보다 많이 요구해도 영원히 막히지 않게
+            return max(0.0, -self._tokens * 60.0 / self.per_minute)
+
+    def adjust(self, amount):
+        """예약량과 실제 사용량의 차이 반영 (양수면 더 쓴 만큼 차감, 음수면 돌려줌)"""
+        if self.per_minute <= 0 or not amount:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+
+    def drain(self, seconds):
+        """앞으로 seconds 동안 새 예약이 기다리도록 버킷을 비움"""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.per_minute / 60.0)
+
+
+class RateLimiter:
+    """요청 수 버킷 + 토큰 수 버킷"""
+
+    def __init__(self, rpm=GEMINI_RPM, tpm=GEMINI_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def acquire(self, tokens):
+        """요청 1건(추정 tokens개) 예약 후 필요한 만큼 대기 → 대기 시간(초)"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, estimated, actual):
+        self.tokens.adjust(actual - estimated)
+
+    def cooldown(self, seconds):
+        self.requests.drain(seconds)
+
+
+_limiter = RateLimiter()
+
+
+def is_retriable(error):
+    """재시도해도 되는 오류인지 — 한도 초과(429), 서버 오류(5xx), 시간 초과, 연결 오류"""
+    from google.api_core import exceptions
+
+    retriable = (
+        exceptions.TooManyRequests,
+        exceptions.ResourceExhausted,
+        exceptions.InternalServerError,
+        exceptions.BadGateway,
+        exceptions.ServiceUnavailable,
+        exceptions.GatewayTimeout,
+        exceptions.DeadlineExceeded,
+    )
+    return isinstance(error, retriable + (ConnectionError, TimeoutError))
+
+
+def _is_quota_error(error):
+    from google.api_core import exceptions
+
+    return isinstance(error, (exceptions.TooManyRequests, exceptions.ResourceExhausted))
+
+
+def describe_error(error):
+    """사용자에게 보여 줄 오류 메시지 ("❌"로 시작)"""
+    if _is_quota_error(error):
+        return f"❌ Gemini 요청 한도 초과: 재시도 후에도 한도가 풀리지 않았습니다. 잠시 후 다시 시도하세요. (오류: {error})"
+    return f"❌ Gemini API 호출 오류: {error}"
+
+
+def _record_usage(span, response, estimated):
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        span.set(
+            input_tokens=usage.prompt_token_count,
+            output_tokens=usage.candidates_token_count,
+            tokens=usage.total_token_count,
+        )
+        return usage.total_token_count
+    span.set(tokens=estimated)
+    return estimated
+
+
+def _chunk_text(chunk):
+    # 안전 필터 등으로 텍스트 파트가 없는 조각은 .text 접근 시 ValueError
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+def generate(model, prompt, call_deadline=GEMINI_CALL_DEADLINE, retry_deadline=GEMINI_RETRY_DEADLINE,
+             max_retries=GEMINI_MAX_RETRIES, limiter=None):
+    """한도에 맞춰 generate_content 호출 → 응답 텍스트
+
+    재시도할 수 없는 오류이거나 재시도 횟수 / 전체 마감을 넘기면 마지막 오류를 그대로 올린다.
+    """
+    limiter = limiter or _limiter
+    # 교정 / 번역은 출력이 입력 본문과 비슷한 길이이므로 입력 토큰의 2배로 예약하고, 응답 후 실제 사용량으로 정산
+    estimated = estimate_tokens(prompt) * 2
+    end = time.monotonic() + retry_deadline
+    delays = backoff_delays(initial=1.0, max_delay=32.0)
+    for attempt in range(max_retries + 1):
+        with stage("gemini_throttle") as span:
+            span.set(wait_seconds=limiter.acquire(estimated))
+        remaining = end - time.monotonic()
+        try:
+            with stage("gemini_generate", attempt=attempt) as span:
+                response = model.generate_content(
+                    prompt, request_options={"timeout": max(1.0, min(call_deadline, remaining))},
+                )
+                limiter.settle(estimated, _record_usage(span, response, estimated))
+                return response.text
+        except Exception as e:
+            delay = next(delays)
+            if not is_retriable(e) or attempt == max_retries or time.monotonic() + delay >= end:
+                raise
+            if _is_quota_error(e):
+                limiter.cooldown(max(delay, QUOTA_COOLDOWN))
+            with stage("gemini_retry_backoff", attempt=attempt + 1):
+                time.sleep(delay)
+
+
+def generate_stream(model, prompt, call_deadline=GEMINI_CALL_DEADLINE, retry_deadline=GEMINI_RETRY_DEADLINE,
+                    max_retries=GEMINI_MAX_RETRIES, limiter=None):
+    """한도에 맞춰 generate_content(stream=True) 호출 → 받은 텍스트 조각을 차례로 생성
+
+    이미 내보낸 출력은 되돌릴 수 없으므로 첫 조각을 받기 전의 오류만 재시도한다.
+    """
+    limiter = limiter or _limiter
+    estimated = estimate_tokens(prompt) * 2
+    end = time.monotonic() + retry_deadline
+    delays = backoff_delays(initial=1.0, max_delay=32.0)
+    for attempt in range(max_retries + 1):
+        with stage("gemini_throttle") as span:
+            span.set(wait_seconds=limiter.acquire(estimated))
+        remaining = end - time.monotonic()
+        streamed = False
+        try:
+            with stage("gemini_generate", attempt=attempt, streaming=True) as span:
+                started = time.perf_counter()
+                response = model.generate_content(
+                    prompt, stream=True, request_options={"timeout": max(1.0, min(call_deadline, remaining))},
+                )
+                for chunk in response:
+                    text = _chunk_text(chunk)
+                    if not text:
+                        continue
+                    if not streamed:
+                        streamed = True
+                        record_stage("gemini_first_token", time.perf_counter() - started, attempt=attempt)
+                    yield text
+                limiter.settle(estimated, _record_usage(span, response, estimated))
+                return
+        except Exception as e:
+            delay = next(delays)
+            if streamed or not is_retriable(e) or attempt == max_retries or time.monotonic() + delay >= end:
+                raise
+            if _is_quota_error(e):
+                limiter.cooldown(max(delay, QUOTA_COOLDOWN))
+            with stage("gemini_retry_backoff", attempt=attempt + 1):
+                time.sleep(delay)
@@ -0,0 +1,247 @@
+"""
+job_queue.py
+----------------------------------
+OCR / 교정 작업 큐 (SQLite, 여러 프로세스 공유)
+
+기능 요약:
+1. 웹 서버(Streamlit)는 작업을 큐에 넣고 상태만 조회, 실제 OCR / 교정은 작업자 프로세스(job_worker)가 수행
+2. 받아들이기 제한: 큐 전체 대기 작업 수 상한, 사용자별 동시 작업 수 상한 → 넘으면 AdmissionError
+3. 작업 상태 API — 상태 / 진행률(받은 페이지 수, 스트리밍 중인 교정 텍스트) / 대기 순번 / 소요 시간
+4. 멈춘 작업(작업자 종료 등) 재대기, 오래된 완료 작업과 입력 파일 정리
+----------------------------------
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+from src.ocr_cache import DEFAULT_CACHE_DIR
+
+JOB_QUEUE_DIR = os.environ.get("JOB_QUEUE_DIR", os.path.join(DEFAULT_CACHE_DIR, "jobs"))
+MAX_QUEUE_DEPTH = int(os.environ.get("JOB_MAX_QUEUE_DEPTH", 100))  # 대기 중인 작업 수 상한
+MAX_JOBS_PER_USER = int(os.environ.get("JOB_MAX_PER_USER", 2))  # 사용자별 대기 + 실행 중 작업 수 상한
+STALE_AFTER = float(os.environ.get("JOB_STALE_SECONDS", 120))  # 이 시간 동안 heartbeat가 없으면 멈춘 작업
+MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 2))
+RETENTION_HOURS = float(os.environ.get("JOB_RETENTION_HOURS", 24))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class AdmissionError(RuntimeError):
+    """큐가 가득 찼거나 사용자별 동시 작업 수를 넘어 작업을 받지 않음"""
+
+
+class JobQueue:
+    """SQLite 작업 큐 — 입력 파일은 queue_dir/inputs/에, 작업 메타데이터 / 결과는 jobs.sqlite3에 저장"""
+
+    def __init__(self, queue_dir=JOB_QUEUE_DIR, max_depth=MAX_QUEUE_DEPTH, max_per_user=MAX_JOBS_PER_USER):
+        self.queue_dir = queue_dir
+        self.input_dir = os.path.join(queue_dir, "inputs")
+        os.makedirs(self.input_dir, exist_ok=True)
+        self.db_path = os.path.join(queue_dir, "jobs.sqlite3")
+        self.max_depth = max_depth
+        self.max_per_user = max_per_user
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " user_id TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " progress TEXT,"
+                " result BLOB,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " worker TEXT,"
+                " created REAL NOT NULL,"
+                " started REAL,"
+                " finished REAL,"
+                " heartbeat REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(user_id, status)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ------------------------------------------------------------------
+    # 웹 서버 쪽 API
+    # ------------------------------------------------------------------
+    def submit(self, kind, user_id, payload, input_bytes=None):
+        """작업 등록 → 작업 ID (받아들일 수 없으면 AdmissionError)
+
+        input_bytes는 작업자 프로세스가 읽을 수 있도록 입력 폴더에 파일로 저장한다.
+        """
+        job_id = uuid.uuid4().hex
+        payload = dict(payload)
+        if input_bytes is not None:
+            path = os.path.join(self.input_dir, job_id)
+            with open(path, "wb") as f:
+                f.write(input_bytes)
+            payload["input_path"] = path
+
+        conn = self._connect()
+        try:
+            # 두 웹 서버 프로세스가 동시에 검사를 통과하지 않도록 검사와 등록을 한 쓰기 트랜잭션으로 묶는다
+            conn.execute("BEGIN IMMEDIATE")
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if queued >= self.max_depth:
+                raise AdmissionError(f"대기 중인 작업이 너무 많습니다 ({queued}/{self.max_depth}). 잠시 후 다시 시도하세요.")
+            active = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE user_id = ? AND status IN (?, ?)", (user_id, *ACTIVE_STATUSES),
+            ).fetchone()[0]
+            if active >= self.max_per_user:
+                raise AdmissionError(
+                    f"동시에 진행할 수 있는 작업은 {self.max_per_user}개입니다. 진행 중인 작업이 끝난 뒤 다시 시도하세요."
+                )
+            conn.execute(
+                "INSERT INTO jobs (id, kind, user_id, status, payload, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, QUEUED, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self._remove_input(payload)
+            raise
+        finally:
+            conn.close()
+        return job_id
+
+    def status(self, job_id):
+        """작업 상태 dict — 없는 작업이면 None
+
+        status / progress(작업자가 보고한 진행 상황) / error / position(대기 순번, 0부터) /
+        queued_seconds / run_seconds 를 담는다. 결과 본문은 result()로 따로 가져온다.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, progress, error, attempts, created, started, finished FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row["status"] == QUEUED:
+                position = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created < ?", (QUEUED, row["created"]),
+                ).fetchone()[0]
+        now = time.time()
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": json.loads(row["progress"]) if row["progress"] else {},
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "position": position,
+            "queued_seconds": (row["started"] or now) - row["created"],
+            "run_seconds": (row["finished"] or now) - row["started"] if row["started"] else 0.0,
+        }
+
+    def result(self, job_id):
+        """완료된 작업의 결과 바이트 — 아직 없으면 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ? AND status = ?", (job_id, DONE)).fetchone()
+        return row["result"] if row else None
+
+    def stats(self):
+        """상태별 작업 수"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    # ------------------------------------------------------------------
+    # 작업자 쪽 API
+    # ------------------------------------------------------------------
+    def claim(self, worker):
+        """가장 오래 기다린 작업 1건을 실행 중으로 바꾸고 (작업 ID, 종류, payload) 반환 — 없으면 None"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started = ?, heartbeat = ?, attempts = attempts + 1"
+                " WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1) AND status = ?"
+                " RETURNING id, kind, payload",
+                (RUNNING, worker, now, now, QUEUED, QUEUED),
+            ).fetchone()
+        if row is None:
+            return None
+        return row["id"], row["kind"], json.loads(row["payload"])
+
+    def report_progress(self, job_id, **progress):
+        """진행 상황 기록 (heartbeat 겸용)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, heartbeat = ? WHERE id = ?",
+                (json.dumps(progress, ensure_ascii=False), time.time(), job_id),
+            )
+
+    def heartbeat(self, job_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+
+    def complete(self, job_id, result):
+        self._finish(job_id, DONE, result=result)
+
+    def fail(self, job_id, error):
+        self._finish(job_id, FAILED, error=error)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, heartbeat = NULL"
+                " WHERE id = ? RETURNING payload",
+                (status, result, error, time.time(), job_id),
+            ).fetchone()
+        if row:
+            self._remove_input(json.loads(row["payload"]))
+
+    def requeue_stale(self, stale_after=STALE_AFTER, max_attempts=MAX_ATTEMPTS):
+        """heartbeat가 끊긴 실행 중 작업을 다시 대기시키고, 시도 횟수를 다 쓴 작업은 실패 처리 → 재대기 수"""
+        cutoff = time.time() - stale_after
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished = ? "
+                " WHERE status = ? AND heartbeat < ? AND attempts >= ?",
+                (FAILED, "작업자가 응답하지 않아 중단되었습니다.", time.time(), RUNNING, cutoff, max_attempts),
+            )
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, started = NULL, progress = NULL"
+                " WHERE status = ? AND heartbeat < ?",
+                (QUEUED, RUNNING, cutoff),
+            ).rowcount
+        return requeued
+
+    def purge(self, retention_hours=RETENTION_HOURS):
+        """retention_hours보다 오래 전에 끝난 작업 삭제 → 삭제 수"""
+        cutoff = time.time() - retention_hours * 3600
+        with self._connect() as conn:
+            rows = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished < ? RETURNING payload", (DONE, FAILED, cutoff),
+            ).fetchall()
+        for row in rows:
+            self._remove_input(json.loads(row["payload"]))
+        return len(rows)
+
+    @staticmethod
+    def _remove_input(payload):
+        path = payload.get("input_path")
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+_default_queue = None
+
+
+def get_job_queue():
+    """프로세스 공용 작업 큐 (JOB_QUEUE_DIR)"""
+    global _default_queue
+    if _default_queue is None:
+        _default_queue = JobQueue()
+    return _default_queue
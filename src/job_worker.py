@@ -0,0 +1,176 @@
+"""
+job_worker.py
+----------------------------------
+작업 큐(job_queue) 작업자 프로세스 풀
+
+사용 예:
+    python -m src.job_worker --workers 4
+    OCR_JOB_BACKEND=queue streamlit run main_app.py
+
+기능 요약:
+1. 작업자 프로세스 N개가 큐에서 OCR / 교정 작업을 하나씩 가져와 실행 — Streamlit 서버는 OCR로 막히지 않음
+2. 실행 중에는 진행 상황(받은 페이지 수, 스트리밍 중인 교정 텍스트)을 주기적으로 큐에 기록 (heartbeat 겸용)
+3. 감독 프로세스가 죽은 작업자를 다시 띄우고, heartbeat가 끊긴 작업은 다시 대기시킴
+4. Gemini 요청 / 토큰 한도(GEMINI_RPM / GEMINI_TPM)는 작업자 수로 나눠 프로세스별로 적용
+----------------------------------
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+from src.job_queue import JOB_QUEUE_DIR, STALE_AFTER, JobQueue
+
+logger = logging.getLogger("job_worker")
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", os.cpu_count() or 2))
+POLL_INTERVAL = 0.5  # 빈 큐를 다시 확인하는 간격 (초)
+PROGRESS_INTERVAL = 0.5  # 진행 상황 기록 간격 (초)
+SUPERVISE_INTERVAL = 5.0  # 작업자 생존 / 멈춘 작업 확인 간격 (초)
+PURGE_INTERVAL = 3600.0
+
+
+def _follow(queue, job_id, target, progress):
+    """target을 스레드로 실행하면서 끝날 때까지 progress()를 큐에 기록 (바뀌지 않았으면 heartbeat만)"""
+    thread = threading.Thread(target=target, name=f"job-{job_id[:8]}", daemon=True)
+    thread.start()
+    reported = None
+    while thread.is_alive():
+        thread.join(PROGRESS_INTERVAL)
+        current = progress()
+        if current == reported:
+            queue.heartbeat(job_id)
+        else:
+            queue.report_progress(job_id, **current)
+            reported = current
+
+
+def run_ocr(queue, job_id, payload):
+    """OCR 작업 → OcrDocument의 Arrow 바이트"""
+    from src.ocr_document import to_arrow_bytes
+    from src.session_jobs import DocumentJob
+
+    job = DocumentJob(job_id, payload["content_hash"], payload["filename"])
+    with open(payload["input_path"], "rb") as source:
+        # 진행 상황에는 받은 페이지 수만 남긴다 — 본문은 끝난 뒤 complete()로 한 번만 기록
+        _follow(queue, job_id, lambda: job.run(source), lambda: {"pages": len(job.pages())})
+    if job.error:
+        raise RuntimeError(job.error)
+    return to_arrow_bytes(job.document)
+
+
+def run_correction(queue, job_id, payload):
+    """교정 작업 → 결과 JSON 바이트 (text / stats / first_token_seconds)"""
+    import json
+
+    from src.ocr_document import from_arrow_bytes
+    from src.session_jobs import CorrectionJob
+
+    data = queue.result(payload["document_job"])
+    if data is None:
+        raise RuntimeError("❌ 교정할 OCR 결과가 없습니다. 파일을 다시 올려 주세요.")
+    document = from_arrow_bytes(data)
+
+    job = CorrectionJob(payload["mode"], payload["selective"])
+    _follow(queue, job_id, lambda: job.run(document),
+            lambda: {"text": job.text, "first_token_seconds": job.first_token_seconds})
+    if job.error:
+        raise RuntimeError(job.error)
+    result = {"text": job.text, "stats": job.stats, "first_token_seconds": job.first_token_seconds}
+    return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+RUNNERS = {"ocr": run_ocr, "correct": run_correction}
+
+
+def worker_loop(queue, name, stop=None):
+    """stop이 설정될 때까지 작업을 가져와 실행"""
+    while stop is None or not stop.is_set():
+        claimed = queue.claim(name)
+        if claimed is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        job_id, kind, payload = claimed
+        started = time.perf_counter()
+        try:
+            queue.complete(job_id, RUNNERS[kind](queue, job_id, payload))
+            logger.info(f"✅ [{name}] {kind} {job_id[:8]} 완료 ({time.perf_counter() - started:.1f}초)")
+        except Exception as e:
+            queue.fail(job_id, str(e))
+            logger.info(f"❌ [{name}] {kind} {job_id[:8]} 실패: {e}")
+
+
+def _worker_main(queue_dir, name, workers, stop):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+    from src import gemini_client
+
+    # 프로세스마다 토큰 버킷을 따로 가지므로 전체 한도를 작업자 수로 나눠 적용 (0은 "제한 없음"이므로 최소 1)
+    def share(limit):
+        return max(1, limit // workers) if limit > 0 else 0
+
+    gemini_client._limiter = gemini_client.RateLimiter(share(gemini_client.GEMINI_RPM), share(gemini_client.GEMINI_TPM))
+    try:
+        worker_loop(JobQueue(queue_dir), name, stop)
+    except KeyboardInterrupt:
+        pass
+
+
+def supervise(workers=JOB_WORKERS, queue_dir=JOB_QUEUE_DIR):
+    """작업자 프로세스 풀 실행 — 죽은 작업자 재시작, 멈춘 작업 재대기, 오래된 작업 정리"""
+    queue = JobQueue(queue_dir)
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    host = socket.gethostname()
+
+    def spawn(index):
+        name = f"{host}-{index}"
+        process = context.Process(target=_worker_main, args=(queue_dir, name, workers, stop), name=name)
+        process.start()
+        return process
+
+    processes = [spawn(i) for i in range(workers)]
+    logger.info(f"🚀 작업자 {workers}개 시작 (큐: {queue.db_path})")
+    last_purge = 0.0
+    try:
+        while True:
+            time.sleep(SUPERVISE_INTERVAL)
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.info(f"⚠️ 작업자 {process.name} 종료됨 (코드 {process.exitcode}) → 다시 시작")
+                    processes[i] = spawn(i)
+            requeued = queue.requeue_stale(STALE_AFTER)
+            if requeued:
+                logger.info(f"🔁 멈춘 작업 {requeued}개 다시 대기")
+            if time.monotonic() - last_purge > PURGE_INTERVAL:
+                last_purge = time.monotonic()
+                purged = queue.purge()
+                if purged:
+                    logger.info(f"🧹 오래된 작업 {purged}개 정리")
+    except KeyboardInterrupt:
+        logger.info("🛑 종료 요청 — 작업자를 멈춥니다 (처리 중이던 작업은 다음 실행에서 다시 대기)")
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=SUPERVISE_INTERVAL)
+            if process.is_alive():
+                process.terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR / 교정 작업 큐 작업자 풀")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="작업자 프로세스 수")
+    parser.add_argument("--queue-dir", default=JOB_QUEUE_DIR, help="작업 큐 폴더")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+    supervise(max(1, args.workers), args.queue_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
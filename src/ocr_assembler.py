@@ -0,0 +1,77 @@
+"""
+ocr_assembler.py
+----------------------------------
+Vision OCR 결과 샤드(output-X-to-Y.json) 조립 모듈
+
+기능 요약:
+1. 결과 샤드 이름에서 페이지 범위 파싱 및 정렬
+2. 제한된 스레드 풀로 샤드 동시 다운로드 (샤드별 지연 시간 측정)
+3. 페이지 번호 순서대로 응답을 스트리밍
+----------------------------------
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import re
+import time
+
+from src.telemetry import stage
+
+MAX_DOWNLOAD_WORKERS = 16
+SHARD_PATTERN = re.compile(r"output-(\d+)-to-(\d+)\.json$")
+
+
+def parse_shard_range(name):
+    """샤드 이름에서 (시작 페이지, 끝 페이지) 추출 — 형식이 다르면 None"""
+    match = SHARD_PATTERN.search(name)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def discover_shards(bucket, prefix):
+    """prefix 아래 결과 샤드를 한 번만 조회해 페이지 순서로 반환"""
+    names = [b.name for b in bucket.list_blobs(prefix=prefix) if parse_shard_range(b.name)]
+    return sort_shards(names)
+
+
+def sort_shards(names):
+    return sorted(names, key=lambda name: parse_shard_range(name) or (0, 0))
+
+
+def download_shard(bucket, name):
+    """샤드 1개 다운로드 → (응답 목록, 지연 시간 초)"""
+    start = time.perf_counter()
+    with stage("shard_download") as span:
+        data = bucket.blob(name).download_as_bytes()
+        span.set(bytes=len(data))
+    with stage("shard_parse", bytes=len(data)) as span:
+        responses = json.loads(data).get("responses", [])
+        span.set(pages=len(responses))
+    return responses, time.perf_counter() - start
+
+
+def _page_number(response, fallback):
+    return response.get("context", {}).get("pageNumber", fallback)
+
+
+def iter_shard_responses(bucket, names, max_workers=MAX_DOWNLOAD_WORKERS):
+    """샤드를 동시에 내려받고, 페이지 순서대로 (샤드 이름, 응답 목록, 지연 시간) 생성
+
+    앞 샤드가 끝나는 즉시 내보내므로 뒤 샤드를 기다리지 않고 텍스트를 이어 붙일 수 있다.
+    """
+    names = sort_shards(names)
+    if not names:
+        return
+    workers = max(1, min(max_workers, len(names)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-shard") as pool:
+        futures = [pool.submit(download_shard, bucket, name) for name in names]
+        for name, future in zip(names, futures):
+            responses, latency = future.result()
+            first_page = (parse_shard_range(name) or (1, 1))[0]
+            responses = sorted(
+                responses,
+                key=lambda r, base=first_page: _page_number(r, base),
+            )
+            yield name, responses, latency
+
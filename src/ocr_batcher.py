@@ -0,0 +1,138 @@
+"""
+ocr_batcher.py
+----------------------------------
+Vision 비동기 OCR 요청 묶음(coalescing) 모듈
+
+기능 요약:
+1. 짧은 시간 창(window) 동안 들어온 AsyncAnnotateFileRequest를 모아
+   async_batch_annotate_files 한 번으로 제출 (호출당 최대 파일 수 제한)
+2. 작업 완료 후 파일별 응답을 결과 경로(gcs_destination.uri)로 찾아 각 요청자에게 돌려줌
+   (묶음 작업이 실패하면 남은 마감 시간 안에서 파일별로 따로 다시 제출해, 문제 있는 파일의 오류는 그 요청자에게만 전달)
+3. Vision 작업 동시 실행 한도(vision_ocr의 operation 슬롯)는 요청자가 아니라 실제 제출하는 작업마다 적용
+4. 묶음 수 / 파일 수 통계 제공
+----------------------------------
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import queue
+import threading
+import time
+
+from src.clients import get_vision_client
+from src.ocr_completion import OPERATION_DEADLINE
+
+COALESCE_WINDOW = float(os.environ.get("OCR_COALESCE_WINDOW", 0.05))  # 초, 0이면 묶지 않음
+MAX_FILES_PER_BATCH = int(os.environ.get("OCR_MAX_FILES_PER_BATCH", 100))
+MAX_OPERATIONS_IN_FLIGHT = int(os.environ.get("OCR_MAX_BATCH_OPERATIONS", 32))
+
+
+class OcrRequestCoalescer:
+    """여러 호출자의 파일 요청을 하나의 Vision 작업으로 묶어 제출"""
+
+    def __init__(self, window=COALESCE_WINDOW, max_files=MAX_FILES_PER_BATCH, deadline=OPERATION_DEADLINE):
+        self.window = window
+        self.max_files = max_files
+        self.deadline = deadline
+        self._queue = queue.Queue()
+        self._operations = ThreadPoolExecutor(
+            max_workers=MAX_OPERATIONS_IN_FLIGHT, thread_name_prefix="ocr-batch-op",
+        )
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "files": 0, "largest_batch": 0, "split_retries": 0}
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ocr-coalescer", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, request, deadline=None):
+        """요청 1건 제출 → 이 파일만 담은 AsyncBatchAnnotateFilesResponse로 완료되는 Future
+
+        deadline(초, 기본 self.deadline)이 지나면 묶음 대기 / 재제출을 포함해 TimeoutError로 끝난다.
+        """
+        future = Future()
+        expires = time.monotonic() + (deadline or self.deadline)
+        self._queue.put((request, future, expires))
+        return future
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        closes_at = time.monotonic() + self.window
+        while len(batch) < self.max_files:
+            remaining = closes_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._collect_batch()
+            with self._lock:
+                self.stats["batches"] += 1
+                self.stats["files"] += len(batch)
+                self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+            self._operations.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        from google.cloud import vision
+        from src.vision_ocr import operation_slot
+
+        # 마감 시간이 지난 요청은 제출하지 않는다 (파일별 재제출이 요청자의 마감을 넘기지 않도록)
+        now = time.monotonic()
+        for _, future, expires in batch:
+            if expires <= now:
+                future.set_exception(TimeoutError("Vision 작업 마감 시간을 넘겼습니다."))
+        batch = [item for item in batch if item[2] > now]
+        if not batch:
+            return
+
+        try:
+            # 슬롯은 실제 Vision 작업 1건당 하나 — 한 묶음에 몇 명의 요청이 담겨도 슬롯 하나만 쓴다
+            with operation_slot():
+                operation = get_vision_client().async_batch_annotate_files(
+                    requests=[request for request, _, _ in batch]
+                )
+                remaining = max(expires for _, _, expires in batch) - time.monotonic()
+                response = operation.result(timeout=max(0.0, remaining))
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # 손상되거나 너무 큰 파일 하나 때문에 같은 창에 묶인 다른 사용자의 문서까지 실패하지 않도록
+            # 파일마다 따로 다시 제출한다 — 각 오류는 그 파일의 요청자에게만 전달된다
+            with self._lock:
+                self.stats["split_retries"] += 1
+            for item in batch:
+                self._operations.submit(self._run_batch, [item])
+            return
+
+        # 파일별 응답에는 요청한 결과 경로가 그대로 들어 있으므로 그 경로로 요청자를 찾는다
+        waiting = {_destination_uri(request): future for request, future, _ in batch}
+        for file_response in response.responses:
+            future = waiting.pop(file_response.output_config.gcs_destination.uri, None)
+            if future is not None:
+                future.set_result(vision.AsyncBatchAnnotateFilesResponse(responses=[file_response]))
+        for future in waiting.values():
+            future.set_exception(RuntimeError("Vision 응답에 이 파일의 결과가 없습니다."))
+
+
+def _destination_uri(request):
+    """AsyncAnnotateFileRequest(dict 또는 proto)의 결과 경로"""
+    if isinstance(request, dict):
+        return request["output_config"]["gcs_destination"]["uri"]
+    return request.output_config.gcs_destination.uri
+
+
+_default_coalescer = None
+_default_lock = threading.Lock()
+
+
+def get_coalescer():
+    """프로세스 공용 요청 묶음기 반환"""
+    global _default_coalescer
+    with _default_lock:
+        if _default_coalescer is None:
+            _default_coalescer = OcrRequestCoalescer()
+        return _default_coalescer
@@ -0,0 +1,141 @@
+"""
+ocr_cache.py
+----------------------------------
+OCR 결과 디스크 캐시 모듈 (SQLite)
+
+기능 요약:
+1. PDF 바이트의 SHA-256 + OCR 기능 설정으로 캐시 키 생성
+2. 동일 문서 재업로드 시 GCS / Vision 호출 없이 텍스트 반환
+3. 전체 용량 기준 LRU 제거 및 hit / miss 카운터 제공
+----------------------------------
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.telemetry import record_cache
+
+# ✅ 캐시 위치 및 최대 용량 (환경 변수로 조정 가능)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "OCR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ocr_spellcheck")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("OCR_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def make_cache_key(pdf_bytes, feature_config):
+    """PDF 내용과 OCR 설정을 합쳐 캐시 키(SHA-256 hex) 생성"""
+    content_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    return make_cache_key_from_hash(content_hash, feature_config)
+
+
+def make_cache_key_from_hash(content_hash, feature_config):
+    """이미 계산된 콘텐츠 해시와 OCR 설정으로 캐시 키 생성"""
+    config_json = json.dumps(feature_config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{content_hash}:{config_json}".encode("utf-8")).hexdigest()
+
+
+class OcrResultCache:
+    """SQLite 기반 OCR 결과 캐시 (용량 제한 LRU)"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "ocr_results.sqlite3")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, key):
+        """텍스트 캐시 조회 — 없으면 None"""
+        value = self.get_bytes(key)
+        return None if value is None else value.decode("utf-8")
+
+    def put(self, key, text):
+        """텍스트 결과 저장"""
+        self.put_bytes(key, text.encode("utf-8"))
+
+    def get_bytes(self, key):
+        """바이트 캐시 조회 — 적중 시 마지막 접근 시각 갱신"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                record_cache("ocr", hit=False)
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            record_cache("ocr", hit=True)
+            return bytes(row[0])
+
+    def put_bytes(self, key, value):
+        """결과 바이트 저장 후 최대 용량을 넘으면 오래된 항목부터 제거"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """hit / miss / 항목 수 / 사용 용량 통계"""
+        with self._lock, self._connect() as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """프로세스 공용 캐시 인스턴스 반환"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OcrResultCache()
+        return _default_cache
@@ -0,0 +1,50 @@
+"""
+ocr_completion.py
+----------------------------------
+Vision 비동기 작업 완료 판정 모듈
+
+기능 요약:
+1. 장기 실행 작업(operation) 응답에서 결과 경로 확인
+2. 필요할 때만 지수 백오프 + 지터로 폴링
+3. 설정 가능한 마감 시간(deadline) 제공
+----------------------------------
+"""
+
+import os
+import random
+import time
+
+# ✅ 마감 시간 설정 (초, 환경 변수로 조정 가능)
+OPERATION_DEADLINE = float(os.environ.get("OCR_OPERATION_DEADLINE", 600))
+RESULT_POLL_DEADLINE = float(os.environ.get("OCR_RESULT_POLL_DEADLINE", 60))
+
+
+def backoff_delays(initial=0.25, factor=2.0, max_delay=8.0, jitter=0.5):
+    """지수 백오프 대기 시간 생성 (±jitter 비율만큼 무작위 흔들림)"""
+    delay = initial
+    while True:
+        yield delay * random.uniform(1 - jitter, 1 + jitter)
+        delay = min(delay * factor, max_delay)
+
+
+def poll_until(check, deadline=RESULT_POLL_DEADLINE, **backoff):
+    """check()가 참이 될 때까지 백오프 폴링 — 마감 시간 초과 시 False"""
+    end = time.monotonic() + deadline
+    for delay in backoff_delays(**backoff):
+        if check():
+            return True
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+
+
+def output_prefixes_from_response(response, bucket_name):
+    """작업 응답에 기록된 결과 경로(gs://bucket/prefix)를 버킷 내부 prefix 목록으로 변환"""
+    prefixes = []
+    for file_response in getattr(response, "responses", []):
+        uri = file_response.output_config.gcs_destination.uri
+        head = f"gs://{bucket_name}/"
+        if uri.startswith(head):
+            prefixes.append(uri[len(head):])
+    return prefixes
@@ -0,0 +1,240 @@
+"""
+ocr_document.py
+----------------------------------
+OCR 결과 문서 모델 (페이지 → 블록 → 문단 → 단어)
+
+기능 요약:
+1. Vision 응답 JSON(fullTextAnnotation)을 __slots__ 기반 경량 객체로 바로 변환
+   (단어마다 경계 상자 bbox와 신뢰도 confidence 보존)
+2. 노드 1개 = 1행인 Arrow IPC(zstd 압축) 바이트로 직렬화 / 역직렬화
+   → 캐시에서 불러올 때 수 MB의 JSON을 다시 파싱하지 않음
+3. 텍스트 레이어 / Tesseract처럼 구조가 없는 결과는 텍스트만 가진 페이지로 표현
+
+bbox 좌표는 Vision 응답 그대로 (x0, y0, x1, y1) — PDF는 0~1 정규화 좌표, 이미지는 픽셀 좌표.
+----------------------------------
+"""
+
+import io
+
+# Vision detectedBreak 종류 → 단어 뒤에 붙는 문자
+_BREAK_SUFFIX = {
+    "SPACE": " ",
+    "SURE_SPACE": " ",
+    "EOL_SURE_SPACE": "\n",
+    "LINE_BREAK": "\n",
+    "HYPHEN": "-\n",
+}
+
+# Arrow 행의 노드 종류
+LEVEL_PAGE, LEVEL_BLOCK, LEVEL_PARAGRAPH, LEVEL_WORD = range(4)
+
+
+class Word:
+    __slots__ = ("text", "confidence", "bbox", "suffix")
+
+    def __init__(self, text, confidence=None, bbox=None, suffix=""):
+        self.text = text
+        self.confidence = confidence
+        self.bbox = bbox
+        self.suffix = suffix  # 단어 뒤 공백 / 줄바꿈 ("" 이면 바로 다음 단어)
+
+
+class Paragraph:
+    __slots__ = ("words", "confidence", "bbox")
+
+    def __init__(self, words, confidence=None, bbox=None):
+        self.words = words
+        self.confidence = confidence
+        self.bbox = bbox
+
+    @property
+    def text(self):
+        return "".join(word.text + word.suffix for word in self.words)
+
+
+class Block:
+    __slots__ = ("paragraphs", "confidence", "bbox")
+
+    def __init__(self, paragraphs, confidence=None, bbox=None):
+        self.paragraphs = paragraphs
+        self.confidence = confidence
+        self.bbox = bbox
+
+
+class Page:
+    __slots__ = ("number", "text", "blocks", "width", "height", "confidence")
+
+    def __init__(self, number, text, blocks=None, width=None, height=None, confidence=None):
+        self.number = number
+        self.text = text
+        self.blocks = blocks or []
+        self.width = width
+        self.height = height
+        self.confidence = confidence
+
+    def iter_words(self):
+        for block in self.blocks:
+            for paragraph in block.paragraphs:
+                yield from paragraph.words
+
+
+class OcrDocument:
+    """페이지 번호 순서의 Page 목록"""
+
+    __slots__ = ("pages",)
+
+    def __init__(self, pages):
+        self.pages = sorted(pages, key=lambda page: page.number)
+
+    @property
+    def text(self):
+        return "\n".join(page.text for page in self.pages)
+
+    def page_texts(self):
+        """기존 파이프라인 형식의 [(페이지 번호, 텍스트)]"""
+        return [(page.number, page.text) for page in self.pages]
+
+
+# ----------------------------------------------------------------------
+# Vision 응답 → 문서 모델
+# ----------------------------------------------------------------------
+def _bbox(node):
+    box = node.get("boundingBox") or {}
+    vertices = box.get("normalizedVertices") or box.get("vertices")
+    if not vertices:
+        return None
+    xs = [v.get("x", 0.0) for v in vertices]
+    ys = [v.get("y", 0.0) for v in vertices]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _word(node):
+    symbols = node.get("symbols", [])
+    text = "".join(symbol.get("text", "") for symbol in symbols)
+    suffix = ""
+    if symbols:
+        detected = symbols[-1].get("property", {}).get("detectedBreak", {})
+        suffix = _BREAK_SUFFIX.get(detected.get("type"), "")
+    return Word(text, node.get("confidence"), _bbox(node), suffix)
+
+
+def page_from_response(response, fallback_number=1):
+    """Vision 응답 1건(페이지 1장, camelCase dict) → Page — 텍스트가 없으면 None"""
+    annotation = response.get("fullTextAnnotation")
+    if not annotation:
+        return None
+    number = response.get("context", {}).get("pageNumber", fallback_number)
+    blocks, width, height, confidence = [], None, None, None
+    for page in annotation.get("pages", []):
+        width, height, confidence = page.get("width"), page.get("height"), page.get("confidence")
+        for block in page.get("blocks", []):
+            paragraphs = [
+                Paragraph([_word(w) for w in p.get("words", [])], p.get("confidence"), _bbox(p))
+                for p in block.get("paragraphs", [])
+            ]
+            blocks.append(Block(paragraphs, block.get("confidence"), _bbox(block)))
+    return Page(number, annotation.get("text", ""), blocks, width, height, confidence)
+
+
+def page_from_proto(response, fallback_number=1):
+    """동기 API의 AnnotateImageResponse(proto) → Page"""
+    from google.protobuf.json_format import MessageToDict
+
+    return page_from_response(MessageToDict(type(response).pb(response)), fallback_number)
+
+
+def iter_document_pages(responses):
+    """결과 샤드의 응답 목록에서 Page 생성 (텍스트가 없는 페이지는 건너뜀)"""
+    for index, response in enumerate(responses, start=1):
+        page = page_from_response(response, index)
+        if page is not None:
+            yield page
+
+
+# ----------------------------------------------------------------------
+# Arrow 직렬화 — 노드마다 1행 (페이지 행의 x1/y1은 페이지 너비/높이)
+# ----------------------------------------------------------------------
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("level", pa.int8()),
+        ("page", pa.int32()),
+        ("text", pa.string()),
+        ("suffix", pa.dictionary(pa.int8(), pa.string())),
+        ("confidence", pa.float32()),
+        ("x0", pa.float32()),
+        ("y0", pa.float32()),
+        ("x1", pa.float32()),
+        ("y1", pa.float32()),
+    ])
+
+
+def to_arrow_bytes(document):
+    """OcrDocument → Arrow IPC 스트림 바이트 (zstd 압축)"""
+    import pyarrow as pa
+
+    columns = {name: [] for name in _schema().names}
+
+    def add(level, page_number, text, confidence, bbox, suffix=""):
+        x0, y0, x1, y1 = bbox or (None, None, None, None)
+        for name, value in zip(columns, (level, page_number, text, suffix, confidence, x0, y0, x1, y1)):
+            columns[name].append(value)
+
+    for page in document.pages:
+        size = (0.0, 0.0, page.width, page.height) if page.width is not None else None
+        add(LEVEL_PAGE, page.number, page.text, page.confidence, size)
+        for block in page.blocks:
+            add(LEVEL_BLOCK, page.number, None, block.confidence, block.bbox)
+            for paragraph in block.paragraphs:
+                add(LEVEL_PARAGRAPH, page.number, None, paragraph.confidence, paragraph.bbox)
+                for word in paragraph.words:
+                    add(LEVEL_WORD, page.number, word.text, word.confidence, word.bbox, word.suffix)
+
+    schema = _schema()
+    table = pa.table(columns, schema=schema)
+    sink = io.BytesIO()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _column_values(column):
+    """열 → 파이썬 값 목록 (숫자 열은 numpy 경유로 to_pylist보다 훨씬 빠르게 변환)"""
+    import pyarrow as pa
+
+    array = column.chunk(0) if column.num_chunks else pa.array([], column.type)
+    if pa.types.is_dictionary(array.type):
+        dictionary = array.dictionary.to_pylist()
+        return [dictionary[index] for index in array.indices.to_numpy().tolist()]
+    if pa.types.is_string(array.type):
+        return array.to_pylist()
+    return array.to_numpy(zero_copy_only=False).tolist()
+
+
+def from_arrow_bytes(data):
+    """Arrow IPC 스트림 바이트 → OcrDocument"""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(data).read_all().combine_chunks()
+    rows = zip(*(_column_values(table.column(name)) for name in table.schema.names))
+    pages, page, block, paragraph = [], None, None, None
+    for level, page_number, text, suffix, confidence, x0, y0, x1, y1 in rows:
+        # 빈 값은 NaN으로 복원되므로 자기 자신과 같지 않은지로 확인한다
+        bbox = (x0, y0, x1, y1) if x0 == x0 else None
+        if confidence != confidence:
+            confidence = None
+        if level == LEVEL_PAGE:
+            width, height = (x1, y1) if bbox else (None, None)
+            page = Page(page_number, text, [], width, height, confidence)
+            pages.append(page)
+        elif level == LEVEL_BLOCK:
+            block = Block([], confidence, bbox)
+            page.blocks.append(block)
+        elif level == LEVEL_PARAGRAPH:
+            paragraph = Paragraph([], confidence, bbox)
+            block.paragraphs.append(paragraph)
+        else:
+            paragraph.words.append(Word(text, confidence, bbox, suffix or ""))
+    return OcrDocument(pages)
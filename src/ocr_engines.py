@@ -0,0 +1,176 @@
+"""
+ocr_engines.py
+----------------------------------
+교체 가능한 OCR 엔진 모듈
+
+기능 요약:
+1. OcrEngine 공통 인터페이스 (PDF 바이트/파일 객체 → 페이지별 텍스트, 준비되는 대로 스트리밍)
+2. VisionOcrEngine: Cloud Vision OCR (작은 문서는 인라인 동기 요청, 큰 PDF는 GCS + 비동기 작업)
+3. TesseractOcrEngine: 네트워크 없이 pdf2image + pytesseract로 로컬 OCR
+   (페이지 단위 래스터화 + CPU 코어 수만큼의 프로세스 풀)
+----------------------------------
+"""
+
+from concurrent.futures import as_completed
+import os
+import shutil
+import tempfile
+import threading
+
+from src.ocr_document import Page
+from src.pdf_utils import IMAGE_MIME_TYPES, as_stream, count_pdf_pages, sniff_mime_type
+
+DEFAULT_ENGINE = os.environ.get("OCR_ENGINE", "vision")
+TESSERACT_LANG = os.environ.get("TESSERACT_LANG", "kor+eng")
+TESSERACT_DPI = int(os.environ.get("TESSERACT_DPI", 300))
+
+
+class OcrEngine:
+    """OCR 엔진 공통 인터페이스"""
+
+    name = "base"
+
+    @property
+    def feature_config(self):
+        """캐시 키에 포함되는 엔진 설정 — 설정이 바뀌면 캐시도 분리된다"""
+        raise NotImplementedError
+
+    def iter_pages(self, pdf_source, filename, content_hash=None):
+        """PDF를 OCR 처리하며 준비되는 페이지마다 (페이지 번호, 텍스트) 생성 (순서 보장 없음)
+
+        pdf_source는 PDF 바이트 또는 seek 가능한 바이너리 파일 객체,
+        content_hash는 이미 계산해 둔 내용의 SHA-256 hex (없으면 None).
+        """
+        raise NotImplementedError
+
+    def iter_document_pages(self, pdf_source, filename, content_hash=None):
+        """iter_pages와 같지만 Page 객체 생성 — 구조 정보가 없는 엔진은 텍스트만 담는다"""
+        for page_number, text in self.iter_pages(pdf_source, filename, content_hash):
+            yield Page(page_number, text)
+
+    def iter_document_steps(self, pdf_source, filename, content_hash=None):
+        """파이프라인 단계 생성기 — 원격 작업을 기다리는 엔진은 Page 사이에 대기 지점(OperationWait)도 생성"""
+        return self.iter_document_pages(pdf_source, filename, content_hash)
+
+
+class VisionOcrEngine(OcrEngine):
+    """Google Cloud Vision 비동기 OCR 엔진 (GCS 경유)"""
+
+    name = "vision"
+
+    @property
+    def feature_config(self):
+        return {
+            "feature": "DOCUMENT_TEXT_DETECTION",
+            "mime_type": "application/pdf",
+        }
+
+    def iter_pages(self, pdf_source, filename, content_hash=None):
+        # Vision/GCS 의존성과 인증 정보는 이 엔진을 실제로 쓸 때만 불러온다
+        from src.vision_ocr import iter_vision_ocr_pages
+        return iter_vision_ocr_pages(pdf_source, filename, content_hash)
+
+    def iter_document_pages(self, pdf_source, filename, content_hash=None):
+        # 블록 / 문단 / 단어 구조와 신뢰도를 그대로 담은 Page를 생성
+        from src.vision_ocr import iter_vision_document_pages
+        return iter_vision_document_pages(pdf_source, filename, content_hash)
+
+    def iter_document_steps(self, pdf_source, filename, content_hash=None):
+        # Vision 비동기 작업은 구동하는 쪽(동기 호출자 / 오케스트레이터)이 기다리도록 대기 지점을 그대로 내보낸다
+        from src.vision_ocr import iter_vision_document_steps
+        return iter_vision_document_steps(pdf_source, filename, content_hash)
+
+
+def _tesseract_page(pdf_path, page_number, lang, dpi, is_image=False):
+    """(작업 프로세스) PDF 한 페이지만 래스터화해 OCR — 이미지 파일은 그대로 OCR"""
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    if is_image:
+        from PIL import Image
+        with Image.open(pdf_path) as image:
+            return page_number, pytesseract.image_to_string(image, lang=lang)
+
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    return page_number, "".join(pytesseract.image_to_string(image, lang=lang) for image in images)
+
+
+class TesseractOcrEngine(OcrEngine):
+    """pytesseract 기반 로컬 OCR 엔진 (오프라인 대량 처리용)"""
+
+    name = "tesseract"
+
+    def __init__(self, lang=TESSERACT_LANG, dpi=TESSERACT_DPI, max_workers=None):
+        self.lang = lang
+        self.dpi = dpi
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def feature_config(self):
+        return {"engine": self.name, "lang": self.lang, "dpi": self.dpi}
+
+    def _get_pool(self):
+        # 프로세스 풀은 한 번 만들어 여러 문서에서 재사용
+        # 스레드가 도는 프로세스(Streamlit / 작업자)에서 fork하면 다른 스레드가 잡고 있던 락(logging, gRPC, SQLite)이
+        # 자식에 잠긴 채로 복사돼 멈출 수 있으므로 spawn으로 띄운다
+        with self._pool_lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                import multiprocessing
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def iter_pages(self, pdf_source, filename, content_hash=None):
+        is_image = sniff_mime_type(pdf_source) in IMAGE_MIME_TYPES
+        page_count = 1 if is_image else count_pdf_pages(pdf_source)
+        if not page_count:
+            return
+
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".img" if is_image else ".pdf")
+        futures = []
+        try:
+            with tmp:
+                # 작업 프로세스가 경로로 읽을 수 있도록 조각 단위로 복사 (전체를 메모리에 올리지 않음)
+                shutil.copyfileobj(as_stream(pdf_source), tmp)
+            pool = self._get_pool()
+            futures = [
+                pool.submit(_tesseract_page, tmp.name, page_number, self.lang, self.dpi, is_image)
+                for page_number in range(1, page_count + 1)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # 중간에 소비를 멈추면 남은 페이지 작업은 취소
+            for future in futures:
+                future.cancel()
+            os.remove(tmp.name)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+ENGINES = {
+    VisionOcrEngine.name: VisionOcrEngine,
+    TesseractOcrEngine.name: TesseractOcrEngine,
+}
+
+_engine_instances = {}
+_engine_lock = threading.Lock()
+
+
+def get_engine(name=None):
+    """이름으로 OCR 엔진 인스턴스 반환 (프로세스 내 재사용)"""
+    name = name or DEFAULT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"지원하지 않는 OCR 엔진입니다: {name} (사용 가능: {', '.join(ENGINES)})")
+    with _engine_lock:
+        if name not in _engine_instances:
+            _engine_instances[name] = ENGINES[name]()
+        return _engine_instances[name]
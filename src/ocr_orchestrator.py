@@ -0,0 +1,165 @@
+"""
+ocr_orchestrator.py
+----------------------------------
+asyncio 기반 OCR 작업 오케스트레이터
+
+기능 요약:
+1. submit() → OcrJob, `await job.result()` / job.document_sync() 로 결과 수신
+   (Streamlit 세션 작업, 작업자 프로세스, 배치 모드가 같은 API 사용)
+2. 실제 OCR은 하나뿐인 파이프라인(vision_ocr.iter_ocr_steps — 캐시 / 텍스트 레이어 / 인라인 / GCS 경로)을
+   작업 스레드에서 진행하고(업로드 / 다운로드 등), Vision 작업 완료는 이벤트 루프에서 기다린다
+   → 작업을 기다리는 문서는 스레드도 단계 슬롯도 잡지 않으므로 수백 건을 동시에 진행할 수 있다
+3. 동시에 진행하는 문서 수 제한(MAX_IN_FLIGHT)과 작업 통계
+4. 준비된 페이지를 job.pages()로 바로 조회 (완료 전 미리 보기)
+----------------------------------
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import itertools
+import os
+import threading
+
+from src.ocr_document import OcrDocument
+
+MAX_IN_FLIGHT = int(os.environ.get("OCR_ORCHESTRATOR_MAX_IN_FLIGHT", 256))
+# 파이프라인 단계(업로드 / 다운로드 / 인라인 OCR 등)를 실행하는 스레드 수 — 작업 대기에는 쓰지 않는다
+STEP_THREADS = int(os.environ.get("OCR_ORCHESTRATOR_THREADS", 32))
+
+
+class OcrJob:
+    """제출된 OCR 작업 핸들"""
+
+    def __init__(self, job_id, filename):
+        self.job_id = job_id
+        self.filename = filename
+        self._future = None
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def _add(self, page):
+        with self._lock:
+            self._pages[page.number] = page
+
+    def pages(self):
+        """지금까지 받은 Page 목록 (페이지 번호 순)"""
+        with self._lock:
+            return [self._pages[n] for n in sorted(self._pages)]
+
+    async def result(self):
+        """(페이지 번호, 텍스트) 목록 — 어느 이벤트 루프에서든 await 가능"""
+        return (await asyncio.wrap_future(self._future)).page_texts()
+
+    def result_sync(self, timeout=None):
+        """동기 코드에서 (페이지 번호, 텍스트) 목록으로 결과 대기"""
+        return self._future.result(timeout).page_texts()
+
+    def document_sync(self, timeout=None):
+        """블록 / 단어 / 신뢰도를 포함한 OcrDocument로 결과 대기"""
+        return self._future.result(timeout)
+
+    def add_done_callback(self, callback):
+        """작업이 끝나면 callback(job) 호출 (이벤트 루프 스레드에서 호출됨)"""
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def done(self):
+        return self._future.done()
+
+    @property
+    def status(self):
+        if not self._future.done():
+            return "running"
+        return "failed" if self._future.exception() else "done"
+
+
+class OcrOrchestrator:
+    """전용 이벤트 루프 스레드에서 여러 OCR 작업을 동시에 진행"""
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, step_threads=STEP_THREADS):
+        self._loop = asyncio.new_event_loop()
+        # 파이프라인 단계는 동기 API(GCS 등)를 쓰므로 작업 대기 지점 사이 구간을 작업 스레드에서 실행한다
+        self._loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=step_threads, thread_name_prefix="ocr-orchestrator",
+        ))
+        self._thread = threading.Thread(target=self._loop.run_forever, name="ocr-orchestrator", daemon=True)
+        self._thread.start()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._ids = itertools.count(1)
+        self.stats = {"submitted": 0, "running": 0, "awaiting_operation": 0, "completed": 0, "failed": 0}
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def submit(self, pdf_source, filename, engine=None, content_hash=None):
+        """OCR 작업 제출 (즉시 반환) — 어느 스레드에서든 호출 가능
+
+        pdf_source는 PDF 바이트 또는 seek 가능한 파일 객체 (작업이 끝날 때까지 다른 곳에서 읽지 않아야 함),
+        engine / content_hash는 iter_ocr_document와 같다.
+        """
+        job = OcrJob(f"job-{next(self._ids)}", filename)
+        self.stats["submitted"] += 1
+        job._future = asyncio.run_coroutine_threadsafe(
+            self._run(job, pdf_source, engine, content_hash), self._loop,
+        )
+        return job
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    # ------------------------------------------------------------------
+    # 내부 처리 (이벤트 루프 스레드)
+    # ------------------------------------------------------------------
+    async def _run(self, job, pdf_source, engine, content_hash):
+        from src.vision_ocr import iter_ocr_steps
+
+        async with self._in_flight:
+            self.stats["running"] += 1
+            steps = iter_ocr_steps(pdf_source, job.filename, engine, content_hash)
+            try:
+                while True:
+                    operation = await asyncio.to_thread(_advance, job, steps)
+                    if operation is None:
+                        break
+                    # 스레드를 돌려준 채 이벤트 루프에서 기다린 뒤 다음 단계(결과 다운로드)로 진행
+                    self.stats["awaiting_operation"] += 1
+                    try:
+                        await operation.wait_async()
+                    finally:
+                        self.stats["awaiting_operation"] -= 1
+                self.stats["completed"] += 1
+                return OcrDocument(job.pages())
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+            finally:
+                await asyncio.to_thread(steps.close)
+                self.stats["running"] -= 1
+
+
+def _advance(job, steps):
+    """(작업 스레드) 다음 Vision 작업 대기 지점까지 파이프라인 진행 → 대기 지점, 끝나면 None
+
+    받은 페이지는 바로 job에 기록한다. 단계 슬롯(다운로드 등)을 잡은 채로 스레드를 놓지 않도록
+    대기 지점 사이의 구간은 한 스레드에서 끝까지 실행한다.
+    """
+    from src.vision_ocr import OperationWait
+
+    for step in steps:
+        if isinstance(step, OperationWait):
+            return step
+        job._add(step)
+    return None
+
+
+_default_orchestrator = None
+_default_lock = threading.Lock()
+
+
+def get_orchestrator():
+    """프로세스 공용 오케스트레이터 반환"""
+    global _default_orchestrator
+    with _default_lock:
+        if _default_orchestrator is None:
+            _default_orchestrator = OcrOrchestrator()
+        return _default_orchestrator
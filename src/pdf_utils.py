@@ -0,0 +1,82 @@
+"""
+pdf_utils.py
+----------------------------------
+PDF 공통 유틸리티 (PyPDF2)
+
+기능 요약:
+1. PDF 바이트 / 파일 객체를 같은 방식으로 다루는 스트림 변환
+2. 복사본 없이 조각 단위로 읽는 SHA-256 계산
+3. PDF 페이지 수 계산
+4. 파일 앞부분(매직 바이트)으로 PDF / PNG / JPEG 판별 및 크기 확인
+----------------------------------
+"""
+
+import hashlib
+import io
+
+from src.telemetry import stage
+
+READ_CHUNK_SIZE = 1024 * 1024
+IMAGE_MIME_TYPES = ("image/png", "image/jpeg")
+_MAGIC_BYTES = (
+    (b"%PDF", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+)
+
+
+def as_stream(pdf_source):
+    """PDF 바이트 또는 seek 가능한 바이너리 파일 객체 → 처음으로 되감은 파일 객체
+
+    Streamlit UploadedFile / 열린 파일은 그대로 되감아 쓰고 전체를 다시 읽어 복사하지 않는다.
+    """
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(pdf_source)
+    pdf_source.seek(0)
+    return pdf_source
+
+
+def hash_stream(pdf_source, chunk_size=READ_CHUNK_SIZE):
+    """PDF 내용의 SHA-256 hex — 파일 객체는 chunk_size 단위로 읽어 메모리 사용량 일정"""
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(pdf_source).hexdigest()
+    stream = as_stream(pdf_source)
+    digest = hashlib.sha256()
+    with stage("read_upload") as span:
+        size = 0
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+        span.set(bytes=size)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def count_pdf_pages(pdf_source):
+    """PDF 페이지 수 계산 — 읽을 수 없으면 None"""
+    from PyPDF2 import PdfReader
+
+    try:
+        return len(PdfReader(as_stream(pdf_source)).pages)
+    except Exception:
+        return None
+
+
+def sniff_mime_type(pdf_source):
+    """파일 앞부분으로 MIME 형식 판별 — 알 수 없으면 application/pdf로 간주"""
+    stream = as_stream(pdf_source)
+    head = stream.read(8)
+    stream.seek(0)
+    for magic, mime_type in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return mime_type
+    return "application/pdf"
+
+
+def source_size(pdf_source):
+    """바이트 수 — 파일 객체는 끝으로 이동해 확인하고 다시 되감는다"""
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return len(pdf_source)
+    size = pdf_source.seek(0, io.SEEK_END)
+    pdf_source.seek(0)
+    return size
@@ -0,0 +1,328 @@
+"""
+session_jobs.py
+----------------------------------
+Streamlit 세션별 OCR / 교정 작업 저장소 (st.session_state)
+
+기능 요약:
+1. 업로드 파일 ID + 내용 해시로 문서 작업을 찾아, 위젯 조작으로 스크립트가 다시 실행돼도 OCR을 반복하지 않음
+2. OCR(공용 오케스트레이터)과 교정(모드별, 백그라운드 스레드)을 재실행 사이에도 계속 진행
+3. UI는 작업 상태와 진행 중 결과(수신된 페이지, 스트리밍 중인 교정 텍스트)를 주기적으로 조회
+4. OCR_JOB_BACKEND=queue이면 스레드 대신 작업 큐(job_queue)에 넣고 작업자 프로세스(job_worker)가 실행
+   — 같은 인터페이스의 Queued* 작업이 큐 상태를 조회 (큐가 가득 차면 AdmissionError)
+----------------------------------
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import os
+import threading
+import time
+
+from src.pdf_utils import hash_stream
+
+SESSION_JOB_WORKERS = int(os.environ.get("SESSION_JOB_WORKERS", 8))  # 프로세스 전체 백그라운드 작업 스레드 수
+MAX_SESSION_DOCUMENTS = int(os.environ.get("MAX_SESSION_DOCUMENTS", 5))  # 세션당 기억할 문서 수
+SESSION_STATE_KEY = "_document_jobs"
+OCR_JOB_BACKEND = os.environ.get("OCR_JOB_BACKEND", "thread")  # thread / queue
+STATUS_REFRESH_INTERVAL = 0.2  # 큐 작업 상태를 다시 조회하는 최소 간격 (초)
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+_executor = ThreadPoolExecutor(max_workers=SESSION_JOB_WORKERS, thread_name_prefix="session-job")
+
+
+class _Job:
+    """상태 / 오류 / 소요 시간 공통 부분 — 작업 스레드가 쓰고 UI 스레드가 읽는다"""
+
+    def __init__(self):
+        self.status = PENDING
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.position = None  # 큐 대기 순번 (큐 작업만)
+
+    @property
+    def running(self):
+        return self.status in (PENDING, RUNNING)
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _finish(self, error=None):
+        self.error = error
+        self.finished = time.perf_counter()
+        self.status = FAILED if error else DONE
+
+
+class CorrectionJob(_Job):
+    """교정 1건 (모드 + 선택적 교정 여부) — 스트리밍 중에는 text가 조금씩 늘어난다"""
+
+    def __init__(self, mode, selective):
+        super().__init__()
+        self.mode = mode
+        self.selective = selective
+        self.text = ""
+        self.stats = None
+        self.first_token_seconds = None
+
+    def run(self, document):
+        from src.spell_corrector import CorrectionError, correct_document, stream_correct_text
+
+        self.status = RUNNING
+        try:
+            if self.selective:
+                self.text, self.stats = correct_document(document, self.mode)
+            else:
+                for piece in stream_correct_text(document.text, self.mode):
+                    self.first_token_seconds = self.first_token_seconds or self.elapsed
+                    self.text += piece
+        except CorrectionError as e:
+            self._finish(str(e))
+        except Exception as e:
+            self._finish(f"❌ 교정 실패: {e}")
+        else:
+            self._finish()
+
+
+class DocumentJob(_Job):
+    """업로드 문서 1건의 OCR 진행 상황과 모드별 교정 결과 — OCR은 공용 오케스트레이터에 맡긴다"""
+
+    def __init__(self, file_id, content_hash, filename):
+        super().__init__()
+        self.file_id = file_id
+        self.content_hash = content_hash
+        self.filename = filename
+        self.document = None
+        self.corrections = {}  # (모드, 선택적 교정 여부) → CorrectionJob
+        self._ocr = None
+        self._done = threading.Event()
+
+    def pages(self):
+        """지금까지 받은 Page 목록 (페이지 번호 순)"""
+        return self._ocr.pages() if self._ocr else []
+
+    @property
+    def page_count(self):
+        return len(self.pages())
+
+    def start(self, source):
+        """OCR 제출 (즉시 반환) — 끝나면 오케스트레이터 스레드에서 상태를 갱신"""
+        from src.ocr_orchestrator import get_orchestrator
+
+        self.status = RUNNING
+        self._ocr = get_orchestrator().submit(source, self.filename, content_hash=self.content_hash)
+        self._ocr.add_done_callback(self._on_done)
+
+    def run(self, source):
+        """OCR 제출 후 끝날 때까지 대기"""
+        self.start(source)
+        self._done.wait()
+
+    def _on_done(self, ocr_job):
+        try:
+            self.document = ocr_job.document_sync(timeout=0)
+        except Exception as e:
+            self._finish(str(e))
+        else:
+            self._finish()
+        self._done.set()
+
+    def correction(self, mode, selective):
+        return self.corrections.get((mode, selective))
+
+    def start_correction(self, mode, selective):
+        """교정 작업 시작 — 같은 설정으로 이미 진행 중이거나 끝난 작업이 있으면 그대로 반환 (실패한 작업은 다시 시작)"""
+        job = self.corrections.get((mode, selective))
+        if job is None or job.status == FAILED:
+            job = CorrectionJob(mode, selective)
+            self.corrections[(mode, selective)] = job
+            _executor.submit(job.run, self.document)
+        return job
+
+
+class _QueuedJob:
+    """작업 큐에 넣은 작업 1건 — 상태 / 진행 상황은 큐에서 조회 (STATUS_REFRESH_INTERVAL 동안 재사용)"""
+
+    _STATUSES = {"queued": PENDING, "running": RUNNING, "done": DONE, "failed": FAILED}
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.job_id = job_id
+        self._status = None
+        self._checked = 0.0
+
+    def _refresh(self):
+        if self._status and self._status["status"] in ("done", "failed"):
+            return self._status
+        now = time.monotonic()
+        if self._status is None or now - self._checked >= STATUS_REFRESH_INTERVAL:
+            self._status = self.queue.status(self.job_id) or {
+                "status": "failed", "error": "❌ 작업이 큐에서 사라졌습니다. 다시 시도하세요.", "progress": {},
+                "position": None, "queued_seconds": 0.0, "run_seconds": 0.0,
+            }
+            self._checked = now
+        return self._status
+
+    @property
+    def status(self):
+        return self._STATUSES[self._refresh()["status"]]
+
+    @property
+    def running(self):
+        return self.status in (PENDING, RUNNING)
+
+    @property
+    def error(self):
+        return self._refresh()["error"]
+
+    @property
+    def position(self):
+        return self._refresh()["position"]
+
+    @property
+    def elapsed(self):
+        status = self._refresh()
+        return status["queued_seconds"] + status["run_seconds"]
+
+    @property
+    def progress(self):
+        return self._refresh()["progress"]
+
+
+class QueuedCorrectionJob(_QueuedJob):
+    """CorrectionJob의 큐 버전"""
+
+    def __init__(self, queue, job_id, mode, selective):
+        super().__init__(queue, job_id)
+        self.mode = mode
+        self.selective = selective
+        self._result = None
+
+    def _final(self):
+        if self._result is None and self.status == DONE:
+            self._result = json.loads(self.queue.result(self.job_id))
+        return self._result
+
+    @property
+    def text(self):
+        return (self._final() or self.progress).get("text") or ""
+
+    @property
+    def stats(self):
+        return (self._final() or {}).get("stats")
+
+    @property
+    def first_token_seconds(self):
+        return (self._final() or self.progress).get("first_token_seconds")
+
+
+class QueuedDocumentJob(_QueuedJob):
+    """DocumentJob의 큐 버전 — OCR 결과(Arrow 바이트)는 완료 후 한 번만 받아 온다"""
+
+    def __init__(self, queue, job_id, user_id, file_id, content_hash, filename):
+        super().__init__(queue, job_id)
+        self.user_id = user_id
+        self.file_id = file_id
+        self.content_hash = content_hash
+        self.filename = filename
+        self.corrections = {}
+        self._document = None
+
+    @classmethod
+    def submit(cls, queue, user_id, file_id, content_hash, filename, data):
+        payload = {"filename": filename, "content_hash": content_hash}
+        job_id = queue.submit("ocr", user_id, payload, input_bytes=data)
+        return cls(queue, job_id, user_id, file_id, content_hash, filename)
+
+    @property
+    def document(self):
+        if self._document is None and self.status == DONE:
+            from src.ocr_document import from_arrow_bytes
+            self._document = from_arrow_bytes(self.queue.result(self.job_id))
+        return self._document
+
+    def pages(self):
+        """완료 전에는 본문을 큐에 쓰지 않으므로 빈 목록 (받은 페이지 수는 page_count)"""
+        return self.document.pages if self.document else []
+
+    @property
+    def page_count(self):
+        return len(self.document.pages) if self.document else self.progress.get("pages", 0)
+
+    def correction(self, mode, selective):
+        return self.corrections.get((mode, selective))
+
+    def start_correction(self, mode, selective):
+        """DocumentJob.start_correction과 같음 — 큐가 가득 차면 AdmissionError"""
+        job = self.corrections.get((mode, selective))
+        if job is None or job.status == FAILED:
+            payload = {"document_job": self.job_id, "mode": mode, "selective": selective}
+            job_id = self.queue.submit("correct", self.user_id, payload)
+            job = QueuedCorrectionJob(self.queue, job_id, mode, selective)
+            self.corrections[(mode, selective)] = job
+        return job
+
+
+class SessionJobStore:
+    """세션 1개의 문서 작업 목록 — 최근 MAX_SESSION_DOCUMENTS개만 유지
+
+    queue를 주면 작업을 스레드 대신 작업 큐에 넣는다 (user_id 단위로 동시 작업 수 제한).
+    """
+
+    def __init__(self, max_documents=MAX_SESSION_DOCUMENTS, queue=None, user_id=None):
+        self.max_documents = max_documents
+        self.queue = queue
+        self.user_id = user_id
+        self._jobs = OrderedDict()  # (파일 ID, 내용 해시) → DocumentJob
+        self._hashes = {}  # 파일 ID → 내용 해시 (재실행마다 파일을 다시 해시하지 않음)
+
+    def document_job(self, uploaded_file):
+        """업로드 파일의 문서 작업 — 처음 보는 파일이면 백그라운드 OCR 시작"""
+        file_id = getattr(uploaded_file, "file_id", None) or uploaded_file.name
+        content_hash = self._hashes.get(file_id)
+        if content_hash is None:
+            content_hash = self._hashes[file_id] = hash_stream(uploaded_file)
+
+        key = (file_id, content_hash)
+        job = self._jobs.get(key)
+        if job is not None:
+            self._jobs.move_to_end(key)
+            return job
+
+        if self.queue is not None:
+            job = QueuedDocumentJob.submit(
+                self.queue, self.user_id, file_id, content_hash, uploaded_file.name, uploaded_file.getvalue(),
+            )
+        else:
+            job = DocumentJob(file_id, content_hash, uploaded_file.name)
+            # OCR 스레드는 자기 커서를 가진 BytesIO로 읽는다 (UploadedFile.getvalue()는 내용을 복사하지 않음)
+            job.start(io.BytesIO(uploaded_file.getvalue()))
+        self._jobs[key] = job
+        while len(self._jobs) > self.max_documents:
+            _, old = self._jobs.popitem(last=False)
+            self._hashes.pop(old.file_id, None)
+        return job
+
+    def discard(self, job):
+        """작업을 잊는다 (실패 후 다시 시도할 때)"""
+        self._jobs.pop((job.file_id, job.content_hash), None)
+
+
+def get_job_store():
+    """현재 Streamlit 세션의 작업 저장소 (OCR_JOB_BACKEND=queue이면 세션 ID를 사용자 ID로 큐 사용)"""
+    import streamlit as st
+
+    if SESSION_STATE_KEY not in st.session_state:
+        if OCR_JOB_BACKEND == "queue":
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            from src.job_queue import get_job_queue
+
+            ctx = get_script_run_ctx(suppress_warning=True)
+            store = SessionJobStore(queue=get_job_queue(), user_id=ctx.session_id if ctx else "local")
+        else:
+            store = SessionJobStore()
+        st.session_state[SESSION_STATE_KEY] = store
+    return st.session_state[SESSION_STATE_KEY]
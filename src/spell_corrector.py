@@ -1,40 +1,264 @@
-import streamlit as st
-import google.generativeai as genai 
+from concurrent.futures import ThreadPoolExecutor
+import os
+import queue
 
-def correct_text(text: str, mode: str = "맞춤법 교정") -> str:
-    """Gemini API를 사용해 텍스트 맞춤법/문법 교정 및 기타 모드 수행"""
+from src import gemini_client
+from src.clients import get_gemini_model
+from src.confidence_gate import (
+    LOW_CONFIDENCE_THRESHOLD,
+    find_suspicious_spans,
+    has_word_confidence,
+    load_dictionary,
+    splice,
+)
+from src.config import get_gemini_api_key
+from src.correction_cache import get_correction_cache, make_correction_key
+from src.text_chunker import estimate_tokens, join_chunks, split_into_chunks, CHUNK_TOKEN_BUDGET
+
+# ✅ 긴 문서 병렬 교정 설정
+GEMINI_MAX_WORKERS = int(os.environ.get("GEMINI_MAX_WORKERS", 4))
+GEMINI_MODEL_NAME = "gemini-2.5-flash"  # ⚡️ 빠른 응답을 위해 flash 사용
+PROMPT_VERSION = 1  # 프롬프트 문구를 바꾸면 올려서 이전 교정 캐시를 무효화
+DEFAULT_MODE = "맞춤법 교정"
+
+# ✅ 3. main_app.py의 4가지 모드에 맞춰 프롬프트 확장
+PROMPT_TEMPLATES = {
+    "맞춤법 교정": (
+        "당신은 한국어 맞춤법 전문가입니다. 다음 문장의 맞춤법, 띄어쓰기, 문법을 교정하고 수정된 결과만 보여주세요. "
+        "원본 내용은 포함하지 마세요:\n\n{text}"
+    ),
+    "문장 자연스럽게 다듬기": (
+        "다음 텍스트를 읽고, 내용의 핵심을 유지하면서 한국인이 보기에 가장 자연스럽고 세련된 문장으로 다듬어주세요. "
+        "수정된 결과만 출력해:\n\n{text}"
+    ),
+    "요약하기": "다음 문장을 간결하게 요약해줘. 결과만 보여줘:\n\n{text}",
+    "영어 번역": "다음 텍스트를 전문적인 비즈니스 영어로 번역해주세요. 번역된 결과만 출력해:\n\n{text}"
+}
+
+# 출력 길이가 입력과 비슷한 모드만 조각 단위로 나눠 처리 (요약은 문서 전체를 한 번에)
+CHUNKED_MODES = {"맞춤법 교정", "문장 자연스럽게 다듬기", "영어 번역"}
+# 저신뢰 문장만 골라 고쳐도 되는 모드 (원문 위치에 그대로 끼워 넣을 수 있어야 함)
+SELECTIVE_MODES = {"맞춤법 교정"}
+
+_STREAM_DONE = object()
+
+
+class CorrectionError(RuntimeError):
+    """스트리밍 / 문서 교정 실패 — 메시지는 correct_text의 오류 문자열과 같은 "❌ ..." 형식"""
+
+
+def _build_prompt(mode, text, context="", following=""):
+    prompt = PROMPT_TEMPLATES[mode].format(text=text)
+    if context:
+        # 조각 경계의 문맥 유지용 — 앞 문맥은 참고만 하고 출력하지 않도록 안내
+        prompt = (
+            f"[참고용 앞 문맥 — 이 부분은 출력하지 마세요]\n{context}\n[참고용 앞 문맥 끝]\n\n{prompt}"
+        )
+    if following:
+        prompt += f"\n\n[참고용 뒤 문맥 — 이 부분은 출력하지 마세요]\n{following}\n[참고용 뒤 문맥 끝]"
+    return prompt
+
+
+def _cached_generate(model, mode, text, context="", following=""):
+    """교정 캐시를 먼저 확인하고, 없을 때만 Gemini 호출 후 저장
+
+    조각 경계가 내용으로 정해지므로(split_into_chunks) 한 문단을 고치면 그 문단이 든 조각만 다시 교정된다.
+    """
+    cache = get_correction_cache()
+    key = make_correction_key(text, mode, GEMINI_MODEL_NAME, PROMPT_VERSION, context, following)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = gemini_client.generate(model, _build_prompt(mode, text, context, following))
+    cache.put(key, result)
+    return result
+
+
+def _correct_chunks(model, text, mode):
+    """문단/문장 경계로 나눈 조각들을 병렬 교정 후 원래 순서로 이어 붙이기"""
+    chunks = split_into_chunks(text)
+    workers = max(1, min(GEMINI_MAX_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-chunk") as pool:
+        outputs = list(pool.map(
+            lambda chunk: _cached_generate(model, mode, chunk.text, chunk.context),
+            chunks,
+        ))
+    return join_chunks(chunks, outputs)
+
+
+def _cached_stream(model, mode, text, context="", following=""):
+    """_cached_generate의 스트리밍 버전 — 캐시에 있으면 한 번에, 없으면 받는 대로 생성하고 끝나면 저장"""
+    cache = get_correction_cache()
+    key = make_correction_key(text, mode, GEMINI_MODEL_NAME, PROMPT_VERSION, context, following)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    pieces = []
+    for piece in gemini_client.generate_stream(model, _build_prompt(mode, text, context, following)):
+        pieces.append(piece)
+        yield piece
+    cache.put(key, "".join(pieces))
+
+
+def _strip_stream(pieces):
+    """조각 출력의 앞뒤 공백을 join_chunks와 같게 떼어 내며 전달 (끝 공백은 뒤에 내용이 올 때까지 보류)"""
+    pending, started = "", False
+    for piece in pieces:
+        if not started:
+            piece = piece.lstrip()
+            if not piece:
+                continue
+            started = True
+        body = piece.rstrip()
+        if body:
+            yield pending + body
+            pending = piece[len(body):]
+        else:
+            pending += piece
+
+
+def _drain(pieces_queue):
+    while True:
+        item = pieces_queue.get()
+        if item is _STREAM_DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _stream_chunks(model, text, mode):
+    """조각들을 병렬로 스트리밍 교정하되, 출력은 원래 순서대로 — 앞 조각이 끝나면 뒤 조각의 밀린 출력부터 이어서 생성"""
+    chunks = split_into_chunks(text)
+    queues = [queue.Queue() for _ in chunks]
+
+    def produce(index, chunk):
+        try:
+            for piece in _cached_stream(model, mode, chunk.text, chunk.context):
+                queues[index].put(piece)
+            queues[index].put(_STREAM_DONE)
+        except Exception as e:
+            queues[index].put(e)
+
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(GEMINI_MAX_WORKERS, len(chunks))), thread_name_prefix="gemini-stream",
+    )
+    try:
+        for index, chunk in enumerate(chunks):
+            pool.submit(produce, index, chunk)
+        for index, chunk in enumerate(chunks):
+            yield from _strip_stream(_drain(queues[index]))
+            if index < len(chunks) - 1:
+                yield chunk.joiner
+    finally:
+        # 소비자가 중간에 그만두면 아직 시작하지 않은 조각은 취소한다
+        pool.shutdown(wait=False, cancel_futures=True)
 
-    # ... (키 로드 및 configure 부분은 이전 단계에서 수정되어 정상 작동 중이어야 함)
+
+def _load_model():
+    """(모델, None) 또는 (None, 오류 메시지)"""
     try:
-        api_key = st.secrets["gemini"]["api_key"]
+        api_key = get_gemini_api_key()
     except KeyError:
-        return "❌ Gemini API 오류: '.streamlit/secrets.toml'에서 [gemini] 섹션 또는 'api_key' 키를 찾을 수 없습니다."
-    
+        return None, "❌ Gemini API 오류: '.streamlit/secrets.toml'의 [gemini] api_key 또는 GEMINI_API_KEY 환경 변수를 찾을 수 없습니다."
+
     try:
-        genai.configure(api_key=api_key)
-        # 🟢 모델 이름을 유효한 이름으로 변경합니다.
-        model = genai.GenerativeModel("gemini-2.5-flash") # ⚡️ 빠른 응답을 위해 flash 사용 
+        # 🟢 configure + 모델 생성은 프로세스당 한 번만 (이후 호출은 재사용)
+        return get_gemini_model(api_key, GEMINI_MODEL_NAME), None
     except Exception as e:
-        return f"❌ Gemini 클라이언트 초기화 실패: API 키를 확인하세요. (오류: {e})"
-    
-    # ✅ 3. main_app.py의 4가지 모드에 맞춰 프롬프트 확장
-    prompts = {
-        "맞춤법 교정": (
-            f"당신은 한국어 맞춤법 전문가입니다. 다음 문장의 맞춤법, 띄어쓰기, 문법을 교정하고 수정된 결과만 보여주세요. "
-            f"원본 내용은 포함하지 마세요:\n\n{text}"
-        ),
-        "문장 자연스럽게 다듬기": (
-            f"다음 텍스트를 읽고, 내용의 핵심을 유지하면서 한국인이 보기에 가장 자연스럽고 세련된 문장으로 다듬어주세요. "
-            f"수정된 결과만 출력해:\n\n{text}"
-        ),
-        "요약하기": f"다음 문장을 간결하게 요약해줘. 결과만 보여줘:\n\n{text}",
-        "영어 번역": f"다음 텍스트를 전문적인 비즈니스 영어로 번역해주세요. 번역된 결과만 출력해:\n\n{text}"
+        return None, f"❌ Gemini 클라이언트 초기화 실패: API 키를 확인하세요. (오류: {e})"
+
+
+def _correct_whole(text, mode):
+    """correct_text의 본체 — 실패하면 CorrectionError"""
+    model, error = _load_model()
+    if error:
+        raise CorrectionError(error)
+
+    if mode not in PROMPT_TEMPLATES:
+        mode = DEFAULT_MODE
+
+    try:
+        if mode in CHUNKED_MODES and estimate_tokens(text) > CHUNK_TOKEN_BUDGET:
+            return _correct_chunks(model, text, mode)
+        return _cached_generate(model, mode, text)
+    except Exception as e:
+        raise CorrectionError(gemini_client.describe_error(e)) from e
+
+
+def correct_text(text: str, mode: str = "맞춤법 교정") -> str:
+    """Gemini API를 사용해 텍스트 맞춤법/문법 교정 및 기타 모드 수행
+
+    긴 텍스트는 토큰 예산 단위로 나눠 동시에 교정한 뒤 순서대로 합친다.
+    실패하면 "❌ ..." 오류 메시지를 그대로 반환한다.
+    """
+    try:
+        return _correct_whole(text, mode)
+    except CorrectionError as e:
+        return str(e)
+
+
+def stream_correct_text(text: str, mode: str = "맞춤법 교정"):
+    """correct_text의 스트리밍 버전 — Gemini가 보내는 대로 결과 텍스트 조각을 차례로 생성
+
+    조각을 모두 이어 붙이면 correct_text의 결과와 같다.
+    긴 텍스트는 조각 단위로 동시에 교정하면서 앞 조각부터 순서대로 내보낸다.
+    실패하면 "❌ ..." 메시지를 담은 CorrectionError를 올린다.
+    """
+    model, error = _load_model()
+    if error:
+        raise CorrectionError(error)
+
+    if mode not in PROMPT_TEMPLATES:
+        mode = DEFAULT_MODE
+
+    try:
+        if mode in CHUNKED_MODES and estimate_tokens(text) > CHUNK_TOKEN_BUDGET:
+            yield from _stream_chunks(model, text, mode)
+        else:
+            yield from _cached_stream(model, mode, text)
+    except Exception as e:
+        raise CorrectionError(gemini_client.describe_error(e)) from e
+
+
+def correct_document(document, mode: str = "맞춤법 교정", threshold: float = LOW_CONFIDENCE_THRESHOLD,
+                     selective: bool = True):
+    """OcrDocument 교정 → (결과 텍스트, 통계) — 실패하면 CorrectionError
+
+    맞춤법 교정은 신뢰도가 낮은 단어나 사전(SPELLCHECK_DICTIONARY)에 없는 단어가 있는 문장만
+    앞뒤 문맥과 함께 Gemini에 보내고, 결과를 원문 위치에 끼워 넣는다.
+    selective=False이거나 단어 신뢰도가 없는 문서(텍스트 레이어 / Tesseract), 다른 모드는 전체를 교정한다.
+    """
+    text = document.text
+    dictionary = load_dictionary() if selective else None
+    if not selective or mode not in SELECTIVE_MODES or not (has_word_confidence(document) or dictionary):
+        return _correct_whole(text, mode), {"selective": False}
+
+    text, spans, sentence_count = find_suspicious_spans(document, threshold, dictionary)
+    selected_chars = sum(span.end - span.start for span in spans)
+    stats = {
+        "selective": True,
+        "sentences": sentence_count,
+        "spans": len(spans),
+        "selected_chars": selected_chars,
+        "total_chars": len(text),
+        "selected_ratio": round(selected_chars / len(text), 4) if text else 0.0,
     }
+    if not spans:
+        return text, stats
+
+    model, error = _load_model()
+    if error:
+        raise CorrectionError(error)
 
-    selected_prompt = prompts.get(mode, prompts["맞춤법 교정"])
-    
     try:
-        response = model.generate_content(selected_prompt)
-        return response.text
+        workers = max(1, min(GEMINI_MAX_WORKERS, len(spans)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-span") as pool:
+            outputs = list(pool.map(
+                lambda span: _cached_generate(model, mode, text[span.start:span.end], span.before, span.after),
+                spans,
+            ))
     except Exception as e:
-        return f"❌ Gemini API 호출 오류: {e}"
\ No newline at end of file
+        raise CorrectionError(gemini_client.describe_error(e)) from e
+    return splice(text, spans, outputs), stats
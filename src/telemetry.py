@@ -0,0 +1,211 @@
+"""
+telemetry.py
+----------------------------------
+단계별 구간(span) / 지표(metric) 계측 모듈 (OpenTelemetry API)
+
+기능 요약:
+1. stage("gcs_upload", bytes=...) 로 단계 구간을 열고 소요 시간 / 바이트 / 페이지 / 토큰 기록
+2. OpenTelemetry API로 span과 지표를 함께 발행 (SDK가 설정된 환경에서만 실제 전송, 아니면 no-op)
+3. 프로세스 내 집계를 Prometheus 텍스트 / JSON(p50·p95·p99 포함)으로 내보내기
+----------------------------------
+"""
+
+from collections import deque
+from contextlib import contextmanager
+import bisect
+import statistics
+import threading
+import time
+
+SERVICE_NAME = "ocr_spellcheck"
+# Prometheus 히스토그램 버킷 경계 (초)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+COUNTED_ATTRIBUTES = ("bytes", "pages", "tokens")
+SAMPLE_WINDOW = 2048  # 단계별 백분위 계산에 쓰는 최근 측정값 수
+
+_lock = threading.Lock()
+_stages = {}
+_cache_requests = {}
+_otel = None
+_otel_lock = threading.Lock()
+
+
+def _otel_handles():
+    """OpenTelemetry tracer / 지표 도구 (첫 사용 시 임포트 — 기동 시간에 포함하지 않음)"""
+    global _otel
+    with _otel_lock:
+        if _otel is None:
+            from opentelemetry import metrics, trace
+
+            meter = metrics.get_meter(SERVICE_NAME)
+            _otel = {
+                "tracer": trace.get_tracer(SERVICE_NAME),
+                "duration": meter.create_histogram(
+                    "ocr.stage.duration", unit="s", description="단계별 소요 시간",
+                ),
+                "counters": {
+                    name: meter.create_counter(f"ocr.stage.{name}", description=f"단계별 처리 {name}")
+                    for name in COUNTED_ATTRIBUTES
+                },
+                "cache": meter.create_counter("ocr.cache.requests", description="캐시 조회 (hit / miss)"),
+            }
+        return _otel
+
+
+class _StageRecord:
+    """단계 1종의 누적 집계"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.bucket_counts = [0] * (len(DURATION_BUCKETS) + 1)
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.totals = dict.fromkeys(COUNTED_ATTRIBUTES, 0)
+
+    def add(self, seconds, attributes, failed):
+        self.count += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        self.bucket_counts[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+        for name in COUNTED_ATTRIBUTES:
+            self.totals[name] += attributes.get(name) or 0
+
+
+class StageSpan:
+    """stage() 안에서 바이트 / 페이지 / 토큰 등 속성을 추가하는 핸들"""
+
+    def __init__(self, span, attributes):
+        self._span = span
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        for key, value in attributes.items():
+            if value is not None:
+                self._span.set_attribute(f"ocr.{key}", value)
+
+
+@contextmanager
+def stage(name, **attributes):
+    """단계 1회 계측 — with stage("result_poll") as span: ... span.set(pages=3)"""
+    otel = _otel_handles()
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    failed = False
+    started = time.perf_counter()
+    # 오류 기록은 직접 한다 — 생성기 단계가 소비자의 조기 종료로 닫히는 GeneratorExit은 오류가 아니다
+    with otel["tracer"].start_as_current_span(
+        f"ocr.{name}",
+        attributes={f"ocr.{key}": value for key, value in attributes.items()},
+        record_exception=False,
+        set_status_on_exception=False,
+    ) as span:
+        handle = StageSpan(span, attributes)
+        try:
+            yield handle
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            from opentelemetry.trace import Status, StatusCode
+
+            failed = True
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            _record_stage(otel, name, seconds, handle.attributes, failed)
+
+
+def record_stage(name, seconds, **attributes):
+    """stage()로 감쌀 수 없는 구간(예: 첫 토큰까지의 시간)을 직접 잰 값으로 기록"""
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    _record_stage(_otel_handles(), name, seconds, attributes, False)
+
+
+def _record_stage(otel, name, seconds, attributes, failed):
+    labels = {"stage": name}
+    otel["duration"].record(seconds, labels)
+    for key in COUNTED_ATTRIBUTES:
+        if attributes.get(key):
+            otel["counters"][key].add(attributes[key], labels)
+    with _lock:
+        _stages.setdefault(name, _StageRecord()).add(seconds, attributes, failed)
+
+
+def record_cache(cache_name, hit):
+    """캐시 조회 1회 기록 (OCR 결과 캐시 / 교정 캐시 등)"""
+    result = "hit" if hit else "miss"
+    _otel_handles()["cache"].add(1, {"cache": cache_name, "result": result})
+    with _lock:
+        key = (cache_name, result)
+        _cache_requests[key] = _cache_requests.get(key, 0) + 1
+
+
+def _percentile(sorted_samples, q):
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    return statistics.quantiles(sorted_samples, n=100, method="inclusive")[q - 1]
+
+
+def metrics_snapshot():
+    """단계별 횟수 / 오류 / 평균·p50·p95·p99(초) / 누적 바이트·페이지·토큰 + 캐시 적중 통계"""
+    with _lock:
+        stages = {}
+        for name, record in sorted(_stages.items()):
+            samples = sorted(record.samples)
+            stages[name] = {
+                "count": record.count,
+                "errors": record.errors,
+                "mean_seconds": round(record.total_seconds / record.count, 4),
+                **{f"p{q}_seconds": round(_percentile(samples, q), 4) for q in (50, 95, 99)},
+                **{attribute: total for attribute, total in record.totals.items() if total},
+            }
+        caches = {}
+        for (cache_name, result), count in sorted(_cache_requests.items()):
+            caches.setdefault(cache_name, {"hit": 0, "miss": 0})[result] = count
+    return {"stages": stages, "caches": caches}
+
+
+def export_prometheus():
+    """누적 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환"""
+    lines = [
+        "# HELP ocr_stage_duration_seconds 단계별 소요 시간",
+        "# TYPE ocr_stage_duration_seconds histogram",
+    ]
+    with _lock:
+        stages = sorted(_stages.items())
+        caches = sorted(_cache_requests.items())
+        for name, record in stages:
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + (float("inf"),), record.bucket_counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'ocr_stage_duration_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'ocr_stage_duration_seconds_sum{{stage="{name}"}} {record.total_seconds:.6f}')
+            lines.append(f'ocr_stage_duration_seconds_count{{stage="{name}"}} {record.count}')
+        lines += ["# HELP ocr_stage_errors_total 단계별 실패 횟수", "# TYPE ocr_stage_errors_total counter"]
+        lines += [f'ocr_stage_errors_total{{stage="{name}"}} {record.errors}' for name, record in stages]
+        for attribute in COUNTED_ATTRIBUTES:
+            lines += [
+                f"# HELP ocr_stage_{attribute}_total 단계별 누적 {attribute}",
+                f"# TYPE ocr_stage_{attribute}_total counter",
+            ]
+            lines += [
+                f'ocr_stage_{attribute}_total{{stage="{name}"}} {record.totals[attribute]}'
+                for name, record in stages
+            ]
+        lines += ["# HELP ocr_cache_requests_total 캐시 조회 횟수", "# TYPE ocr_cache_requests_total counter"]
+        lines += [
+            f'ocr_cache_requests_total{{cache="{cache_name}",result="{result}"}} {count}'
+            for (cache_name, result), count in caches
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """프로세스 내 집계 초기화 (벤치마크 / 배치 구간별 측정용)"""
+    with _lock:
+        _stages.clear()
+        _cache_requests.clear()
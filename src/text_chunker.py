@@ -0,0 +1,149 @@
+"""
+text_chunker.py
+----------------------------------
+긴 텍스트를 Gemini 호출 단위로 나누는 모듈
+
+기능 요약:
+1. 문단 → 줄 → 문장 경계 순으로 토큰 예산 이하 조각 생성
+2. 조각 경계는 내용으로 정함(content-defined) — 한 문단을 고쳐도 다른 조각의 경계가 밀리지 않아
+   교정 캐시에서 그 조각만 다시 교정
+3. 문단 중간에서 잘린 조각에만 바로 앞 문맥(overlap)을 참고용으로 첨부
+4. 조각 사이 구분자를 기억해 원래 순서/형태로 다시 이어 붙이기
+----------------------------------
+"""
+
+from collections import namedtuple
+import hashlib
+import math
+import re
+
+CHUNK_TOKEN_BUDGET = 2000   # 조각 1개당 최대 추정 토큰 수
+OVERLAP_CHARS = 200         # 다음 조각에 참고용으로 넘길 앞 문맥 길이
+CUT_ANCHOR_CHARS = 32       # 자르기 지점 판정에 쓰는 단위 앞부분 길이
+
+PARAGRAPH_BREAK = re.compile(r"(\n[ \t]*\n+)")
+SENTENCE_END = re.compile(r"(?<=[.!?。])(\s+)")
+
+# text: 교정할 본문, context: 참고용 앞 문맥, joiner: 다음 조각과 이을 구분자
+Chunk = namedtuple("Chunk", ["text", "context", "joiner"])
+
+
+def estimate_tokens(text):
+    """토큰 수 보수적 추정 — ASCII는 약 4자당 1토큰, 한글 등은 1자당 1토큰"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def _split_keep(pattern, text):
+    """구분자를 유지한 채 (조각, 뒤 구분자) 목록으로 분리"""
+    parts = pattern.split(text)
+    pieces = []
+    for i in range(0, len(parts), 2):
+        joiner = parts[i + 1] if i + 1 < len(parts) else ""
+        if parts[i] or joiner:
+            pieces.append((parts[i], joiner))
+    return pieces
+
+
+def _hard_split(text, budget):
+    """경계를 찾을 수 없는 긴 문장은 예산에 맞춰 글자 단위로 자른다"""
+    pieces, current = [], ""
+    for ch in text:
+        if current and estimate_tokens(current + ch) > budget:
+            pieces.append((current, ""))
+            current = ""
+        current += ch
+    if current:
+        pieces.append((current, ""))
+    return pieces
+
+
+def _units(text, budget):
+    """예산 이하의 (단위 텍스트, 뒤 구분자) 목록 — 문단 → 줄 → 문장 → 글자 순으로 세분화"""
+    units = []
+    for paragraph, p_joiner in _split_keep(PARAGRAPH_BREAK, text):
+        if estimate_tokens(paragraph) <= budget:
+            units.append((paragraph, p_joiner))
+            continue
+        lines = _split_keep(re.compile(r"(\n)"), paragraph)
+        for line_index, (line, l_joiner) in enumerate(lines):
+            sub = [(line, l_joiner)]
+            if estimate_tokens(line) > budget:
+                sub = []
+                for sentence, s_joiner in _split_keep(SENTENCE_END, line):
+                    if estimate_tokens(sentence) > budget:
+                        hard = _hard_split(sentence, budget)
+                        hard[-1] = (hard[-1][0], s_joiner)
+                        sub.extend(hard)
+                    else:
+                        sub.append((sentence, s_joiner))
+                sub[-1] = (sub[-1][0], sub[-1][1] + l_joiner)
+            if line_index == len(lines) - 1:
+                sub[-1] = (sub[-1][0], sub[-1][1] + p_joiner)
+            units.extend(sub)
+    return units
+
+
+def _cut_value(unit, target):
+    """단위 뒤에서 자를지 판정할 값 — 1보다 작으면 자르기 지점
+
+    단위 앞부분의 해시([0, 1))를 (단위 토큰 수를 2의 거듭제곱으로 내림한 값 / target)으로 나눈다.
+    조각은 평균 target 토큰 안팎이 되고, 앞부분과 길이 구간만 보므로 문단 중간을 고쳐도 값이 거의 그대로다.
+    """
+    anchor = unit.strip()[:CUT_ANCHOR_CHARS].encode("utf-8")
+    value = int.from_bytes(hashlib.blake2b(anchor, digest_size=8).digest(), "big") / 2 ** 64
+    size = 1 << (max(1, estimate_tokens(unit)).bit_length() - 1)
+    return value * target / size
+
+
+def _pack(units, target, budget):
+    """(단위, 구분자) 목록을 자르기 지점(_cut_value < 1)에서 잘라 [(조각 텍스트, 뒤 구분자)] 생성
+
+    예산을 넘는 구간은 앞에서부터 채우지 않고 target을 1/4로 줄여 다시 자른다 —
+    촘촘한 자르기 지점은 성긴 지점을 모두 포함하므로 여기서도 경계가 내용에 고정된다.
+    (target이 1이면 모든 단위가 조각이 되고, 단위는 _units에서 이미 예산 이하)
+    """
+    segments, current = [], []
+    for unit, joiner in units:
+        current.append((unit, joiner))
+        if _cut_value(unit, target) < 1:
+            segments.append(current)
+            current = []
+    if current:
+        segments.append(current)
+
+    chunks = []
+    for segment in segments:
+        text = "".join(unit + joiner for unit, joiner in segment[:-1]) + segment[-1][0]
+        if len(segment) == 1 or estimate_tokens(text) <= budget:
+            chunks.append((text, segment[-1][1]))
+        else:
+            chunks.extend(_pack(segment, max(1, target // 4), budget))
+    return chunks
+
+
+def split_into_chunks(text, budget=CHUNK_TOKEN_BUDGET, overlap_chars=OVERLAP_CHARS):
+    """텍스트를 토큰 예산 이하의 Chunk 목록으로 분할
+
+    앞에서부터 채워 넣는 방식이면 한 문단의 길이가 바뀔 때 뒤의 경계가 모두 밀리므로,
+    단위(문단 / 줄 / 문장) 앞부분의 해시로 정한 자르기 지점에서만 자른다.
+    """
+    units = _units(text, budget)
+    chunks = _pack(units, max(1, budget // 2), budget) if units else [("", "")]
+
+    result = []
+    for index, (chunk_text, joiner) in enumerate(chunks):
+        context = ""
+        previous_text, previous_joiner = chunks[index - 1] if index > 0 else ("", "")
+        # 문단 경계에서 나뉜 조각은 앞 문맥 없이도 교정할 수 있다 (앞 문단을 고쳐도 이 조각의 프롬프트가 그대로)
+        if previous_text and overlap_chars and not PARAGRAPH_BREAK.search(previous_joiner):
+            context = previous_text[-overlap_chars:]
+        result.append(Chunk(chunk_text, context, joiner))
+    return result
+
+
+def join_chunks(chunks, outputs):
+    """교정된 조각들을 원래 구분자로 다시 이어 붙이기"""
+    return "".join(
+        output.strip() + chunk.joiner for chunk, output in zip(chunks, outputs)
+    ).rstrip()
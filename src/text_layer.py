@@ -0,0 +1,84 @@
+"""
+text_layer.py
+----------------------------------
+PDF 텍스트 레이어 사전 추출 모듈 (PyPDF2)
+
+기능 요약:
+1. 디지털 원본 PDF의 내장 텍스트를 페이지별로 추출
+2. 텍스트가 없거나 깨진 페이지만 OCR 대상으로 선별
+3. OCR 대상 페이지만 모은 부분 PDF 생성
+----------------------------------
+"""
+
+import io
+import os
+import unicodedata
+
+from src.pdf_utils import as_stream
+
+TEXT_LAYER_ENABLED = os.environ.get("OCR_TEXT_LAYER", "1") != "0"
+MIN_TEXT_CHARS = 20       # 이보다 글자가 적으면 스캔 페이지로 간주
+MIN_CLEAN_RATIO = 0.9     # 정상 문자 비율이 이보다 낮으면 깨진 텍스트로 간주
+
+
+def extract_text_layer(pdf_source):
+    """페이지별 내장 텍스트 목록 반환 — PDF를 읽을 수 없으면 None"""
+    from PyPDF2 import PdfReader
+
+    try:
+        reader = PdfReader(as_stream(pdf_source))
+        pages = reader.pages
+    except Exception:
+        return None
+
+    texts = []
+    for page in pages:
+        try:
+            texts.append(page.extract_text() or "")
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def _is_clean_char(ch):
+    if ch.isspace() or ch.isalnum():
+        return True
+    category = unicodedata.category(ch)
+    # 구두점/기호는 정상, 제어·사설 영역·대체 문자(U+FFFD)는 깨진 글자
+    return category[0] in ("P", "S") and ch != "\ufffd"
+
+
+def is_usable_text(text):
+    """OCR 없이 써도 될 만큼 충분하고 깨지지 않은 텍스트인지 판단"""
+    if "(cid:" in text:
+        return False
+    visible = [ch for ch in text if not ch.isspace()]
+    if len(visible) < MIN_TEXT_CHARS:
+        return False
+    clean = sum(1 for ch in visible if _is_clean_char(ch))
+    return clean / len(visible) >= MIN_CLEAN_RATIO
+
+
+def split_pages(texts):
+    """(텍스트 레이어로 충분한 페이지 {번호: 텍스트}, OCR이 필요한 페이지 번호 목록)"""
+    fast_pages, ocr_pages = {}, []
+    for page_number, text in enumerate(texts, start=1):
+        if is_usable_text(text):
+            fast_pages[page_number] = text
+        else:
+            ocr_pages.append(page_number)
+    return fast_pages, ocr_pages
+
+
+def build_subset_pdf(pdf_source, page_numbers):
+    """지정한 페이지(1부터 시작)만 담은 PDF를 처음으로 되감은 BytesIO로 반환"""
+    from PyPDF2 import PdfReader, PdfWriter
+
+    reader = PdfReader(as_stream(pdf_source))
+    writer = PdfWriter()
+    for page_number in page_numbers:
+        writer.add_page(reader.pages[page_number - 1])
+    out = io.BytesIO()
+    writer.write(out)
+    out.seek(0)
+    return out
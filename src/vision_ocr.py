@@ -7,30 +7,101 @@ Google Cloud Vision API를 이용한 PDF OCR 모듈
 1. GCS 버킷에 PDF 업로드
 2. Vision API로 비동기 OCR 수행
 3. OCR 결과 JSON 파일을 가져와 텍스트로 반환
+4. 작은 PDF(≤5페이지)와 JPG/PNG는 GCS 없이 동기 인라인 요청으로 바로 OCR
+5. 결과를 모두 받은 작업의 업로드 / 결과 파일은 백그라운드에서 삭제
+6. 블록 / 단어 구조와 신뢰도를 담은 문서 모델(ocr_document)로 결과를 보존하고 Arrow 형식으로 캐시
+7. 파이프라인은 Page와 Vision 작업 대기 지점(OperationWait)을 내보내는 단계 생성기(iter_ocr_steps)로,
+   동기 호출자는 run_steps()로 그 자리에서 기다리고 오케스트레이터는 이벤트 루프에서 기다린다
 ----------------------------------
 """
 
-import streamlit as st
-from google.cloud import vision
-from google.cloud import storage
-import google.cloud.logging_v2 as logging_v2
-from google.oauth2 import service_account
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as wait_futures
+from contextlib import closing
+import asyncio
+import threading
 import time
 import os
-import json
 import logging
+import uuid
+
+from src.clients import (
+    get_bucket,
+    get_logging_client,
+    get_storage_client,
+    get_vision_client,
+)
+from src.config import in_script_thread
+from src.gcs_cleanup import schedule_job_cleanup
+from src.gcs_upload import upload_stream
+from src.ocr_batcher import get_coalescer
+from src.ocr_assembler import discover_shards, iter_shard_responses
+from src.ocr_cache import get_ocr_cache, make_cache_key_from_hash
+from src.ocr_document import (
+    OcrDocument,
+    Page,
+    from_arrow_bytes,
+    iter_document_pages,
+    page_from_proto,
+    to_arrow_bytes,
+)
+from src.ocr_completion import (
+    OPERATION_DEADLINE,
+    RESULT_POLL_DEADLINE,
+    output_prefixes_from_response,
+    poll_until,
+)
+from src.ocr_engines import get_engine
+from src.pdf_utils import (
+    IMAGE_MIME_TYPES,
+    as_stream,
+    count_pdf_pages,
+    hash_stream,
+    sniff_mime_type,
+    source_size,
+)
+from src.telemetry import record_stage, stage
+from src.text_layer import (
+    TEXT_LAYER_ENABLED,
+    build_subset_pdf,
+    extract_text_layer,
+    split_pages,
+)
 
 # ----------------------------------------------------------------------
 # ✅ 1️⃣ 인증 설정
 # ----------------------------------------------------------------------
-raw_info = dict(st.secrets["gcp_service_account"])
-raw_info["private_key"] = raw_info["private_key"].replace("\\n", "\n")
-gcp_credentials = service_account.Credentials.from_service_account_info(raw_info)
+# 인증 정보와 Google SDK는 src.clients에서 처음 사용할 때 생성/임포트한다
+# (업로드 없이 화면만 보는 사용자나 작업 프로세스 기동 비용을 줄이기 위함)
 
 # ✅ GCS 버킷 및 결과 경로 설정
 BUCKET_NAME = "ocr-temp-bucket-for-korean-app"  # ⚠️ 실제 버킷 이름으로 수정 필요
 OUTPUT_PREFIX = "ocr_results/"
+OUTPUT_BATCH_SIZE = 20  # Vision 결과 JSON 1개당 페이지 수 (API 기본값)
+
+# ✅ 인라인(동기) OCR 기준 — 동기 API는 요청당 5페이지, 요청 크기 약 10MB까지 허용
+INLINE_MAX_PAGES = int(os.environ.get("OCR_INLINE_MAX_PAGES", 5))
+INLINE_MAX_BYTES = int(os.environ.get("OCR_INLINE_MAX_BYTES", 5 * 1024 * 1024))
+INLINE_PAGES_PER_REQUEST = int(os.environ.get("OCR_INLINE_PAGES_PER_REQUEST", 1))  # 1~5, 작을수록 병렬 요청 수 증가
+INLINE_DEADLINE = float(os.environ.get("OCR_INLINE_DEADLINE", 60))
+
+# ✅ 단계별 동시 실행 한도 (여러 문서를 동시에 처리할 때 적용, set_stage_limits로 조정)
+_stage_slots = {
+    "upload": threading.BoundedSemaphore(int(os.environ.get("OCR_MAX_UPLOADS", 8))),
+    "operation": threading.BoundedSemaphore(int(os.environ.get("OCR_MAX_OPERATIONS", 8))),
+    "download": threading.BoundedSemaphore(int(os.environ.get("OCR_MAX_DOWNLOADS", 8))),
+    # 인라인 OCR은 업로드도 비동기 작업도 없으므로 따로 센다
+    "inline": threading.BoundedSemaphore(int(os.environ.get("OCR_MAX_INLINE", 8))),
+}
+
+def set_stage_limits(upload=None, operation=None, download=None, inline=None):
+    """업로드 / Vision 작업 / 결과 다운로드 / 인라인 OCR 단계의 동시 실행 한도 변경 (작업 시작 전에 호출)"""
+    for stage, limit in (("upload", upload), ("operation", operation), ("download", download), ("inline", inline)):
+        if limit:
+            _stage_slots[stage] = threading.BoundedSemaphore(limit)
+
+def operation_slot():
+    """Vision 비동기 작업 1건이 쓰는 슬롯 (요청 묶음기가 실제 작업을 제출할 때 사용)"""
+    return _stage_slots["operation"]
 
 # ----------------------------------------------------------------------
 # 🧠 2️⃣ 로깅 유틸리티
@@ -44,30 +115,51 @@ logger.setLevel(logging.INFO)
 
 def log(msg):
     logger.info(msg)
-    if "log_text" in st.session_state:
-        st.session_state["log_text"] += msg + "\n"
+    # 배치(헤드리스) 실행이나 세션 작업 스레드에서는 세션 상태가 없으므로 로거에만 기록
+    if in_script_thread():
+        import streamlit as st
+        if "log_text" in st.session_state:
+            st.session_state["log_text"] += msg + "\n"
 
 # ----------------------------------------------------------------------
 # ☁️ 3️⃣ GCS 유틸리티 함수
 # ----------------------------------------------------------------------
 def refresh_gcs_client():
-    client = storage.Client(credentials=gcp_credentials)
-    bucket = client.bucket(BUCKET_NAME)
-    bucket.reload()
-    return client, bucket
-
-def wait_for_gcs_file(bucket, prefix, timeout=15):
-    """GCS에서 Vision 결과 파일이 생성될 때까지 대기"""
-    for _ in range(timeout):
-        blobs = list(bucket.list_blobs(prefix=prefix))
-        if any(blob.name.endswith(".json") for blob in blobs):
-            return True
-        time.sleep(1)
-    return False
+    """공용 GCS 클라이언트와 버킷 핸들 반환 (프로세스당 한 번만 생성)"""
+    return get_storage_client(), get_bucket(BUCKET_NAME)
+
+def make_job_prefix():
+    """작업마다 고유한 결과 경로 생성 (동시 사용자 간 결과 섞임 방지)"""
+    return f"{OUTPUT_PREFIX}{uuid.uuid4().hex}/"
+
+def expected_shard_names(prefix, page_count, batch_size=OUTPUT_BATCH_SIZE):
+    """Vision이 생성할 결과 파일 이름 목록 (output-N-to-M.json)"""
+    return [
+        f"{prefix}output-{start}-to-{min(start + batch_size - 1, page_count)}.json"
+        for start in range(1, page_count + 1, batch_size)
+    ]
+
+def wait_for_gcs_file(bucket, prefix, timeout=RESULT_POLL_DEADLINE, blob_names=None):
+    """GCS에서 Vision 결과 파일이 생성될 때까지 대기 (지수 백오프 + 지터)
+
+    blob_names가 주어지면 목록 조회 없이 아직 확인되지 않은 파일만 다시 확인한다.
+    """
+    if blob_names:
+        pending = set(blob_names)
+
+        def check():
+            pending.difference_update([n for n in list(pending) if bucket.blob(n).exists()])
+            return not pending
+    else:
+        def check():
+            return any(blob.name.endswith(".json") for blob in bucket.list_blobs(prefix=prefix))
+
+    with stage("result_poll"):
+        return poll_until(check, deadline=timeout)
 
 def verify_file_via_logging(gcs_path):
     """Cloud Logging으로 Vision OCR 업로드 이력 확인"""
-    log_client = logging_v2.Client(credentials=gcp_credentials)
+    log_client = get_logging_client()
     query = f'resource.type="gcs_bucket" AND textPayload:("{gcs_path}")'
     entries = list(log_client.list_entries(filter_=query))
     return len(entries) > 0
@@ -75,83 +167,359 @@ def verify_file_via_logging(gcs_path):
 # ----------------------------------------------------------------------
 # 👁 4️⃣ Vision API OCR 실행
 # ----------------------------------------------------------------------
-def perform_ocr(image_path, output_prefix):
-    """GCS 상의 PDF 파일을 Vision API로 OCR 처리"""
-    client = vision.ImageAnnotatorClient(credentials=gcp_credentials)
+def build_ocr_request(gcs_source_uri, gcs_destination_uri, batch_size=OUTPUT_BATCH_SIZE):
+    """AsyncAnnotateFileRequest 1건 (PDF 문서 텍스트 감지)"""
+    from google.cloud import vision
+
+    return {
+        "input_config": {
+            "gcs_source": {"uri": gcs_source_uri},
+            "mime_type": "application/pdf"
+        },
+        "features": [{"type": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
+        "output_config": {
+            "gcs_destination": {"uri": gcs_destination_uri},
+            "batch_size": batch_size,
+        },
+    }
+
+def submit_ocr(image_path, output_prefix, batch_size=OUTPUT_BATCH_SIZE, deadline=OPERATION_DEADLINE):
+    """GCS 상의 PDF 파일 OCR 요청을 제출하고 작업 응답으로 완료되는 Future 반환 (기다리지 않음)
+
+    batch_size가 작을수록 결과 샤드가 잘게 나뉘어 병렬 다운로드 효과가 커진다.
+    동시에 들어온 다른 요청과 묶어 한 번의 Vision 작업으로 제출한다 (OCR_COALESCE_WINDOW=0이면 단독 제출).
+    작업 동시 실행 한도(operation 슬롯)는 요청 묶음기가 실제 작업마다 적용한다.
+    """
     gcs_source_uri = f"gs://{BUCKET_NAME}/{image_path}"
     gcs_destination_uri = f"gs://{BUCKET_NAME}/{output_prefix}"
 
     log(f"📤 OCR 요청 시작: {gcs_source_uri}")
 
-    async_request = {
-        "requests": [{
-            "input_config": {
-                "gcs_source": {"uri": gcs_source_uri},
-                "mime_type": "application/pdf"
-            },
-            "features": [{"type": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
-            "output_config": {
-                "gcs_destination": {"uri": gcs_destination_uri}
-            },
-        }]
-    }
+    request = build_ocr_request(gcs_source_uri, gcs_destination_uri, batch_size)
+    return get_coalescer().submit(request, deadline)
 
-    operation = client.async_batch_annotate_files(requests=async_request["requests"])
-    operation.result(timeout=300)
+def perform_ocr(image_path, output_prefix, batch_size=OUTPUT_BATCH_SIZE, deadline=OPERATION_DEADLINE):
+    """GCS 상의 PDF 파일을 Vision API로 OCR 처리하고 작업 응답 반환 (submit_ocr 후 이 스레드에서 대기)"""
+    with stage("vision_operation"):
+        response = submit_ocr(image_path, output_prefix, batch_size, deadline).result(timeout=deadline)
     log("✅ Vision API OCR 처리 완료")
+    return response
+
+class OperationWait:
+    """단계 생성기가 Vision 작업 완료를 기다리는 지점
+
+    생성기가 이 객체를 내보내면 구동하는 쪽이 wait() 또는 wait_async()로 완료를 기다린 뒤 다음 단계를 요청하고,
+    생성기는 result()로 작업 응답을 꺼낸다 (실패 / 마감 초과는 result()에서 예외).
+    """
+
+    def __init__(self, future, deadline=OPERATION_DEADLINE):
+        self.future = future
+        self.deadline = deadline
+        self._started = time.perf_counter()
+
+    def wait(self):
+        """(동기 구동) 이 스레드에서 작업 완료 대기"""
+        wait_futures([self.future], timeout=self.deadline)
+
+    async def wait_async(self):
+        """(비동기 구동) 스레드 / 단계 슬롯을 잡지 않고 이벤트 루프에서 작업 완료 대기"""
+        await asyncio.wait([asyncio.wrap_future(self.future)], timeout=self.deadline)
+
+    def result(self):
+        response = self.future.result(timeout=0)
+        record_stage("vision_operation", time.perf_counter() - self._started)
+        log("✅ Vision API OCR 처리 완료")
+        return response
+
+def run_steps(steps):
+    """단계 생성기를 동기로 구동 — OperationWait는 이 스레드에서 기다리고 Page만 생성"""
+    with closing(steps):
+        for step in steps:
+            if isinstance(step, OperationWait):
+                step.wait()
+            else:
+                yield step
+
+def use_inline_ocr(pdf_source, mime_type=None, page_count=None):
+    """GCS 업로드 없이 동기 인라인 요청으로 처리할 입력인지 판단
+
+    이미지(JPG/PNG)는 비동기 파일 API가 받지 않으므로 항상 인라인으로 처리한다.
+    """
+    mime_type = mime_type or sniff_mime_type(pdf_source)
+    if mime_type in IMAGE_MIME_TYPES:
+        return True
+    if source_size(pdf_source) > INLINE_MAX_BYTES:
+        return False
+    page_count = page_count if page_count is not None else count_pdf_pages(pdf_source)
+    return bool(page_count) and page_count <= INLINE_MAX_PAGES
+
+def _inline_pdf_pages(content, pages):
+    """PDF 내용을 인라인으로 보내 지정한 페이지만 동기 OCR → [Page]"""
+    from google.cloud import vision
+
+    request = {
+        "input_config": {"content": content, "mime_type": "application/pdf"},
+        "features": [{"type": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
+        "pages": pages,
+    }
+    with stage("vision_inline", bytes=len(content), pages=len(pages)):
+        response = get_vision_client().batch_annotate_files(requests=[request], timeout=INLINE_DEADLINE)
+    results = []
+    for page_number, page_response in zip(pages, response.responses[0].responses):
+        if page_response.error.message:
+            raise RuntimeError(f"Vision 인라인 OCR 오류 ({page_number}페이지): {page_response.error.message}")
+        if page_response.full_text_annotation.text:
+            results.append(page_from_proto(page_response, page_number))
+    return results
+
+def _inline_image_page(content):
+    """이미지 1장을 동기 OCR → [Page]"""
+    with stage("vision_inline", bytes=len(content), pages=1):
+        response = get_vision_client().document_text_detection(image={"content": content}, timeout=INLINE_DEADLINE)
+    if response.error.message:
+        raise RuntimeError(f"Vision 인라인 OCR 오류: {response.error.message}")
+    return [page_from_proto(response, 1)] if response.full_text_annotation.text else []
+
+def iter_inline_ocr_pages(pdf_source, mime_type=None, page_count=None):
+    """GCS / 비동기 작업 없이 동기 요청으로 OCR하며 Page 생성
+
+    PDF는 INLINE_PAGES_PER_REQUEST 페이지씩 나눠 병렬 요청하고, 끝나는 요청부터 내보낸다.
+    """
+    mime_type = mime_type or sniff_mime_type(pdf_source)
+    # 인라인 대상은 크기 제한 이하이므로 내용을 한 번만 읽어 모든 요청이 공유한다
+    content = as_stream(pdf_source).read()
+    if mime_type in IMAGE_MIME_TYPES:
+        yield from _inline_image_page(content)
+        return
+
+    page_count = page_count or count_pdf_pages(pdf_source) or 1
+    per_request = max(1, min(INLINE_PAGES_PER_REQUEST, 5))
+    page_groups = [
+        list(range(start, min(start + per_request, page_count + 1)))
+        for start in range(1, page_count + 1, per_request)
+    ]
+    with ThreadPoolExecutor(max_workers=len(page_groups), thread_name_prefix="ocr-inline") as pool:
+        futures = [pool.submit(_inline_pdf_pages, content, pages) for pages in page_groups]
+        for future in as_completed(futures):
+            yield from future.result()
 
 # ----------------------------------------------------------------------
 # 🧾 5️⃣ OCR 결과 가져오기
 # ----------------------------------------------------------------------
-def fetch_ocr_result(prefix):
-    """Vision OCR 결과 JSON 파일을 가져와 텍스트 추출"""
+def _iter_downloads(bucket, blob_names):
+    started = time.perf_counter()
+    for name, shard_responses, latency in iter_shard_responses(bucket, blob_names):
+        log(f"⬇️ {os.path.basename(name)} 수신 ({len(shard_responses)}페이지, {latency:.2f}초)")
+        yield name, shard_responses
+    log(f"📦 결과 샤드 {len(blob_names)}개 조립 완료 ({time.perf_counter() - started:.2f}초)")
+
+def iter_ocr_result(prefix, page_count=None, batch_size=OUTPUT_BATCH_SIZE,
+                    operation_response=None, deadline=RESULT_POLL_DEADLINE):
+    """Vision OCR 결과 샤드를 페이지 순서대로 내려받으며 샤드별 응답 목록 생성
+
+    page_count를 알면 결과 파일 이름을 계산해 바로 내려받고,
+    모르면 이 작업 전용 prefix만 한 번 조회한다.
+    operation_response가 이 prefix의 완료를 확인해 주면 폴링 없이 바로 내려받는다.
+    결과를 찾지 못하면 RuntimeError — 일부만 받은 결과가 완료된 문서로 취급되지 않도록 한다.
+    """
+    from google.api_core.exceptions import NotFound
+
     client, bucket = refresh_gcs_client()
-    success = wait_for_gcs_file(bucket, prefix)
+    blob_names = expected_shard_names(prefix, page_count, batch_size) if page_count else None
+
+    completed = (
+        operation_response is not None
+        and prefix in output_prefixes_from_response(operation_response, BUCKET_NAME)
+    )
+    if completed:
+        log("✅ 작업 응답으로 결과 경로 확인 — 폴링 생략")
+        success = True
+    else:
+        success = wait_for_gcs_file(bucket, prefix, timeout=deadline, blob_names=blob_names)
 
     if not success:
         log("⚠️ GCS에서 결과 파일을 찾지 못했습니다. Cloud Logging 조회 중...")
-        predicted_uri = f"gs://{BUCKET_NAME}/{prefix}/output-1-to-1.json"
+        first_name = blob_names[0] if blob_names else f"{prefix}output-1-to-1.json"
+        predicted_uri = f"gs://{BUCKET_NAME}/{first_name}"
         if verify_file_via_logging(predicted_uri):
-            log("✅ Cloud Logging에서 업로드 기록을 확인했습니다. 잠시 후 재시도하세요.")
-        else:
-            log("❌ 업로드 로그 없음 — Vision API 오류 가능.")
-        return None
+            raise RuntimeError("OCR 결과가 아직 준비되지 않았습니다 (Cloud Logging에 기록 있음). 잠시 후 재시도하세요.")
+        raise RuntimeError("OCR 결과 파일을 찾지 못했습니다 — Vision API 오류 가능.")
 
-    blobs = list(bucket.list_blobs(prefix=prefix))
-    json_blobs = [b for b in blobs if b.name.endswith(".json")]
-    if not json_blobs:
-        log("⚠️ JSON 결과 파일이 없습니다.")
-        return None
+    if blob_names is None:
+        blob_names = discover_shards(bucket, prefix)
+    if not blob_names and completed:
+        wait_for_gcs_file(bucket, prefix, timeout=deadline)
+        blob_names = discover_shards(bucket, prefix)
+    if not blob_names:
+        raise RuntimeError("OCR 결과 JSON 파일이 없습니다.")
+
+    received = set()
+    try:
+        for name, shard_responses in _iter_downloads(bucket, blob_names):
+            received.add(name)
+            yield shard_responses
+    except NotFound:
+        # 예상 샤드 이름이 실제와 다를 때(페이지 수 불일치 등) 한 번만 실제 목록으로 재시도
+        log("⚠️ 예상한 결과 파일이 없습니다. 결과 경로를 다시 조회합니다...")
+        wait_for_gcs_file(bucket, prefix, timeout=deadline)
+        remaining = [n for n in discover_shards(bucket, prefix) if n not in received]
+        if not remaining and not received:
+            raise RuntimeError("OCR 결과 JSON 파일이 없습니다.")
+        for _, shard_responses in _iter_downloads(bucket, remaining):
+            yield shard_responses
 
-    blob = json_blobs[0]
-    data = blob.download_as_text(encoding="utf-8")
-    return json.loads(data)
+def fetch_ocr_result(prefix, page_count=None, batch_size=OUTPUT_BATCH_SIZE,
+                     operation_response=None, deadline=RESULT_POLL_DEADLINE):
+    """Vision OCR 결과 JSON 파일을 모두 가져와 하나의 응답으로 반환 — 결과가 없으면 RuntimeError"""
+    responses = []
+    for shard_responses in iter_ocr_result(prefix, page_count, batch_size, operation_response, deadline):
+        responses.extend(shard_responses)
+    return {"responses": responses}
 
 # ----------------------------------------------------------------------
 # 🚀 6️⃣ 메인 OCR 파이프라인
 # ----------------------------------------------------------------------
-def run_ocr_pipeline(uploaded_file):
-    """Streamlit에서 업로드된 파일을 OCR 처리하고 텍스트 반환"""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(uploaded_file.read())
-        tmp_path = tmp.name
+def iter_vision_ocr_pages(pdf_source, filename, content_hash=None):
+    """Vision OCR → 결과가 준비되는 대로 (페이지 번호, 텍스트) 생성"""
+    for page in iter_vision_document_pages(pdf_source, filename, content_hash):
+        yield page.number, page.text
+
+def iter_vision_document_pages(pdf_source, filename, content_hash=None):
+    """Vision OCR → 결과가 준비되는 대로 Page(블록 / 단어 / 신뢰도 포함) 생성"""
+    return run_steps(iter_vision_document_steps(pdf_source, filename, content_hash))
 
-    log(f"📂 파일 업로드 완료: {uploaded_file.name}")
+def iter_vision_document_steps(pdf_source, filename, content_hash=None):
+    """Vision OCR 단계 생성기 — Page와, 비동기 작업을 기다릴 자리의 OperationWait를 생성
+
+    작은 PDF와 이미지는 동기 인라인 요청으로 바로 처리하고,
+    큰 PDF는 GCS 업로드 → 비동기 OCR → 결과 샤드 다운로드 경로를 사용한다.
+    pdf_source(바이트 또는 파일 객체)를 임시 파일 없이 조각 단위로 바로 업로드한다.
+    작업을 기다리는 동안에는 어떤 단계 슬롯도 잡고 있지 않다.
+    """
+    mime_type = sniff_mime_type(pdf_source)
+    page_count = None if mime_type in IMAGE_MIME_TYPES else count_pdf_pages(pdf_source)
+    if use_inline_ocr(pdf_source, mime_type, page_count):
+        log(f"⚡ 인라인 OCR: {filename} ({page_count or 1}페이지, GCS 생략)")
+        with _stage_slots["inline"]:
+            yield from iter_inline_ocr_pages(pdf_source, mime_type, page_count)
+        return
 
     client, bucket = refresh_gcs_client()
-    destination_blob_name = f"uploads/{os.path.basename(tmp_path)}"
-    blob = bucket.blob(destination_blob_name)
-    blob.upload_from_filename(tmp_path)
-    log(f"✅ GCS 업로드 완료: {destination_blob_name}")
-
-    perform_ocr(destination_blob_name, OUTPUT_PREFIX)
-    ocr_result = fetch_ocr_result(OUTPUT_PREFIX)
-
-    if ocr_result:
-        text_blocks = [p["fullTextAnnotation"]["text"] for p in ocr_result["responses"] if "fullTextAnnotation" in p]
-        full_text = "\n".join(text_blocks)
-        log("🎉 OCR 결과를 성공적으로 불러왔습니다.")
-        return full_text
+    destination_blob_name = f"uploads/{uuid.uuid4().hex}.pdf"
+    with _stage_slots["upload"]:
+        size = upload_stream(bucket, destination_blob_name, as_stream(pdf_source))
+    log(f"✅ GCS 업로드 완료: {filename} → {destination_blob_name} ({size / 1024 / 1024:.1f}MB)")
+
+    job_prefix = make_job_prefix()
+    operation = OperationWait(submit_ocr(destination_blob_name, job_prefix))
+    yield operation
+    operation_response = operation.result()
+    received = 0
+    with _stage_slots["download"]:
+        for shard_responses in iter_ocr_result(
+            job_prefix,
+            page_count=page_count,
+            operation_response=operation_response,
+        ):
+            received += len(shard_responses)
+            yield from iter_document_pages(shard_responses)
+    if page_count and received < page_count:
+        raise RuntimeError(f"OCR 결과가 일부만 있습니다 ({received}/{page_count}페이지).")
+    # 끝까지 받은 작업만 바로 정리하고, 중단된 작업은 주기 정리(스위퍼)에 맡긴다
+    schedule_job_cleanup(bucket, destination_blob_name, job_prefix, size)
+
+def iter_pages_with_text_layer(engine, pdf_source, filename, content_hash=None):
+    """텍스트 레이어가 있는 페이지는 즉시 생성하고, 나머지 페이지는 OCR되는 대로 Page로 생성
+
+    페이지는 준비된 순서대로 나오므로 번호 순서가 아닐 수 있다.
+    엔진이 내보내는 OperationWait는 그대로 넘긴다.
+    """
+    texts = extract_text_layer(pdf_source) if TEXT_LAYER_ENABLED else None
+    if not texts:
+        yield from engine.iter_document_steps(pdf_source, filename, content_hash)
+        return
+
+    fast_pages, ocr_pages = split_pages(texts)
+    log(f"⚡ 텍스트 레이어 사용: {len(fast_pages)}/{len(texts)}페이지 (OCR 대상 {len(ocr_pages)}페이지)")
+    for page_number, text in sorted(fast_pages.items()):
+        yield Page(page_number, text)
+    if not ocr_pages:
+        return
+
+    if fast_pages:
+        ocr_input, content_hash = build_subset_pdf(pdf_source, ocr_pages), None
     else:
+        ocr_input = pdf_source
+    # 부분 PDF의 페이지 번호(1..k)를 원본 페이지 번호로 되돌린다
+    for step in engine.iter_document_steps(ocr_input, filename, content_hash):
+        if not isinstance(step, OperationWait):
+            step.number = ocr_pages[step.number - 1]
+        yield step
+
+def pipeline_cache_key(pdf_source, engine, content_hash=None):
+    """OCR 결과 캐시 키 — 엔진 설정 + 텍스트 레이어 사용 여부 + 저장 형식 포함"""
+    return make_cache_key_from_hash(
+        content_hash or hash_stream(pdf_source),
+        {**engine.feature_config, "text_layer": TEXT_LAYER_ENABLED, "format": "document-v1"},
+    )
+
+def iter_ocr_document(pdf_source, filename, engine=None, content_hash=None):
+    """PDF(바이트 또는 seek 가능한 파일 객체)를 OCR 처리하며 준비되는 페이지마다 Page 생성
+
+    engine을 지정하지 않으면 OCR_ENGINE 환경 변수(기본: vision)로 엔진을 고른다.
+    content_hash(SHA-256 hex)를 이미 계산했다면 넘겨서 다시 읽지 않게 한다.
+    모든 페이지가 끝나면 문서 전체를 Arrow 형식으로 캐시에 저장한다
+    (PDF의 모든 페이지를 받았을 때만 — 일부만 받은 결과는 캐시하지 않는다).
+    """
+    return run_steps(iter_ocr_steps(pdf_source, filename, engine, content_hash))
+
+def iter_ocr_steps(pdf_source, filename, engine=None, content_hash=None):
+    """iter_ocr_document의 단계 생성기 — Page 사이에 Vision 작업 대기 지점(OperationWait)을 함께 생성"""
+    engine = engine or get_engine()
+    content_hash = content_hash or hash_stream(pdf_source)
+
+    # ⚡ 동일 문서 + 동일 엔진/설정이면 캐시에서 바로 반환 (JSON 재파싱 없이 Arrow에서 복원)
+    cache = get_ocr_cache()
+    cache_key = pipeline_cache_key(pdf_source, engine, content_hash)
+    cached = cache.get_bytes(cache_key)
+    if cached is not None:
+        log(f"⚡ OCR 캐시 적중: {filename}")
+        yield from from_arrow_bytes(cached).pages
+        return
+
+    log(f"🔧 OCR 엔진: {engine.name}")
+    pages = {}
+    for step in iter_pages_with_text_layer(engine, pdf_source, filename, content_hash):
+        if not isinstance(step, OperationWait):
+            pages[step.number] = step
+        yield step
+
+    if not pages:
         log("❌ OCR 결과를 가져오지 못했습니다.")
+        return
+    expected = count_pdf_pages(pdf_source) or 1
+    if len(pages) < expected:
+        # 텍스트가 없는 페이지(빈 면)도 여기에 해당하므로 오류로 보지 않고 캐시만 건너뛴다
+        log(f"⚠️ {len(pages)}/{expected}페이지만 받아 OCR 결과를 캐시하지 않습니다.")
+        return
+    cache.put_bytes(cache_key, to_arrow_bytes(OcrDocument(pages.values())))
+    log(f"🎉 OCR 결과를 성공적으로 불러왔습니다. ({len(pages)}페이지)")
+
+def iter_ocr_bytes(pdf_source, filename, engine=None, content_hash=None):
+    """iter_ocr_document와 같지만 준비되는 페이지마다 (페이지 번호, 텍스트) 생성"""
+    for page in iter_ocr_document(pdf_source, filename, engine, content_hash):
+        yield page.number, page.text
+
+def iter_ocr_pipeline(uploaded_file, engine=None):
+    """Streamlit에서 업로드된 파일을 OCR 처리하며 준비되는 페이지마다 (페이지 번호, 텍스트) 생성
+
+    UploadedFile을 read()로 복사하지 않고 파일 객체 그대로 해시 / 업로드 / PDF 파싱에 넘긴다.
+    """
+    return iter_ocr_bytes(uploaded_file, uploaded_file.name, engine)
+
+def run_ocr_pipeline(uploaded_file, engine=None):
+    """Streamlit에서 업로드된 파일을 OCR 처리하고 텍스트 반환"""
+    pages = sorted(iter_ocr_pipeline(uploaded_file, engine))
+    if not pages:
         return None
+    return "\n".join(text for _, text in pages)
@@ -0,0 +1,28 @@
+from benchmarks.fakes import FakeResponse, FakeStorageClient
+from src.gcs_cleanup import cleanup_job, cleanup_stats, delete_blobs
+
+
+def _bucket(*names):
+    storage = FakeStorageClient()
+    for name in names:
+        storage.store("bucket", name, b"x" * 100)
+    return storage.bucket("bucket")
+
+
+def test_only_successful_deletes_are_counted():
+    bucket = _bucket("ocr_results/a/output-1-to-1.json", "ocr_results/a/output-2-to-2.json", "uploads/locked.pdf")
+    blobs = list(bucket.list_blobs(prefix="ocr_results/")) + [bucket.blob("uploads/gone.pdf")]
+    locked = bucket.list_blobs(prefix="uploads/")[0]
+    # 권한 오류 등으로 서버가 거절한 삭제
+    locked.delete = lambda: bucket.client.current_batch._responses.append(FakeResponse(403))
+    failures = cleanup_stats()["delete_failures"]
+
+    assert delete_blobs(bucket, blobs + [locked]) == (2, 200)
+    assert cleanup_stats()["delete_failures"] == failures + 1
+    assert locked.size == 100
+
+
+def test_upload_size_is_counted_only_when_upload_was_deleted():
+    bucket = _bucket("ocr_results/a/output-1-to-1.json", "uploads/a.pdf")
+    assert cleanup_job(bucket, "uploads/a.pdf", "ocr_results/a/", upload_size=100) == (2, 200)
+    assert cleanup_job(bucket, "uploads/a.pdf", "ocr_results/a/", upload_size=100) == (0, 0)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from src import ocr_batcher, vision_ocr
+from src.ocr_batcher import OcrRequestCoalescer
+
+
+class _Operation:
+    def __init__(self, response):
+        self._response = response
+
+    def result(self, timeout=None):
+        return self._response
+
+
+class _VisionClient:
+    """요청 묶음에 손상된 파일이 하나라도 있으면 작업 전체가 실패하는 Vision 대역"""
+
+    def __init__(self, reverse=False, delay=0.0):
+        self.calls = []
+        self.reverse = reverse
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def async_batch_annotate_files(self, requests):
+        from google.cloud import vision
+
+        uris = [request["input_config"]["gcs_source"]["uri"] for request in requests]
+        with self._lock:
+            self.calls.append(uris)
+        time.sleep(self.delay)
+        if any("corrupt" in uri for uri in uris):
+            raise ValueError("Bad image data")
+        destinations = [request["output_config"]["gcs_destination"]["uri"] for request in requests]
+        if self.reverse:
+            destinations.reverse()
+        return _Operation(vision.AsyncBatchAnnotateFilesResponse(responses=[
+            {"output_config": {"gcs_destination": {"uri": uri}}} for uri in destinations
+        ]))
+
+
+def _request(name):
+    return {
+        "input_config": {"gcs_source": {"uri": f"gs://bucket/{name}"}},
+        "output_config": {"gcs_destination": {"uri": f"gs://bucket/{name}/out/"}},
+    }
+
+
+def test_failed_file_does_not_fail_coalesced_neighbours(monkeypatch):
+    client = _VisionClient()
+    monkeypatch.setattr(ocr_batcher, "get_vision_client", lambda: client)
+    # 창을 넉넉히 잡아 세 요청이 한 묶음으로 제출되게 한다
+    coalescer = OcrRequestCoalescer(window=0.5, max_files=3)
+
+    futures = {name: coalescer.submit(_request(name)) for name in ("a.pdf", "corrupt.pdf", "c.pdf")}
+
+    for name in ("a.pdf", "c.pdf"):
+        response = futures[name].result(timeout=5)
+        assert response.responses[0].output_config.gcs_destination.uri == f"gs://bucket/{name}/out/"
+    with pytest.raises(ValueError):
+        futures["corrupt.pdf"].result(timeout=5)
+
+    assert len(client.calls[0]) == 3
+    assert sorted(map(tuple, client.calls[1:])) == [
+        ("gs://bucket/a.pdf",), ("gs://bucket/c.pdf",), ("gs://bucket/corrupt.pdf",),
+    ]
+    assert coalescer.stats["split_retries"] == 1
+
+
+def test_responses_are_routed_by_destination(monkeypatch):
+    monkeypatch.setattr(ocr_batcher, "get_vision_client", lambda: _VisionClient(reverse=True))
+    coalescer = OcrRequestCoalescer(window=0.5, max_files=3)
+
+    futures = {name: coalescer.submit(_request(name)) for name in ("a.pdf", "b.pdf", "c.pdf")}
+
+    for name, future in futures.items():
+        response = future.result(timeout=5)
+        assert response.responses[0].output_config.gcs_destination.uri == f"gs://bucket/{name}/out/"
+
+
+def test_operation_slot_is_per_batch_not_per_caller(monkeypatch):
+    monkeypatch.setattr(ocr_batcher, "get_vision_client", lambda: _VisionClient(delay=0.2))
+    monkeypatch.setitem(vision_ocr._stage_slots, "operation", threading.BoundedSemaphore(1))
+    coalescer = OcrRequestCoalescer(window=0.2, max_files=10)
+    monkeypatch.setattr(vision_ocr, "get_coalescer", lambda: coalescer)
+
+    threads = [
+        threading.Thread(target=vision_ocr.perform_ocr, args=(f"uploads/{n}.pdf", f"ocr_results/{n}/"))
+        for n in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert coalescer.stats["largest_batch"] == 6
+
+
+def test_split_retries_respect_caller_deadline(monkeypatch):
+    client = _VisionClient(delay=0.5)
+    monkeypatch.setattr(ocr_batcher, "get_vision_client", lambda: client)
+    coalescer = OcrRequestCoalescer(window=0.1, max_files=3)
+
+    futures = [coalescer.submit(_request(name), deadline=0.4) for name in ("a.pdf", "corrupt.pdf", "c.pdf")]
+
+    for future in futures:
+        with pytest.raises(TimeoutError):
+            future.result(timeout=5)
+    # 묶음 작업이 실패한 뒤에는 마감 시간이 지나 파일별로 다시 제출하지 않는다
+    assert len(client.calls) == 1
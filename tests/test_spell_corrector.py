@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.fakes import FakeGenerativeModel
+from src import gemini_client, spell_corrector
+from src.correction_cache import CorrectionCache
+from src.ocr_document import OcrDocument, Page
+from src.session_jobs import DONE, FAILED, CorrectionJob
+from src.spell_corrector import CorrectionError, correct_document
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeGenerativeModel()
+    monkeypatch.setattr(spell_corrector, "get_correction_cache", lambda: CorrectionCache(use_disk=False))
+    monkeypatch.setattr(spell_corrector, "_load_model", lambda: (model, None))
+    monkeypatch.setattr(gemini_client, "_limiter", gemini_client.RateLimiter(0, 0))
+    return model
+
+
+def test_correct_document_raises_on_failure(monkeypatch):
+    monkeypatch.setattr(spell_corrector, "_load_model", lambda: (None, "❌ Gemini API 오류: 키 없음"))
+    with pytest.raises(CorrectionError, match="키 없음"):
+        correct_document(OcrDocument([Page(1, "본문입니다.")]))
+
+
+def test_output_starting_with_error_mark_is_not_an_error(model):
+    # 원문(그리고 교정 결과)이 ❌ 기호로 시작해도 실패로 취급하지 않는다
+    document = OcrDocument([Page(1, "❌ 표시는 틀린 답을 뜻합니다.")])
+    job = CorrectionJob("맞춤법 교정", selective=True)
+    job.run(document)
+    assert job.status == DONE
+    assert job.text == document.text
+
+
+def test_correction_job_reports_correction_error(monkeypatch):
+    monkeypatch.setattr(spell_corrector, "_load_model", lambda: (None, "❌ Gemini API 오류: 키 없음"))
+    job = CorrectionJob("맞춤법 교정", selective=True)
+    job.run(OcrDocument([Page(1, "본문입니다.")]))
+    assert job.status == FAILED
+    assert job.error == "❌ Gemini API 오류: 키 없음"
@@ -0,0 +1,27 @@
+import pytest
+
+from src.telemetry import metrics_snapshot, stage
+
+
+def _pages():
+    with stage("test_generator_stage"):
+        yield 1
+        yield 2
+
+
+def _errors(name):
+    return metrics_snapshot()["stages"][name]["errors"]
+
+
+def test_closing_generator_stage_early_is_not_an_error():
+    pages = _pages()
+    next(pages)
+    pages.close()
+    assert _errors("test_generator_stage") == 0
+
+
+def test_exception_in_stage_is_an_error():
+    with pytest.raises(ValueError):
+        with stage("test_failing_stage"):
+            raise ValueError("boom")
+    assert _errors("test_failing_stage") == 1
@@ -0,0 +1,66 @@
+import random
+
+from benchmarks.fakes import FakeGenerativeModel
+from src import gemini_client, spell_corrector
+from src.correction_cache import CorrectionCache, make_correction_key
+from src.text_chunker import estimate_tokens, split_into_chunks
+
+SYLLABLES = "가나다라마바사아자차카타파하의에서으로는은이가을를"
+
+
+def _document(paragraphs=200, seed=7):
+    rng = random.Random(seed)
+
+    def sentence():
+        words = ("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(5, 15)))
+        return " ".join(words) + "."
+
+    return [" ".join(sentence() for _ in range(rng.randint(1, 6))) for _ in range(paragraphs)]
+
+
+def _edit(paragraph):
+    words = paragraph.split(" ")
+    words[len(words) // 2] += "강조"
+    return " ".join(words)
+
+
+def test_chunks_round_trip_within_budget():
+    text = "\n\n".join(_document()) + "\n" + "\n".join(_document(50, seed=3))
+    chunks = split_into_chunks(text, budget=500)
+    assert len(chunks) > 10
+    assert "".join(chunk.text + chunk.joiner for chunk in chunks) == text
+    assert all(estimate_tokens(chunk.text) <= 500 for chunk in chunks)
+
+
+def test_paragraph_edit_recorrects_only_its_chunk(monkeypatch):
+    monkeypatch.setattr(spell_corrector, "get_correction_cache", lambda: cache)
+    monkeypatch.setattr(gemini_client, "_limiter", gemini_client.RateLimiter(0, 0))
+    cache = CorrectionCache(use_disk=False)
+    model = FakeGenerativeModel()
+    paragraphs = _document()
+
+    spell_corrector._correct_chunks(model, "\n\n".join(paragraphs), "맞춤법 교정")
+    first = model.counters["requests"]
+    assert first > 5
+
+    paragraphs[len(paragraphs) // 2] = _edit(paragraphs[len(paragraphs) // 2])
+    spell_corrector._correct_chunks(model, "\n\n".join(paragraphs), "맞춤법 교정")
+    assert model.counters["requests"] - first == 1
+
+
+def test_edit_keeps_other_chunk_boundaries():
+    paragraphs = _document()
+    before = {(chunk.text, chunk.context) for chunk in split_into_chunks("\n\n".join(paragraphs))}
+    for index in range(0, len(paragraphs), 10):
+        edited = list(paragraphs)
+        edited[index] = _edit(edited[index])
+        after = split_into_chunks("\n\n".join(edited))
+        # 고친 문단이 든 조각과, 자르기 지점이 바뀌었을 때의 이웃 조각까지만 새로 교정
+        assert sum((chunk.text, chunk.context) not in before for chunk in after) <= 2
+
+
+def test_context_is_part_of_cache_key():
+    plain = make_correction_key("본문", "맞춤법 교정", "model", 1)
+    assert plain == make_correction_key("본문", "맞춤법 교정", "model", 1, "", "")
+    assert plain != make_correction_key("본문", "맞춤법 교정", "model", 1, context="앞 문맥")
+    assert plain != make_correction_key("본문", "맞춤법 교정", "model", 1, following="뒤 문맥")
@@ -0,0 +1,79 @@
+from benchmarks.fakes import synthetic_pdf
+from src import vision_ocr
+from src.ocr_cache import OcrResultCache
+from src.ocr_document import Page
+from src.ocr_engines import OcrEngine
+
+USABLE_TEXT = "텍스트 레이어가 충분히 긴 정상 페이지입니다. " * 3
+
+
+class _StubEngine(OcrEngine):
+    """OCR 대상 페이지마다 pages에 든 Page만 돌려주는 엔진 대역"""
+
+    name = "stub"
+    feature_config = {"feature": "stub"}
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = 0
+
+    def iter_document_pages(self, pdf_source, filename, content_hash=None):
+        self.calls += 1
+        return iter([Page(number, text) for number, text in self.pages])
+
+
+def _run(monkeypatch, tmp_path, engine):
+    monkeypatch.setattr(vision_ocr, "get_ocr_cache", lambda: cache)
+    monkeypatch.setattr(vision_ocr, "extract_text_layer", lambda source: [USABLE_TEXT, ""])
+    cache = OcrResultCache(cache_dir=str(tmp_path))
+    pdf = synthetic_pdf(2)
+    first = [page.number for page in vision_ocr.iter_ocr_document(pdf, "doc.pdf", engine)]
+    second = [page.number for page in vision_ocr.iter_ocr_document(pdf, "doc.pdf", engine)]
+    return first, second
+
+
+def test_partial_document_is_not_cached(monkeypatch, tmp_path):
+    engine = _StubEngine([])
+    first, second = _run(monkeypatch, tmp_path, engine)
+    assert first == second == [1]
+    assert engine.calls == 2
+
+
+def test_complete_document_is_cached(monkeypatch, tmp_path):
+    engine = _StubEngine([(1, "스캔 페이지")])
+    first, second = _run(monkeypatch, tmp_path, engine)
+    assert sorted(first) == sorted(second) == [1, 2]
+    assert engine.calls == 1
+
+
+def test_orchestrator_waits_for_operations_without_holding_threads(monkeypatch, tmp_path):
+    import threading
+
+    from benchmarks.fakes import FakeBackend, install_fakes
+    from src import clients
+    from src.ocr_batcher import OcrRequestCoalescer
+    from src.ocr_engines import VisionOcrEngine
+    from src.ocr_orchestrator import OcrOrchestrator
+
+    backend = install_fakes(FakeBackend())
+    monkeypatch.setattr(vision_ocr, "get_ocr_cache", lambda: OcrResultCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(vision_ocr, "get_coalescer", lambda: coalescer)
+    coalescer = OcrRequestCoalescer(window=0)
+    # 작업 5건이 모두 완료를 기다리는 중이어야 끝나는 Vision 작업 — 기다리는 문서가 스레드를 잡으면 멈춘다
+    barrier = threading.Barrier(5, timeout=5)
+    submit = backend.vision.async_batch_annotate_files
+
+    def async_batch_annotate_files(requests, **kwargs):
+        operation = submit(requests, **kwargs)
+        run = operation._run
+        operation._run = lambda: (barrier.wait(), run())[1]
+        return operation
+
+    monkeypatch.setattr(backend.vision, "async_batch_annotate_files", async_batch_annotate_files)
+    orchestrator = OcrOrchestrator(step_threads=1)
+    try:
+        jobs = [orchestrator.submit(synthetic_pdf(6, tag=str(n)), f"{n}.pdf", VisionOcrEngine()) for n in range(5)]
+        assert [len(job.document_sync(timeout=30).pages) for job in jobs] == [6] * 5
+    finally:
+        orchestrator.close()
+        clients.reset_clients()